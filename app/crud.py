@@ -1,8 +1,19 @@
 # app/crud.py
-from sqlalchemy.orm import Session
-from sqlalchemy import desc, func
+import base64
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import and_, case, desc, func, or_, text
+from sqlalchemy.exc import IntegrityError
 from . import models, schemas
-from .utils.codigos import generar_codigo_producto
+from .utils.codigos import generar_codigo_producto, normalizar_codigo  # registra codigo_normalizado
+from .utils import versiones  # registra el contador de escrituras por tabla
+from .utils import eventos  # registra los eventos de stock para /api/eventos
+from .utils import alertas  # mantiene productos.bajo_stock y la cola de alertas
+from .utils import resumenes  # mantiene resumen_diario para las series
+from .utils import archivo  # movimientos viejos en la base adjunta
+from .utils.serializacion import filas_a_dicts
 
 # ---------------------------
 # CRUD Productos
@@ -10,8 +21,12 @@ from .utils.codigos import generar_codigo_producto
 def get_producto(db: Session, producto_id: int):
     return db.query(models.Producto).filter(models.Producto.id == producto_id).first()
 
+def _filtro_codigo(codigo: str):
+    # Por la forma canónica (índice único); el código exacto cubre los que el relleno dejó sin ella
+    return or_(models.Producto.codigo_normalizado == normalizar_codigo(codigo), models.Producto.codigo == codigo)
+
 def get_producto_por_codigo(db: Session, codigo: str):
-    return db.query(models.Producto).filter(models.Producto.codigo == codigo).first()
+    return db.query(models.Producto).filter(_filtro_codigo(codigo)).first()
 
 def get_productos(db: Session, skip: int = 0, limit: int = 100):
     """
@@ -22,7 +37,7 @@ def get_productos(db: Session, skip: int = 0, limit: int = 100):
 
 def crear_producto(db: Session, producto: schemas.ProductoCreate):
     if not producto.codigo:
-        producto.codigo = generar_codigo_producto()
+        producto.codigo = generar_codigo_producto(db)
     
     db_producto = models.Producto(
         codigo=producto.codigo,
@@ -34,7 +49,12 @@ def crear_producto(db: Session, producto: schemas.ProductoCreate):
     )
     
     db.add(db_producto)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # Otro worker creó el mismo código entre la comprobación y el INSERT
+        db.rollback()
+        raise ValueError("El código ya existe")
     db.refresh(db_producto)
     return db_producto
 
@@ -62,6 +82,7 @@ def eliminar_producto(db: Session, producto_id: int):
     if not db_producto:
         return False
     db.delete(db_producto)
+    archivo.borrar_producto(db, producto_id)
     db.commit()
     return True
 
@@ -73,6 +94,21 @@ def crear_movimiento(db: Session, movimiento: schemas.MovimientoCreate):
     if not producto:
         return None
     
+    # Ubicaciones: dónde entra, de dónde sale o entre cuáles se traslada
+    origen = destino = None
+    if movimiento.tipo == "entrada":
+        destino = resolver_ubicacion(db, movimiento.ubicacion_id, movimiento.ubicacion, crear=True)
+    elif movimiento.tipo == "salida":
+        origen = resolver_ubicacion(db, movimiento.ubicacion_id, movimiento.ubicacion)
+    elif movimiento.tipo == "traslado":
+        origen = resolver_ubicacion(db, movimiento.ubicacion_id, movimiento.ubicacion)
+        destino = resolver_ubicacion(db, movimiento.ubicacion_destino_id)
+        if destino is None:
+            raise ValueError("El traslado necesita la ubicación de destino")
+        if origen is not None and origen.id == destino.id:
+            raise ValueError("El origen y el destino del traslado son la misma ubicación")
+    principal = destino if movimiento.tipo == "entrada" else origen
+    
     db_movimiento = models.Movimiento(
         producto_id=movimiento.producto_id,
         tipo=movimiento.tipo,
@@ -80,18 +116,24 @@ def crear_movimiento(db: Session, movimiento: schemas.MovimientoCreate):
         motivo=movimiento.motivo,
         tipo_origen=movimiento.tipo_origen,
         origen_nombre=movimiento.origen_nombre,  # Proveedor
-        ubicacion=movimiento.ubicacion,  # Ubicación
+        ubicacion=_texto_ubicacion(origen, destino),  # Ubicación
+        ubicacion_id=principal.id if principal else None,
+        ubicacion_destino_id=destino.id if movimiento.tipo == "traslado" else None,
         notas=movimiento.notas,  # Notas
         cliente_destino=movimiento.cliente_destino,  # 🆕 Para salidas
         usuario=movimiento.usuario,
        
     )
     
+    if movimiento.tipo == "salida" and producto.stock_actual < movimiento.cantidad:
+        raise ValueError("Stock insuficiente")
+    # Antes de tocar stock_actual: el stock sin ubicación se calcula con el valor anterior
+    mover_stock_ubicaciones(db, producto, movimiento.tipo, movimiento.cantidad, origen=origen, destino=destino)
+    asignar_lotes(db, producto, db_movimiento, movimiento.tipo, movimiento.cantidad, codigo=movimiento.lote,
+                  fecha_vencimiento=movimiento.fecha_vencimiento, lote_id=movimiento.lote_id)
     if movimiento.tipo == "entrada":
         producto.stock_actual += movimiento.cantidad
     elif movimiento.tipo == "salida":
-        if producto.stock_actual < movimiento.cantidad:
-            raise ValueError("Stock insuficiente")
         producto.stock_actual -= movimiento.cantidad
     
     db.add(db_movimiento)
@@ -99,20 +141,649 @@ def crear_movimiento(db: Session, movimiento: schemas.MovimientoCreate):
     db.refresh(db_movimiento)
     return db_movimiento
 
+def _pagina_reciente(db: Session, consulta, skip: int, limit: int):
+    """
+    Página del más reciente al más antiguo sobre movimientos y, solo si no se
+    completa, sobre el archivo. `consulta(modelo)` arma la consulta ordenada.
+    """
+    filas = consulta(models.Movimiento).offset(skip).limit(limit).all()
+    if len(filas) < limit and archivo.alcanza(db):
+        # Si la página empezó en la tabla caliente, el archivo se lee desde el principio
+        saltar = max(0, skip - consulta(models.Movimiento).order_by(None).count()) if not filas else 0
+        filas += consulta(models.MovimientoArchivado).offset(saltar).limit(limit - len(filas)).all()
+    return filas
+
 def get_movimientos(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Movimiento).order_by(desc(models.Movimiento.fecha_movimiento)).offset(skip).limit(limit).all()
+    return _pagina_reciente(
+        db, lambda mov: db.query(mov).order_by(desc(mov.fecha_movimiento)), skip, limit
+    )
 
 def get_movimientos_por_producto(db: Session, producto_id: int):
-    return db.query(models.Movimiento).filter(models.Movimiento.producto_id == producto_id).order_by(desc(models.Movimiento.fecha_movimiento)).all()
+    return [
+        m for mov in archivo.modelos(db)
+        for m in db.query(mov).filter(mov.producto_id == producto_id).order_by(desc(mov.fecha_movimiento)).all()
+    ]
+
+def get_movimiento_salida(db: Session, movimiento_id: int):
+    """Una salida por id, en movimientos o en el archivo."""
+    for mov in archivo.modelos(db):
+        salida = db.query(mov).filter(mov.id == movimiento_id, mov.tipo == "salida").first()
+        if salida is not None:
+            return salida
+    return None
+
+# ---------------------------
+# Consultas por columnas (ruta rápida de los listados)
+# ---------------------------
+# Devuelven dicts listos para serializar, sin instanciar modelos ni esquemas
+COLUMNAS_PRODUCTO = (
+    models.Producto.id,
+    models.Producto.codigo,
+    models.Producto.nombre,
+    models.Producto.descripcion,
+    models.Producto.categoria,
+    models.Producto.stock_minimo,
+    models.Producto.stock_actual,
+    models.Producto.bajo_stock,
+    models.Producto.clase_abc,
+    models.Producto.fecha_creacion,
+    models.Producto.fecha_actualizacion,
+)
+
+COLUMNAS_MOVIMIENTO = (
+    models.Movimiento.id,
+    models.Movimiento.producto_id,
+    models.Movimiento.tipo,
+    models.Movimiento.cantidad,
+    models.Movimiento.motivo,
+    models.Movimiento.tipo_origen,
+    models.Movimiento.origen_nombre,
+    models.Movimiento.ubicacion,
+    models.Movimiento.notas,
+    models.Movimiento.usuario,
+    models.Movimiento.cliente_destino,
+    models.Movimiento.fecha_movimiento,
+    models.Movimiento.pdf_firmado,
+    models.Movimiento.pdf_nombre,
+    models.Movimiento.documento_id,
+)
+
+def columnas_movimiento(modelo=models.Movimiento):
+    """COLUMNAS_MOVIMIENTO tomadas de `modelo` (movimientos o el archivo)."""
+    return tuple(getattr(modelo, c.key) for c in COLUMNAS_MOVIMIENTO)
+
+def get_productos_filas(db: Session, skip: int = 0, limit: int = 100, clase: str = None):
+    query = db.query(*COLUMNAS_PRODUCTO)
+    if clase:
+        query = query.filter(models.Producto.clase_abc == clase)
+    return filas_a_dicts(query.offset(skip).limit(limit).all())
+
+def get_producto_por_codigo_fila(db: Session, codigo: str):
+    fila = db.query(*COLUMNAS_PRODUCTO).filter(_filtro_codigo(codigo)).first()
+    return dict(fila._mapping) if fila else None
+
+def buscar_productos_filas(db: Session, query: str, clase: str = None):
+    query = query.lower()
+    consulta = db.query(*COLUMNAS_PRODUCTO).filter(
+        (func.lower(models.Producto.nombre).like(f"%{query}%")) |
+        (func.lower(models.Producto.codigo).like(f"%{query}%")) |
+        (func.lower(func.coalesce(models.Producto.descripcion, '')).like(f"%{query}%"))
+    )
+    if clase:
+        consulta = consulta.filter(models.Producto.clase_abc == clase)
+    return filas_a_dicts(consulta.all())
+
+def _movimientos_con_producto(filas):
+    """Arma el dict anidado a partir de filas de movimientos + producto."""
+    n = len(COLUMNAS_MOVIMIENTO)
+    claves_mov = [c.key for c in COLUMNAS_MOVIMIENTO]
+    claves_prod = [c.key for c in COLUMNAS_PRODUCTO]
+    resultado = []
+    for fila in filas:
+        movimiento = dict(zip(claves_mov, fila[:n]))
+        producto = fila[n:]
+        movimiento["producto"] = dict(zip(claves_prod, producto)) if producto[0] is not None else None
+        resultado.append(movimiento)
+    return resultado
+
+def _movimientos_y_productos(db: Session, mov):
+    return db.query(*columnas_movimiento(mov), *COLUMNAS_PRODUCTO).outerjoin(
+        models.Producto, mov.producto_id == models.Producto.id
+    )
+
+def get_movimientos_filas(db: Session, skip: int = 0, limit: int = 100):
+    filas = _pagina_reciente(
+        db, lambda mov: _movimientos_y_productos(db, mov).order_by(desc(mov.fecha_movimiento)), skip, limit
+    )
+    return _movimientos_con_producto(filas)
+
+def get_movimientos_por_producto_filas(db: Session, producto_id: int):
+    filas = []
+    for mov in archivo.modelos(db):
+        filas += _movimientos_y_productos(db, mov).filter(
+            mov.producto_id == producto_id
+        ).order_by(desc(mov.fecha_movimiento)).all()
+    return _movimientos_con_producto(filas)
+
+def get_estadisticas_dashboard(db: Session) -> dict:
+    """Totales y últimos 10 movimientos para el dashboard principal."""
+    total_productos = db.query(func.count(models.Producto.id)).scalar()
+    productos_bajo_stock = db.query(func.count(models.Producto.id)).filter(
+        models.Producto.bajo_stock == True
+    ).scalar()
+    ultimos_movimientos = _pagina_reciente(
+        db, lambda mov: db.query(*columnas_movimiento(mov)).order_by(desc(mov.fecha_movimiento)), 0, 10
+    )
+    return {
+        "total_productos": total_productos,
+        "productos_bajo_stock": productos_bajo_stock,
+        "ultimos_movimientos": filas_a_dicts(ultimos_movimientos)
+    }
+
+def get_pronosticos_filas(db: Session, producto_id: int = None, solo_reponer: bool = False, limit: int = 100):
+    """Pronósticos materializados, los que se agotan antes primero (sin consumo al final)."""
+    pron = models.PronosticoProducto
+    query = db.query(
+        pron.producto_id, models.Producto.codigo, models.Producto.nombre,
+        models.Producto.stock_actual, models.Producto.stock_minimo,
+        pron.consumo_diario, pron.consumo_diario_7d, pron.desviacion_diaria,
+        pron.dias_cobertura, pron.fecha_agotamiento, pron.punto_reorden,
+        pron.cantidad_sugerida, pron.actualizado
+    ).join(models.Producto, models.Producto.id == pron.producto_id)
+    if producto_id is not None:
+        query = query.filter(pron.producto_id == producto_id)
+    if solo_reponer:
+        query = query.filter(pron.cantidad_sugerida > 0)
+    query = query.order_by(pron.dias_cobertura.is_(None), pron.dias_cobertura, pron.producto_id)
+    return filas_a_dicts(query.limit(limit).all())
+
+# Inicio del período de cada día del resumen (las semanas empiezan el lunes)
+PERIODOS_SERIE = {
+    "semana": lambda fecha: func.date(fecha, "-6 days", "weekday 1"),
+    "mes": lambda fecha: func.strftime("%Y-%m-01", fecha),
+}
+
+def get_series_movimientos(db: Session, desde, hasta, granularidad: str = "dia",
+                           producto_id: int = None, categoria: str = None, agrupar: str = None):
+    """
+    Entradas y salidas por período, agregadas sobre resumen_diario.
+    `agrupar` ("producto" o "categoria") separa una serie por cada uno.
+    """
+    res = models.ResumenDiario
+    columnas = []
+    if agrupar == "producto":
+        columnas.append(res.producto_id)
+    elif agrupar == "categoria":
+        columnas.append(models.Producto.categoria)
+    # Primero se suma por día (pocas filas) y recién después se calcula el período
+    diario = db.query(
+        res.fecha.label("periodo"),
+        *columnas,
+        func.sum(case((res.tipo == "entrada", res.cantidad), else_=0)).label("entradas"),
+        func.sum(case((res.tipo == "salida", res.cantidad), else_=0)).label("salidas"),
+        func.sum(res.movimientos).label("movimientos"),
+    ).filter(res.fecha >= desde, res.fecha <= hasta)
+    if categoria is not None or agrupar == "categoria":
+        diario = diario.join(models.Producto, models.Producto.id == res.producto_id)
+    if producto_id is not None:
+        diario = diario.filter(res.producto_id == producto_id)
+    if categoria is not None:
+        diario = diario.filter(models.Producto.categoria == categoria)
+    diario = diario.group_by(*columnas, res.fecha)
+    if granularidad == "dia":
+        return filas_a_dicts(diario.order_by(*columnas, res.fecha).all())
+
+    dias = diario.subquery()
+    periodo = PERIODOS_SERIE[granularidad](dias.c.periodo).label("periodo")
+    agrupacion = [dias.c[c.key] for c in columnas] + [periodo]
+    return filas_a_dicts(db.query(
+        periodo,
+        *agrupacion[:-1],
+        func.sum(dias.c.entradas).label("entradas"),
+        func.sum(dias.c.salidas).label("salidas"),
+        func.sum(dias.c.movimientos).label("movimientos"),
+    ).group_by(*agrupacion).order_by(*agrupacion).all())
+
+def get_stock_a_fecha(db: Session, fecha, producto_id: int = None, categoria: str = None,
+                      skip: int = 0, limit: int = 100):
+    """
+    Stock de cada producto al cierre de `fecha`: el actual menos lo que se
+    movió después. Si la fecha es posterior a lo archivado, solo se lee la
+    tabla caliente.
+    """
+    corte = datetime.combine(fecha + timedelta(days=1), datetime.min.time())
+    query = db.query(
+        models.Producto.id.label("producto_id"), models.Producto.codigo, models.Producto.nombre,
+        models.Producto.categoria, models.Producto.stock_actual
+    )
+    if producto_id is not None:
+        query = query.filter(models.Producto.id == producto_id)
+    if categoria is not None:
+        query = query.filter(models.Producto.categoria == categoria)
+    productos = filas_a_dicts(query.order_by(models.Producto.id).offset(skip).limit(limit).all())
+
+    ids = [p["producto_id"] for p in productos]
+    posteriores = {}
+    for mov in archivo.modelos(db, corte):
+        for pid, delta in db.query(
+            mov.producto_id,
+            func.sum(case((mov.tipo == "entrada", mov.cantidad), (mov.tipo == "salida", -mov.cantidad), else_=0))
+        ).filter(mov.fecha_movimiento >= corte, mov.producto_id.in_(ids)).group_by(mov.producto_id):
+            posteriores[pid] = posteriores.get(pid, 0) + delta
+    for p in productos:
+        p["stock"] = (p["stock_actual"] or 0) - posteriores.get(p["producto_id"], 0)
+    return productos
+
+# ---------------------------
+# Detalle de producto: resumen e historial paginado
+# ---------------------------
+def get_resumen_movimientos_producto(db: Session, producto_id: int) -> dict:
+    """Totales del historial de un producto calculados en SQL (incluye el archivo)."""
+    resumen = None
+    for mov in archivo.modelos(db):
+        fila = dict(db.query(
+            func.count(mov.id).label("cantidad_movimientos"),
+            func.coalesce(func.sum(case((mov.tipo == "entrada", mov.cantidad), else_=0)), 0).label("total_entradas"),
+            func.coalesce(func.sum(case((mov.tipo == "salida", mov.cantidad), else_=0)), 0).label("total_salidas"),
+            func.max(mov.fecha_movimiento).label("ultimo_movimiento"),
+        ).filter(mov.producto_id == producto_id).one()._mapping)
+        if resumen is None:
+            resumen = fila
+            continue
+        for clave in ("cantidad_movimientos", "total_entradas", "total_salidas"):
+            resumen[clave] += fila[clave]
+        resumen["ultimo_movimiento"] = resumen["ultimo_movimiento"] or fila["ultimo_movimiento"]
+    return resumen
+
+def codificar_cursor(fecha: datetime, movimiento_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{fecha.isoformat()}|{movimiento_id}".encode()).decode()
+
+def decodificar_cursor(cursor: str):
+    """Devuelve (fecha, id) o lanza ValueError si el cursor no es válido."""
+    try:
+        fecha, movimiento_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(fecha), int(movimiento_id)
+    except Exception as e:
+        raise ValueError("Cursor inválido") from e
+
+def get_historial_producto(db: Session, producto_id: int, limite: int = 50, cursor: str = None):
+    """
+    Página del historial de un producto, del más reciente al más antiguo.
+    Paginación por cursor (fecha, id): cada página es una búsqueda en el
+    índice idx_movimiento_producto_fecha, sin OFFSET. El archivo solo se
+    lee cuando la tabla caliente no completa la página.
+
+    Returns:
+        (movimientos, siguiente_cursor) - siguiente_cursor es None en la última página
+    """
+    posicion = decodificar_cursor(cursor) if cursor else None
+    filas = []
+    for mov in archivo.modelos(db):
+        query = db.query(*columnas_movimiento(mov)).filter(mov.producto_id == producto_id)
+        if posicion:
+            fecha, movimiento_id = posicion
+            query = query.filter(or_(
+                mov.fecha_movimiento < fecha,
+                and_(mov.fecha_movimiento == fecha, mov.id < movimiento_id)
+            ))
+        filas += query.order_by(desc(mov.fecha_movimiento), desc(mov.id)).limit(limite + 1 - len(filas)).all()
+        if len(filas) > limite:
+            break
+
+    siguiente = None
+    if len(filas) > limite:
+        filas = filas[:limite]
+        ultima = filas[-1]
+        siguiente = codificar_cursor(ultima.fecha_movimiento, ultima.id)
+    return filas_a_dicts(filas), siguiente
 
 # ---------------------------
 # Inventario y reportes
 # ---------------------------
 def get_productos_bajo_stock(db: Session):
-    """Solo trae productos con stock bajo, sin datos extra"""
-    return db.query(models.Producto).filter(
-        models.Producto.stock_actual < models.Producto.stock_minimo
-    ).all()
+    """Solo trae productos con stock bajo (índice parcial sobre bajo_stock)"""
+    return db.query(models.Producto).filter(models.Producto.bajo_stock == True).all()
+
+def get_alertas_stock(db: Session, pendientes: bool = True, limit: int = 100):
+    query = db.query(models.AlertaStock).options(joinedload(models.AlertaStock.producto))
+    if pendientes:
+        query = query.filter(models.AlertaStock.atendida == False)
+    return query.order_by(desc(models.AlertaStock.fecha), desc(models.AlertaStock.id)).limit(limit).all()
+
+def atender_alertas_stock(db: Session, alerta_ids: list = None) -> int:
+    """Marca alertas como atendidas (todas las pendientes si no se indican ids)."""
+    query = db.query(models.AlertaStock).filter(models.AlertaStock.atendida == False)
+    if alerta_ids:
+        query = query.filter(models.AlertaStock.id.in_(alerta_ids))
+    cantidad = query.update(
+        {"atendida": True, "fecha_atendida": datetime.utcnow()}, synchronize_session=False
+    )
+    db.commit()
+    return cantidad
+
+# ---------------------------
+# Stock por ubicación
+# ---------------------------
+_SQL_CREAR_UBICACION = text(
+    "INSERT OR IGNORE INTO ubicaciones (nombre, clave, activa, fecha_creacion) VALUES (:nombre, :clave, 1, :ahora)"
+)
+_SQL_SUMAR_UBICACION = text(
+    "INSERT INTO stock_ubicaciones (producto_id, ubicacion_id, cantidad, stock_minimo, actualizado) "
+    "VALUES (:producto_id, :ubicacion_id, :cantidad, 0, :ahora) "
+    "ON CONFLICT(producto_id, ubicacion_id) DO UPDATE SET "
+    "cantidad = cantidad + excluded.cantidad, actualizado = excluded.actualizado"
+)
+# Solo descuenta si alcanza: la comprobación y la resta son una sola sentencia
+_SQL_DESCONTAR_UBICACION = text(
+    "UPDATE stock_ubicaciones SET cantidad = cantidad - :cantidad, actualizado = :ahora "
+    "WHERE producto_id = :producto_id AND ubicacion_id = :ubicacion_id AND cantidad >= :cantidad"
+)
+
+def clave_ubicacion(nombre: str) -> str:
+    return " ".join(nombre.split()).lower()
+
+def resolver_ubicacion(db: Session, ubicacion_id: int = None, nombre: str = None, crear: bool = False):
+    """
+    Ubicación por id o por nombre (sin distinguir mayúsculas). Con `crear`, un
+    nombre nuevo da de alta la ubicación. Devuelve None si no se indicó ninguna.
+    """
+    if ubicacion_id is not None:
+        ubicacion = db.get(models.Ubicacion, ubicacion_id)
+        if ubicacion is None:
+            raise ValueError(f"Ubicación ID {ubicacion_id} no encontrada")
+        return ubicacion
+    if not nombre or not nombre.strip():
+        return None
+    clave = clave_ubicacion(nombre)
+    if crear:
+        # INSERT OR IGNORE: dos entradas simultáneas con la misma ubicación nueva no chocan
+        creada = db.execute(_SQL_CREAR_UBICACION, {
+            "nombre": " ".join(nombre.split()), "clave": clave, "ahora": datetime.utcnow()
+        })
+        if creada.rowcount:
+            versiones.incrementar(db.connection(), "ubicaciones")
+    ubicacion = db.query(models.Ubicacion).filter(models.Ubicacion.clave == clave).first()
+    if ubicacion is None:
+        raise ValueError(f"Ubicación '{nombre}' no encontrada")
+    return ubicacion
+
+def _texto_ubicacion(origen, destino) -> str:
+    """Lo que se guarda en movimientos.ubicacion (texto, como antes)."""
+    if origen is not None and destino is not None:
+        return f"{origen.nombre} → {destino.nombre}"
+    if destino is not None:
+        return destino.nombre
+    return origen.nombre if origen is not None else None
+
+def get_stock_ubicado(db: Session, producto_id: int) -> int:
+    return db.query(func.coalesce(func.sum(models.StockUbicacion.cantidad), 0)).filter(
+        models.StockUbicacion.producto_id == producto_id
+    ).scalar()
+
+def mover_stock_ubicaciones(db: Session, producto, tipo: str, cantidad: int, origen=None, destino=None):
+    """
+    Aplica un movimiento al stock por ubicación dentro de la transacción actual.
+    Llamar antes de modificar producto.stock_actual.
+      entrada: suma en `destino` (si hay)
+      salida: descuenta de `origen`; sin origen, primero del stock sin ubicación
+              y luego de las ubicaciones con más stock
+      traslado: pasa de `origen` (o del stock sin ubicación) a `destino`
+    """
+    ahora = datetime.utcnow()
+    cambios = False
+
+    def descontar(ubicacion_id, unidades):
+        resultado = db.execute(_SQL_DESCONTAR_UBICACION, {
+            "producto_id": producto.id, "ubicacion_id": ubicacion_id, "cantidad": unidades, "ahora": ahora
+        })
+        if resultado.rowcount != 1:
+            nombre = db.get(models.Ubicacion, ubicacion_id).nombre
+            raise ValueError(f"Stock insuficiente de {producto.nombre} en {nombre}")
+
+    if tipo in ("salida", "traslado"):
+        if origen is not None:
+            descontar(origen.id, cantidad)
+            cambios = True
+        else:
+            sin_ubicacion = max((producto.stock_actual or 0) - get_stock_ubicado(db, producto.id), 0)
+            faltante = cantidad - sin_ubicacion
+            if faltante > 0 and tipo == "traslado":
+                raise ValueError(f"Stock sin ubicación insuficiente de {producto.nombre}. Disponible: {sin_ubicacion}")
+            if faltante > 0:
+                ubicadas = db.query(models.StockUbicacion.ubicacion_id, models.StockUbicacion.cantidad).filter(
+                    models.StockUbicacion.producto_id == producto.id, models.StockUbicacion.cantidad > 0
+                ).order_by(desc(models.StockUbicacion.cantidad), models.StockUbicacion.ubicacion_id).all()
+                for ubicacion_id, disponible in ubicadas:
+                    tomar = min(disponible, faltante)
+                    descontar(ubicacion_id, tomar)
+                    cambios = True
+                    faltante -= tomar
+                    if faltante == 0:
+                        break
+    if tipo in ("entrada", "traslado") and destino is not None:
+        db.execute(_SQL_SUMAR_UBICACION, {
+            "producto_id": producto.id, "ubicacion_id": destino.id, "cantidad": cantidad, "ahora": ahora
+        })
+        cambios = True
+    if cambios:
+        versiones.incrementar(db.connection(), "stock_ubicaciones")
+
+def get_ubicaciones_filas(db: Session, incluir_inactivas: bool = False):
+    """Ubicaciones con cuántos productos y unidades tienen."""
+    su = models.StockUbicacion
+    totales = db.query(
+        su.ubicacion_id,
+        func.count(su.producto_id).label("productos"),
+        func.sum(su.cantidad).label("unidades"),
+    ).filter(su.cantidad > 0).group_by(su.ubicacion_id).subquery()
+    query = db.query(
+        models.Ubicacion.id, models.Ubicacion.nombre, models.Ubicacion.descripcion,
+        models.Ubicacion.activa, models.Ubicacion.fecha_creacion,
+        func.coalesce(totales.c.productos, 0).label("productos"),
+        func.coalesce(totales.c.unidades, 0).label("unidades"),
+    ).outerjoin(totales, totales.c.ubicacion_id == models.Ubicacion.id)
+    if not incluir_inactivas:
+        query = query.filter(models.Ubicacion.activa == True)
+    return filas_a_dicts(query.order_by(models.Ubicacion.nombre).all())
+
+_COLUMNAS_STOCK_UBICACION = (
+    models.StockUbicacion.producto_id,
+    models.Producto.codigo,
+    models.Producto.nombre,
+    models.StockUbicacion.ubicacion_id,
+    models.Ubicacion.nombre.label("ubicacion"),
+    models.StockUbicacion.cantidad,
+    models.StockUbicacion.stock_minimo,
+    models.StockUbicacion.actualizado,
+)
+
+def _stock_ubicacion_query(db: Session):
+    return db.query(*_COLUMNAS_STOCK_UBICACION).join(
+        models.Producto, models.Producto.id == models.StockUbicacion.producto_id
+    ).join(models.Ubicacion, models.Ubicacion.id == models.StockUbicacion.ubicacion_id)
+
+def get_stock_en_ubicacion(db: Session, ubicacion_id: int, producto_id: int = None, skip: int = 0, limit: int = 100):
+    """Qué hay en una ubicación (índice por ubicacion_id)."""
+    query = _stock_ubicacion_query(db).filter(
+        models.StockUbicacion.ubicacion_id == ubicacion_id, models.StockUbicacion.cantidad > 0
+    )
+    if producto_id is not None:
+        query = query.filter(models.StockUbicacion.producto_id == producto_id)
+    return filas_a_dicts(query.order_by(models.Producto.nombre).offset(skip).limit(limit).all())
+
+def get_stock_producto_por_ubicacion(db: Session, producto):
+    """Dónde está un producto (clave primaria), más el stock sin ubicación asignada."""
+    filas = filas_a_dicts(_stock_ubicacion_query(db).filter(
+        models.StockUbicacion.producto_id == producto.id
+    ).order_by(desc(models.StockUbicacion.cantidad)).all())
+    ubicado = sum(f["cantidad"] for f in filas)
+    return {
+        "producto_id": producto.id,
+        "stock_actual": producto.stock_actual,
+        "sin_ubicacion": max((producto.stock_actual or 0) - ubicado, 0),
+        "ubicaciones": filas,
+    }
+
+def get_stock_bajo_minimo_ubicacion(db: Session, ubicacion_id: int = None, limit: int = 500):
+    """Productos bajo el mínimo de su ubicación (índice parcial cantidad < stock_minimo)."""
+    su = models.StockUbicacion
+    query = _stock_ubicacion_query(db).filter(su.cantidad < su.stock_minimo)
+    if ubicacion_id is not None:
+        query = query.filter(su.ubicacion_id == ubicacion_id)
+    return filas_a_dicts(query.order_by(su.ubicacion_id, su.producto_id).limit(limit).all())
+
+def fijar_minimo_ubicacion(db: Session, ubicacion_id: int, producto_id: int, stock_minimo: int):
+    """Stock mínimo de un producto en una ubicación (crea la fila con cantidad 0 si no existe)."""
+    fila = db.get(models.StockUbicacion, (producto_id, ubicacion_id))
+    if fila is None:
+        fila = models.StockUbicacion(producto_id=producto_id, ubicacion_id=ubicacion_id, cantidad=0)
+        db.add(fila)
+    fila.stock_minimo = stock_minimo
+    fila.actualizado = datetime.utcnow()
+    db.commit()
+    return fila
+
+# ---------------------------
+# Lotes y vencimientos (FEFO)
+# ---------------------------
+# Solo descuenta si alcanza: la comprobación y la resta son una sola sentencia
+_SQL_DESCONTAR_LOTE = text("UPDATE lotes SET cantidad = cantidad - :cantidad WHERE id = :id AND cantidad >= :cantidad")
+
+def _fecha(valor):
+    """Fecha desde date o texto ISO (las líneas de las entradas múltiples llegan como dict)."""
+    if not valor:
+        return None
+    if isinstance(valor, str):
+        try:
+            return datetime.strptime(valor[:10], "%Y-%m-%d").date()
+        except ValueError:
+            raise ValueError(f"Fecha de vencimiento inválida: {valor}")
+    return valor
+
+def get_stock_en_lotes(db: Session, producto_id: int) -> int:
+    return db.query(func.coalesce(func.sum(models.Lote.cantidad), 0)).filter(
+        models.Lote.producto_id == producto_id, models.Lote.cantidad > 0
+    ).scalar()
+
+def asignar_lotes(db: Session, producto, movimiento, tipo: str, cantidad: int,
+                  codigo: str = None, fecha_vencimiento=None, lote_id: int = None):
+    """
+    Aplica un movimiento a los lotes dentro de la transacción actual.
+    Llamar antes de modificar producto.stock_actual.
+      entrada: con `codigo` o `fecha_vencimiento` crea un lote
+      salida: descuenta de `lote_id` o, si no se indica, FEFO: lotes vigentes por
+              vencimiento, luego lotes sin vencimiento y por último el stock sin lote.
+              Los lotes vencidos no se asignan solos: salen indicando lote_id.
+    """
+    if tipo == "entrada":
+        if codigo or fecha_vencimiento:
+            lote = models.Lote(
+                producto_id=producto.id, codigo=codigo, fecha_vencimiento=fecha_vencimiento,
+                cantidad_inicial=cantidad, cantidad=cantidad, movimiento=movimiento
+            )
+            db.add(models.MovimientoLote(movimiento=movimiento, lote=lote, cantidad=cantidad))
+        return
+    if tipo != "salida":
+        return
+
+    def descontar(id_lote, unidades):
+        if db.execute(_SQL_DESCONTAR_LOTE, {"id": id_lote, "cantidad": unidades}).rowcount != 1:
+            raise ValueError(f"Stock insuficiente en el lote {id_lote} de {producto.nombre}")
+        db.add(models.MovimientoLote(movimiento=movimiento, lote_id=id_lote, cantidad=unidades))
+
+    if lote_id is not None:
+        lote = db.get(models.Lote, lote_id)
+        if lote is None or lote.producto_id != producto.id:
+            raise ValueError(f"Lote {lote_id} no encontrado para {producto.nombre}")
+        descontar(lote_id, cantidad)
+        versiones.incrementar(db.connection(), "lotes")
+        return
+
+    hoy = datetime.utcnow().date()
+    lote = models.Lote
+    # Ambas consultas recorren idx_lote_fefo en orden
+    vigentes = db.query(lote.id, lote.cantidad).filter(
+        lote.producto_id == producto.id, lote.cantidad > 0, lote.fecha_vencimiento >= hoy
+    ).order_by(lote.fecha_vencimiento, lote.id).all()
+    sin_vencimiento = db.query(lote.id, lote.cantidad).filter(
+        lote.producto_id == producto.id, lote.cantidad > 0, lote.fecha_vencimiento.is_(None)
+    ).order_by(lote.id).all()
+    disponibles = vigentes + sin_vencimiento
+    sin_lote = max((producto.stock_actual or 0) - get_stock_en_lotes(db, producto.id), 0)
+    asignable = sum(c for _, c in disponibles) + sin_lote
+    if asignable < cantidad:
+        raise ValueError(
+            f"Solo hay {asignable} unidades vigentes de {producto.nombre}; "
+            "el resto está vencido (indique el lote para darlo de baja)"
+        )
+    faltante = cantidad
+    for id_lote, disponible in disponibles:
+        if faltante == 0:
+            break
+        tomar = min(disponible, faltante)
+        descontar(id_lote, tomar)
+        faltante -= tomar
+    if faltante < cantidad:
+        versiones.incrementar(db.connection(), "lotes")
+
+_COLUMNAS_LOTE = (
+    models.Lote.id,
+    models.Lote.producto_id,
+    models.Producto.codigo.label("producto_codigo"),
+    models.Producto.nombre.label("producto_nombre"),
+    models.Lote.codigo,
+    models.Lote.fecha_vencimiento,
+    models.Lote.cantidad_inicial,
+    models.Lote.cantidad,
+    models.Lote.fecha_ingreso,
+)
+
+def _con_dias_restantes(filas, hoy):
+    for fila in filas:
+        vence = fila["fecha_vencimiento"]
+        fila["dias_restantes"] = (vence - hoy).days if vence else None
+        fila["vencido"] = bool(vence and vence < hoy)
+    return filas
+
+def get_lotes_por_vencer(db: Session, dias: int = 30, limit: int = 500):
+    """Lotes con saldo que vencen en los próximos `dias` (y los ya vencidos), por idx_lote_vencimiento."""
+    hoy = datetime.utcnow().date()
+    filas = filas_a_dicts(db.query(*_COLUMNAS_LOTE).join(
+        models.Producto, models.Producto.id == models.Lote.producto_id
+    ).filter(
+        models.Lote.cantidad > 0,
+        models.Lote.fecha_vencimiento <= hoy + timedelta(days=dias)
+    ).order_by(models.Lote.fecha_vencimiento, models.Lote.id).limit(limit).all())
+    return _con_dias_restantes(filas, hoy)
+
+def get_lotes_producto(db: Session, producto_id: int, incluir_agotados: bool = False):
+    """Lotes de un producto en orden FEFO (los sin vencimiento al final)."""
+    query = db.query(*_COLUMNAS_LOTE).join(
+        models.Producto, models.Producto.id == models.Lote.producto_id
+    ).filter(models.Lote.producto_id == producto_id)
+    if not incluir_agotados:
+        query = query.filter(models.Lote.cantidad > 0)
+    filas = filas_a_dicts(query.order_by(
+        models.Lote.fecha_vencimiento.is_(None), models.Lote.fecha_vencimiento, models.Lote.id
+    ).all())
+    return _con_dias_restantes(filas, datetime.utcnow().date())
+
+def get_productos_para_etiquetas(db: Session, producto_ids: list = None, codigos: list = None,
+                                 categoria: str = None, creados_desde=None):
+    """
+    Consulta de (codigo, nombre) de los productos seleccionados para etiquetas.
+    Devuelve la query sin ejecutar para poder recorrerla por bloques.
+    """
+    query = db.query(models.Producto.codigo, models.Producto.nombre)
+    if producto_ids:
+        query = query.filter(models.Producto.id.in_(producto_ids))
+    if codigos:
+        query = query.filter(models.Producto.codigo.in_(codigos))
+    if categoria:
+        query = query.filter(models.Producto.categoria == categoria)
+    if creados_desde:
+        query = query.filter(models.Producto.fecha_creacion >= creados_desde)
+    return query.order_by(models.Producto.id)
 
 # ---------------------------
 # Búsqueda de productos
@@ -139,6 +810,15 @@ def crear_salida_multiple(db: Session, productos: list, destino: str, razon: str
     movimientos_creados = []
     
     try:
+        documento = models.Documento(
+            tipo="salida",
+            destino=destino,
+            razon=razon,
+            observaciones=observaciones,
+            usuario=usuario
+        )
+        db.add(documento)
+        
         # Verificar stock
         for item in productos:
             producto = get_producto(db, item['producto_id'])
@@ -150,14 +830,21 @@ def crear_salida_multiple(db: Session, productos: list, destino: str, razon: str
         # Crear movimientos
         for item in productos:
             producto = get_producto(db, item['producto_id'])
+            origen = resolver_ubicacion(db, item.get('ubicacion_id'))
             db_movimiento = models.Movimiento(
                 producto_id=item['producto_id'],
                 tipo="salida",
                 cantidad=item['cantidad'],
                 motivo=razon,
                 notas=f"Destino: {destino}" + (f" - {observaciones}" if observaciones else ""),
-                usuario=usuario
+                cliente_destino=destino,
+                ubicacion=origen.nombre if origen else None,
+                ubicacion_id=origen.id if origen else None,
+                usuario=usuario,
+                documento=documento
             )
+            mover_stock_ubicaciones(db, producto, "salida", item['cantidad'], origen=origen)
+            asignar_lotes(db, producto, db_movimiento, "salida", item['cantidad'], lote_id=item.get('lote_id'))
             producto.stock_actual -= item['cantidad']
             db.add(db_movimiento)
             movimientos_creados.append(db_movimiento)
@@ -189,10 +876,23 @@ def crear_entrada_multiple(
     movimientos_creados = []
     
     try:
+        documento = models.Documento(
+            tipo="entrada",
+            razon=tipo_origen.capitalize(),
+            tipo_origen=tipo_origen,
+            origen_nombre=origen_nombre,
+            ubicacion=ubicacion,
+            observaciones=observaciones,
+            usuario=usuario
+        )
+        db.add(documento)
+        ubicacion_documento = resolver_ubicacion(db, nombre=ubicacion, crear=True)
+        
         for item in productos:
             producto = get_producto(db, item['producto_id'])
             if not producto:
                 raise ValueError(f"Producto ID {item['producto_id']} no encontrado")
+            destino = resolver_ubicacion(db, item.get('ubicacion_id')) or ubicacion_documento
             
             # Crear movimiento
             db_movimiento = models.Movimiento(
@@ -202,12 +902,17 @@ def crear_entrada_multiple(
                 motivo=tipo_origen.capitalize(),
                 tipo_origen=tipo_origen,
                 origen_nombre=origen_nombre,
-                ubicacion=ubicacion,
+                ubicacion=destino.nombre if destino else ubicacion,
+                ubicacion_id=destino.id if destino else None,
                 notas=observaciones,
-                usuario=usuario
+                usuario=usuario,
+                documento=documento
             )
             
-            # Actualizar stock
+            # Actualizar stock (total y de la ubicación)
+            mover_stock_ubicaciones(db, producto, "entrada", item['cantidad'], destino=destino)
+            asignar_lotes(db, producto, db_movimiento, "entrada", item['cantidad'], codigo=item.get('lote'),
+                          fecha_vencimiento=_fecha(item.get('fecha_vencimiento')))
             producto.stock_actual += item['cantidad']
             
             db.add(db_movimiento)
@@ -225,3 +930,47 @@ def crear_entrada_multiple(
         raise e
     
  
+
+
+# ---------------------------
+# Documentos
+# ---------------------------
+def _agregar_lineas_archivadas(db: Session, documentos: list):
+    """
+    Suma a documento.movimientos las líneas que ya están en el archivo, solo si
+    algún documento llega a él. Se fijan como valor cargado (set_committed_value):
+    son de solo lectura y la sesión no las ve como cambios.
+    """
+    documentos = [d for d in documentos if d is not None]
+    if not documentos or not archivo.alcanza(db, min(d.fecha for d in documentos)):
+        return
+    archivadas = db.query(models.MovimientoArchivado).options(
+        joinedload(models.MovimientoArchivado.producto)
+    ).filter(models.MovimientoArchivado.documento_id.in_([d.id for d in documentos])).all()
+    por_documento = {}
+    for linea in archivadas:
+        por_documento.setdefault(linea.documento_id, []).append(linea)
+    for documento in documentos:
+        if documento.id in por_documento:
+            lineas = list(documento.movimientos) + por_documento[documento.id]
+            set_committed_value(documento, "movimientos", sorted(lineas, key=lambda m: m.id))
+
+def get_documento(db: Session, documento_id: int):
+    """
+    Documento con sus líneas y productos en una sola consulta (JOIN), más las archivadas.
+    """
+    documento = db.query(models.Documento).options(
+        joinedload(models.Documento.movimientos).joinedload(models.Movimiento.producto)
+    ).filter(models.Documento.id == documento_id).first()
+    _agregar_lineas_archivadas(db, [documento])
+    return documento
+
+def get_documentos(db: Session, tipo: str = None, skip: int = 0, limit: int = 50):
+    query = db.query(models.Documento).options(
+        joinedload(models.Documento.movimientos).joinedload(models.Movimiento.producto)
+    )
+    if tipo:
+        query = query.filter(models.Documento.tipo == tipo)
+    documentos = query.order_by(desc(models.Documento.fecha)).offset(skip).limit(limit).all()
+    _agregar_lineas_archivadas(db, documentos)
+    return documentos
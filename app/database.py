@@ -1,12 +1,21 @@
 # app/database.py - Versión final probada
-from sqlalchemy import create_engine, event
+from sqlalchemy import create_engine, event, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
 import os
+import time
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DATABASE_URL = f"sqlite:///{os.path.join(BASE_DIR, 'inventario.db')}"
+# INVENTARIO_DB apunta la app a otra base (p. ej. la sintética de los benchmarks)
+DB_PATH = os.getenv("INVENTARIO_DB") or os.path.join(BASE_DIR, "inventario.db")
+DATABASE_URL = f"sqlite:///{DB_PATH}"
+
+# Base de archivo, junto a la principal: los movimientos viejos se mueven ahí (ver utils/archivo.py).
+# Se adjunta como "archivo" si el archivado está activo o si ya hay datos archivados
+ARCHIVO_DB = os.getenv("INVENTARIO_ARCHIVO_DB") or os.path.splitext(DB_PATH)[0] + "_archivo.db"
+ARCHIVO_ADJUNTO = int(os.getenv("INVENTARIO_ARCHIVO_DIAS", "0")) > 0 or os.path.exists(ARCHIVO_DB)
 
 @event.listens_for(Engine, "connect")
 def set_sqlite_pragma(dbapi_connection, connection_record):
@@ -24,13 +33,24 @@ def set_sqlite_pragma(dbapi_connection, connection_record):
 # Pool de conexiones (opcional, puedes agregarlo después)
 engine = create_engine(
     DATABASE_URL,
-    connect_args={"check_same_thread": False},
+    # timeout: con varios workers las escrituras de otros procesos esperan el lock en vez de fallar
+    connect_args={"check_same_thread": False, "timeout": 15},
     pool_size=10,
     max_overflow=20,
     pool_pre_ping=True,
     echo=False
 )
 
+@event.listens_for(engine, "connect")
+def adjuntar_archivo(dbapi_connection, connection_record):
+    if not ARCHIVO_ADJUNTO:
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute("ATTACH DATABASE ? AS archivo", (ARCHIVO_DB,))
+    cursor.execute("PRAGMA archivo.journal_mode=WAL")
+    cursor.execute("PRAGMA archivo.synchronous=NORMAL")
+    cursor.close()
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -41,6 +61,93 @@ def get_db():
     finally:
         db.close()
 
+def tablas_a_crear(adjunto: bool = None):
+    """
+    Tablas de la base principal, más las del archivo si está adjunto.
+    Usar con create_all: sin la base "archivo" adjunta, crear archivo.movimientos falla.
+    """
+    adjunto = ARCHIVO_ADJUNTO if adjunto is None else adjunto
+    return [tabla for tabla in Base.metadata.sorted_tables if tabla.schema is None or adjunto]
+
 def init_db():
-    Base.metadata.create_all(bind=engine)
-    print("✅ Base de datos inicializada correctamente")
\ No newline at end of file
+    inspector = inspect(engine)
+    nuevas = [tabla for tabla in RELLENOS_TABLAS
+              if tabla in Base.metadata.tables and not inspector.has_table(tabla)]
+    # Con varios workers todos inicializan a la vez: si otro proceso creó la
+    # misma tabla, columna o índice entre la comprobación y el CREATE, se reintenta
+    for intento in range(3):
+        try:
+            Base.metadata.create_all(bind=engine, tables=tablas_a_crear())
+            migrar_esquema()
+            break
+        except OperationalError as e:
+            if intento == 2 or not any(m in str(e) for m in ("already exists", "duplicate column")):
+                raise
+            time.sleep(0.2)
+    if nuevas:
+        with engine.begin() as conn:
+            for tabla in nuevas:
+                conn.execute(text(RELLENOS_TABLAS[tabla]))
+    print("✅ Base de datos inicializada correctamente")
+
+def _rellenar_codigo_normalizado(conn):
+    # Un solo UPDATE con la función de Python registrada en la conexión. Si dos
+    # códigos existentes son el mismo GTIN (p. ej. con y sin el cero inicial),
+    # solo el producto más viejo lo recibe: el índice es único
+    from .utils.codigos import normalizar_codigo
+
+    conn.connection.dbapi_connection.create_function("normalizar_codigo", 1, normalizar_codigo, deterministic=True)
+    conn.execute(text(
+        "UPDATE productos SET codigo_normalizado = normalizar_codigo(codigo) "
+        "WHERE id IN (SELECT MIN(id) FROM productos GROUP BY normalizar_codigo(codigo))"
+    ))
+    repetidos = conn.execute(text("SELECT COUNT(*) FROM productos WHERE codigo_normalizado IS NULL")).scalar()
+    if repetidos:
+        print(f"⚠️ {repetidos} productos con un código repetido (mismo GTIN) o vacío quedaron sin codigo_normalizado")
+
+# Relleno de columnas calculadas: se ejecuta una vez, al agregar la columna a una base existente
+# (SQL, o una función que recibe la conexión)
+RELLENOS = {
+    ("productos", "bajo_stock"):
+        "UPDATE productos SET bajo_stock = (COALESCE(stock_actual, 0) < COALESCE(stock_minimo, 0))",
+    ("productos", "codigo_normalizado"): _rellenar_codigo_normalizado,
+}
+
+# Tablas derivadas: se llenan una vez, al crearlas en una base existente
+# (INSERT OR IGNORE porque varios workers pueden crearlas a la vez)
+RELLENOS_TABLAS = {
+    "resumen_diario":
+        "INSERT OR IGNORE INTO resumen_diario (fecha, producto_id, tipo, cantidad, movimientos) "
+        "SELECT date(fecha_movimiento), producto_id, tipo, SUM(cantidad), COUNT(*) FROM movimientos "
+        "WHERE producto_id IS NOT NULL AND fecha_movimiento IS NOT NULL "
+        "GROUP BY date(fecha_movimiento), producto_id, tipo",
+}
+
+def migrar_esquema():
+    """
+    create_all no modifica tablas existentes: agrega las columnas
+    e índices nuevos de los modelos a una base ya creada.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for tabla in tablas_a_crear():
+            if not inspector.has_table(tabla.name, schema=tabla.schema):
+                continue
+            existentes = {c["name"] for c in inspector.get_columns(tabla.name, schema=tabla.schema)}
+            for columna in tabla.columns:
+                if columna.name in existentes:
+                    continue
+                ddl = f"ALTER TABLE {tabla.fullname} ADD COLUMN {columna.name} {columna.type.compile(dialect=engine.dialect)}"
+                if columna.server_default is not None:
+                    ddl += f" DEFAULT {columna.server_default.arg}"
+                for fk in columna.foreign_keys:
+                    ddl += f" REFERENCES {fk.column.table.name}({fk.column.name})"
+                conn.execute(text(ddl))
+                print(f"🛠️ Columna agregada: {tabla.fullname}.{columna.name}")
+                relleno = RELLENOS.get((tabla.fullname, columna.name))
+                if callable(relleno):
+                    relleno(conn)
+                elif relleno:
+                    conn.execute(text(relleno))
+            for indice in tabla.indexes:
+                indice.create(conn, checkfirst=True)
\ No newline at end of file
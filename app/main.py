@@ -1,65 +1,98 @@
 # app/main.py
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, Depends
-from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
 from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
 from .database import get_db, init_db
 from . import crud, schemas
-from .routers import productos, movimientos, inventario
+from .routers import productos, movimientos, inventario, documentos, sistema, eventos, ubicaciones
+from .utils import cache_local, procesos, tareas
+from .utils import archivo, clasificacion, mantenimiento, pronostico, verificador  # registran sus tareas periódicas
+from .utils.codigos import normalizar_codigo
+from .utils.eventos import difusor
+from .utils.estaticos import ArchivosEstaticos, static_url
+from .utils.http_cache import CompresionGZip
+from .utils.perfilador import PerfiladorMiddleware
+from .utils.plantillas import PaginasEstaticas, crear_templates, precompilar
 from sqlalchemy.orm import Session
 from app.routers import inventario as dashboard_router
 
-# ===== Inicializar base de datos al iniciar la app (sin bloquear) =====
-init_db()  # Se ejecuta antes de crear la app
+# ===== Ciclo de vida =====
+# La base se inicializa al arrancar el servidor y no al importar el módulo,
+# así importar la app (tests, scripts, workers) no toca la base de datos
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    init_db()
+    print(f"🧩 Plantillas compiladas: {precompilar(templates)}")
+    await difusor.iniciar()
+    tareas.iniciar()
+    yield
+    await tareas.detener()
+    await difusor.detener()
+    procesos.cerrar_pool()
 
 # ===== Crear app =====
 app = FastAPI(
     title="Sistema de Inventario FIMLM",
     description="Gestión de inventario con códigos QR y escaneo por cámara",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# ===== Compresión de respuestas (JSON y páginas) =====
+app.add_middleware(CompresionGZip, minimum_size=1024)
+
+# ===== Perfilado a pedido (X-Perfilar con INVENTARIO_ADMIN_TOKEN) =====
+app.add_middleware(PerfiladorMiddleware)
+
 # ===== Archivos estáticos y templates =====
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
-templates = Jinja2Templates(directory="app/templates")
+app.mount("/static", ArchivosEstaticos(directory="app/static"), name="static")
+templates = crear_templates("app/templates")
+templates.env.globals["static_url"] = static_url
+paginas = PaginasEstaticas(templates)
 
 # ===== Routers API =====
 app.include_router(productos.router, prefix="/api")
 app.include_router(movimientos.router, prefix="/api")
 app.include_router(inventario.router, prefix="/api")
+app.include_router(documentos.router, prefix="/api")
+app.include_router(sistema.router, prefix="/api")
+app.include_router(eventos.router, prefix="/api")
+app.include_router(ubicaciones.router, prefix="/api")
 app.include_router(dashboard_router.router, prefix="/api")
 
 # ===== RUTAS FRONTEND =====
+HISTORIAL_POR_PAGINA = 50
+
 @app.get("/", response_class=HTMLResponse)
 async def root(request: Request):
-    return templates.TemplateResponse("index.html", {"request": request, "title": "Inventario FIMLM"})
+    return paginas.respuesta(request, "index.html", "Inventario FIMLM")
 
 @app.get("/productos", response_class=HTMLResponse)
 async def pagina_productos(request: Request):
-    return templates.TemplateResponse("productos.html", {"request": request, "title": "Productos"})
+    return paginas.respuesta(request, "productos.html", "Productos")
 
 @app.get("/productos/crear", response_class=HTMLResponse)
 async def pagina_crear_producto(request: Request):
-    return templates.TemplateResponse("crear_producto.html", {"request": request, "title": "Crear Producto"})
+    return paginas.respuesta(request, "crear_producto.html", "Crear Producto")
 @app.get("/productos/cargar-excel", response_class=HTMLResponse)
 async def pagina_cargar_excel(request: Request):
-    return templates.TemplateResponse("cargar_excel.html", {"request": request, "title": "Carga Masiva de Productos"})
+    return paginas.respuesta(request, "cargar_excel.html", "Carga Masiva de Productos")
 
 @app.get("/entrada", response_class=HTMLResponse)
 async def pagina_entrada(request: Request):
-    return templates.TemplateResponse("entrada.html", {"request": request, "title": "Entrada de Productos"})
+    return paginas.respuesta(request, "entrada.html", "Entrada de Productos")
 
 @app.get("/salida", response_class=HTMLResponse)
 async def pagina_salida(request: Request):
-    return templates.TemplateResponse("salida.html", {"request": request, "title": "Salida de Productos"})
+    return paginas.respuesta(request, "salida.html", "Salida de Productos")
 
 @app.get("/movimientos", response_class=HTMLResponse)
 async def pagina_movimientos(request: Request):
-    return templates.TemplateResponse("movimientos.html", {"request": request, "title": "Movimientos"})
+    return paginas.respuesta(request, "movimientos.html", "Movimientos")
 
 @app.get("/escanear", response_class=HTMLResponse)
 async def pagina_escanear(request: Request):
-    return templates.TemplateResponse("escanear.html", {"request": request, "title": "Escanear Códigos"})
+    return paginas.respuesta(request, "escanear.html", "Escanear Códigos")
 
 @app.get("/productos/{producto_id}/detalle", response_class=HTMLResponse)
 async def pagina_detalle_producto(request: Request, producto_id: int, db: Session = Depends(get_db)):
@@ -70,10 +103,14 @@ async def pagina_detalle_producto(request: Request, producto_id: int, db: Sessio
             {"request": request, "title": "Error", "error": "Producto no encontrado"},
             status_code=404
         )
-    historial = crud.get_movimientos_por_producto(db, producto_id=producto_id)
+    # Totales en SQL y solo la primera página del historial; el resto se pide por cursor
+    resumen = crud.get_resumen_movimientos_producto(db, producto_id=producto_id)
+    historial, siguiente_cursor = crud.get_historial_producto(db, producto_id=producto_id, limite=HISTORIAL_POR_PAGINA)
     return templates.TemplateResponse(
         "detalle_producto.html",
-        {"request": request, "title": f"Producto: {producto.nombre}", "producto": producto, "historial": historial}
+        {"request": request, "title": f"Producto: {producto.nombre}", "producto": producto,
+         "resumen": resumen, "historial": historial, "siguiente_cursor": siguiente_cursor,
+         "historial_por_pagina": HISTORIAL_POR_PAGINA}
     )
 
 @app.get("/productos/{producto_id}/editar", response_class=HTMLResponse)
@@ -92,7 +129,7 @@ async def pagina_editar_producto(request: Request, producto_id: int, db: Session
 
 @app.get("/productos/cargar-excel", response_class=HTMLResponse)
 async def pagina_cargar_excel(request: Request):
-    return templates.TemplateResponse("cargar_excel.html", {"request": request, "title": "Cargar Productos desde Excel"})
+    return paginas.respuesta(request, "cargar_excel.html", "Cargar Productos desde Excel")
 
 # ===== REDIRECCIONES =====
 @app.get("/volver-a-productos")
@@ -110,13 +147,15 @@ async def test_endpoint():
 
 @app.post("/api/escanear")
 async def procesar_codigo_escaneado(codigo: schemas.CodigoEscaneado, db: Session = Depends(get_db)):
-    producto = crud.get_producto_por_codigo(db, codigo.codigo)
+    producto = cache_local.productos_por_codigo.obtener(
+        db, normalizar_codigo(codigo.codigo), lambda: crud.get_producto_por_codigo_fila(db, codigo.codigo)
+    )
     if producto:
         return {
             "encontrado": True,
             "producto": producto,
-            "mensaje": f"Producto encontrado: {producto.nombre}",
-            "stock_actual": producto.stock_actual,
+            "mensaje": f"Producto encontrado: {producto['nombre']}",
+            "stock_actual": producto["stock_actual"],
             "accion_sugerida": codigo.tipo_operacion
         }
     return {"encontrado": False, "codigo": codigo.codigo, "mensaje": "Producto no encontrado.", "accion_sugerida": "crear_producto"}
@@ -1,6 +1,6 @@
 # app/models.py
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Index
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Text, Index, Boolean, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from .database import Base
@@ -13,15 +13,23 @@ class Producto(Base):
         Index('idx_producto_codigo', 'codigo'),        # Búsqueda por código
         Index('idx_producto_nombre', 'nombre'),        # Búsqueda por nombre
         Index('idx_producto_categoria', 'categoria'),  # Filtros por categoría
+        Index('idx_producto_bajo_stock', 'bajo_stock', sqlite_where=text('bajo_stock = 1')),  # Solo los que están bajo el mínimo
+        Index('idx_producto_clase_abc', 'clase_abc'),  # Filtro por clase ABC
+        Index('idx_producto_codigo_normalizado', 'codigo_normalizado', unique=True),  # Búsqueda al escanear
     )
     
     id = Column(Integer, primary_key=True, index=True)
     codigo = Column(String(50), unique=True, index=True, nullable=False)
+    # Forma canónica del código (GTIN a 14 dígitos), mantenida al escribir (ver utils/codigos.py)
+    codigo_normalizado = Column(String(50), nullable=True)
     nombre = Column(String(200), nullable=False)
     descripcion = Column(Text, nullable=True)
     categoria = Column(String(100), nullable=True)
     stock_minimo = Column(Integer, default=0)
     stock_actual = Column(Integer, default=0)
+    # stock_actual < stock_minimo, mantenido al escribir (ver utils/alertas.py) para poder indexarlo
+    bajo_stock = Column(Boolean, nullable=False, default=False, server_default="0")
+    clase_abc = Column(String(1), nullable=True)  # A, B o C según las salidas (ver utils/clasificacion.py)
     fecha_creacion = Column(DateTime(timezone=True), server_default=func.now())
     fecha_actualizacion = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -37,22 +45,272 @@ class Movimiento(Base):
         Index('idx_movimiento_producto', 'producto_id'),        # JOIN con productos
         Index('idx_movimiento_tipo', 'tipo'),                   # Filtrar entrada/salida
         Index('idx_movimiento_fecha_tipo', 'fecha_movimiento', 'tipo'),  # Filtros compuestos
+        Index('idx_movimiento_documento', 'documento_id'),      # Líneas de un documento
+        Index('idx_movimiento_producto_fecha', 'producto_id', 'fecha_movimiento', 'id'),  # Historial paginado
+        Index('idx_movimiento_ubicacion', 'ubicacion_id'),      # Movimientos de una ubicación
+        Index('idx_movimiento_saldo', 'producto_id', 'tipo', 'cantidad'),  # Saldo por producto solo desde el índice (verificador)
+        # Los id no se reutilizan aunque se archive o borre el último: en el archivo conservan el suyo
+        {"sqlite_autoincrement": True},
     )
     
     id = Column(Integer, primary_key=True, index=True)
     producto_id = Column(Integer, ForeignKey("productos.id"))
-    tipo = Column(String, nullable=False)  # entrada o salida
+    tipo = Column(String, nullable=False)  # entrada, salida o traslado
     cantidad = Column(Integer, nullable=False)
     motivo = Column(String, nullable=True)
     tipo_origen = Column(String, nullable=True)  # compra, donacion, etc.
     origen_nombre = Column(String, nullable=True)  # Nombre del proveedor/donante
-    ubicacion = Column(String, nullable=True)
+    ubicacion = Column(String, nullable=True)  # Nombre, como texto (histórico)
+    ubicacion_id = Column(Integer, ForeignKey("ubicaciones.id"), nullable=True)  # Dónde entra / de dónde sale
+    ubicacion_destino_id = Column(Integer, ForeignKey("ubicaciones.id"), nullable=True)  # Solo traslados
     notas = Column(String, nullable=True)
     cliente_destino = Column(String, nullable=True)  # Para salidas
     usuario = Column(String, nullable=False, default="admin")
     fecha_movimiento = Column(DateTime, default=datetime.utcnow)
     pdf_firmado = Column(String, nullable=True)  # Ruta del archivo PDF
     pdf_nombre = Column(String, nullable=True)   # Nombre original del archivo
+    documento_id = Column(Integer, ForeignKey("documentos.id"), nullable=True)  # Lote al que pertenece
     
     # Relación
-    producto = relationship("Producto", back_populates="movimientos")
\ No newline at end of file
+    producto = relationship("Producto", back_populates="movimientos")
+    documento = relationship("Documento", back_populates="movimientos")
+
+class MovimientoArchivado(Base):
+    """
+    Movimientos viejos movidos a la base adjunta "archivo" (ver utils/archivo.py).
+    Mismas columnas y mismos id que en movimientos; sin claves foráneas porque
+    SQLite no las admite entre bases distintas.
+    """
+    __tablename__ = "movimientos"
+
+    __table_args__ = (
+        Index('idx_archivo_fecha', 'fecha_movimiento'),                          # Rangos de fechas
+        Index('idx_archivo_producto_fecha', 'producto_id', 'fecha_movimiento', 'id'),  # Historial paginado
+        Index('idx_archivo_saldo', 'producto_id', 'tipo', 'cantidad'),           # Saldo por producto (verificador)
+        {"schema": "archivo"},
+    )
+
+    id = Column(Integer, primary_key=True)
+    producto_id = Column(Integer)
+    tipo = Column(String, nullable=False)
+    cantidad = Column(Integer, nullable=False)
+    motivo = Column(String, nullable=True)
+    tipo_origen = Column(String, nullable=True)
+    origen_nombre = Column(String, nullable=True)
+    ubicacion = Column(String, nullable=True)
+    ubicacion_id = Column(Integer, nullable=True)
+    ubicacion_destino_id = Column(Integer, nullable=True)
+    notas = Column(String, nullable=True)
+    cliente_destino = Column(String, nullable=True)
+    usuario = Column(String, nullable=False, default="admin")
+    fecha_movimiento = Column(DateTime)
+    pdf_firmado = Column(String, nullable=True)
+    pdf_nombre = Column(String, nullable=True)
+    documento_id = Column(Integer, nullable=True)
+
+    # Solo lectura: el producto sigue en la base principal
+    producto = relationship(
+        "Producto", primaryjoin="foreign(MovimientoArchivado.producto_id) == Producto.id", viewonly=True
+    )
+
+class Documento(Base):
+    """Agrupa los movimientos creados juntos en una entrada o salida múltiple."""
+    __tablename__ = "documentos"
+    
+    __table_args__ = (
+        Index('idx_documento_fecha', 'fecha'),
+        Index('idx_documento_tipo_fecha', 'tipo', 'fecha'),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    tipo = Column(String, nullable=False)  # entrada o salida
+    destino = Column(String, nullable=True)  # Para salidas
+    razon = Column(String, nullable=True)
+    tipo_origen = Column(String, nullable=True)  # Para entradas
+    origen_nombre = Column(String, nullable=True)
+    ubicacion = Column(String, nullable=True)
+    observaciones = Column(String, nullable=True)
+    usuario = Column(String, nullable=False, default="admin")
+    fecha = Column(DateTime, default=datetime.utcnow)
+    
+    movimientos = relationship("Movimiento", back_populates="documento", order_by="Movimiento.id")
+class VersionTabla(Base):
+    """Contador de escrituras por tabla (ETags, cachés entre procesos)."""
+    __tablename__ = "versiones_tabla"
+    
+    tabla = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    actualizado = Column(DateTime, nullable=True)
+
+class SecuenciaCodigo(Base):
+    """Último número asignado por prefijo y día a los códigos de producto (ver utils/codigos.py)."""
+    __tablename__ = "secuencias_codigo"
+    __table_args__ = {"sqlite_with_rowid": False}
+    
+    prefijo = Column(String(10), primary_key=True)
+    fecha = Column(String(8), primary_key=True)  # YYYYMMDD
+    ultimo = Column(Integer, nullable=False, default=0)
+
+class EventoStock(Base):
+    """
+    Cambios de stock para el stream en tiempo real (/api/eventos).
+    Se escriben en la misma transacción que el cambio; cada worker los lee
+    por id creciente y los reparte a sus clientes.
+    """
+    __tablename__ = "eventos_stock"
+    __table_args__ = (
+        Index('idx_evento_stock_fecha', 'fecha'),  # Limpieza de eventos viejos
+    )
+    
+    id = Column(Integer, primary_key=True)
+    producto_id = Column(Integer, nullable=False)  # Sin FK: el evento sobrevive al borrado del producto
+    tipo = Column(String(10), nullable=False)      # cambio, alta o baja
+    stock = Column(Integer, nullable=False)
+    delta = Column(Integer, nullable=False)
+    stock_minimo = Column(Integer, nullable=False, default=0)
+    fecha = Column(DateTime, default=datetime.utcnow)
+
+class AlertaStock(Base):
+    """Cola persistente de alertas: un producto cruzó el stock mínimo (en cualquier sentido)."""
+    __tablename__ = "alertas_stock"
+    __table_args__ = (
+        Index('idx_alerta_pendiente', 'atendida', 'fecha'),  # Alertas sin atender, más nuevas primero
+    )
+    
+    id = Column(Integer, primary_key=True)
+    producto_id = Column(Integer, ForeignKey("productos.id", ondelete="CASCADE"), nullable=False)
+    tipo = Column(String(20), nullable=False)  # bajo_minimo o repuesto
+    stock = Column(Integer, nullable=False)
+    stock_minimo = Column(Integer, nullable=False)
+    fecha = Column(DateTime, default=datetime.utcnow)
+    atendida = Column(Boolean, nullable=False, default=False, server_default="0")
+    fecha_atendida = Column(DateTime, nullable=True)
+    
+    producto = relationship("Producto")
+
+class EstadoTarea(Base):
+    """Estado de las tareas programadas (última ejecución y punto de avance)."""
+    __tablename__ = "estado_tareas"
+    
+    nombre = Column(String(50), primary_key=True)
+    ejecutado = Column(DateTime, nullable=True)            # Último inicio (también sirve de lock entre workers)
+    ultimo_movimiento_id = Column(Integer, nullable=False, default=0, server_default="0")
+    ultimo_completo = Column(DateTime, nullable=True)      # Último recálculo completo
+    duracion_ms = Column(Float, nullable=True)
+
+class PronosticoProducto(Base):
+    """Consumo proyectado y días de cobertura por producto (materializado por una tarea)."""
+    __tablename__ = "pronosticos"
+    __table_args__ = (
+        Index('idx_pronostico_cobertura', 'dias_cobertura'),  # Ordenar por urgencia
+    )
+    
+    producto_id = Column(Integer, ForeignKey("productos.id", ondelete="CASCADE"), primary_key=True)
+    consumo_diario = Column(Float, nullable=False, default=0)       # Promedio de salidas/día (28 días)
+    consumo_diario_7d = Column(Float, nullable=False, default=0)    # Tendencia reciente
+    desviacion_diaria = Column(Float, nullable=False, default=0)    # Variabilidad (28 días)
+    dias_cobertura = Column(Float, nullable=True)                   # None = sin consumo
+    fecha_agotamiento = Column(DateTime, nullable=True)
+    punto_reorden = Column(Integer, nullable=False, default=0)
+    cantidad_sugerida = Column(Integer, nullable=False, default=0)
+    actualizado = Column(DateTime, default=datetime.utcnow)
+
+class ResumenDiario(Base):
+    """Unidades y movimientos por día, producto y tipo (mantenido al escribir, ver utils/resumenes.py)."""
+    __tablename__ = "resumen_diario"
+    __table_args__ = (
+        Index('idx_resumen_producto_fecha', 'producto_id', 'fecha'),  # Series de un producto
+        {"sqlite_with_rowid": False},  # Filas ordenadas por (fecha, producto, tipo): los rangos de fechas se leen seguidos
+    )
+    
+    fecha = Column(Date, primary_key=True)  # Día UTC de fecha_movimiento
+    producto_id = Column(Integer, ForeignKey("productos.id", ondelete="CASCADE"), primary_key=True)
+    tipo = Column(String(10), primary_key=True)  # entrada o salida
+    cantidad = Column(Integer, nullable=False, default=0)
+    movimientos = Column(Integer, nullable=False, default=0)
+
+class ClasificacionABC(Base):
+    """Detalle de la última clasificación ABC (volumen y frecuencia de salidas por producto)."""
+    __tablename__ = "clasificacion_abc"
+    __table_args__ = (
+        Index('idx_clasificacion_ranking', 'ranking'),
+    )
+    
+    producto_id = Column(Integer, ForeignKey("productos.id", ondelete="CASCADE"), primary_key=True)
+    unidades = Column(Integer, nullable=False, default=0)         # Unidades que salieron en la ventana
+    salidas = Column(Integer, nullable=False, default=0)          # Cantidad de movimientos de salida
+    participacion_acumulada = Column(Float, nullable=False, default=0)  # % acumulado de unidades hasta este producto
+    ranking = Column(Integer, nullable=False)                     # 1 = el de más unidades
+    clase_volumen = Column(String(1), nullable=False)
+    clase_frecuencia = Column(String(1), nullable=False)
+    clase = Column(String(1), nullable=False)                     # La mejor de las dos
+    actualizado = Column(DateTime, default=datetime.utcnow)
+
+class Ubicacion(Base):
+    """Bodega, estante o sector donde se guarda stock."""
+    __tablename__ = "ubicaciones"
+    
+    id = Column(Integer, primary_key=True)
+    nombre = Column(String(100), nullable=False)
+    clave = Column(String(100), unique=True, nullable=False)  # Nombre normalizado (minúsculas, sin espacios extra)
+    descripcion = Column(String, nullable=True)
+    activa = Column(Boolean, nullable=False, default=True, server_default="1")
+    fecha_creacion = Column(DateTime, default=datetime.utcnow)
+
+class StockUbicacion(Base):
+    """
+    Stock de cada producto en cada ubicación. La suma por producto nunca supera
+    productos.stock_actual; la diferencia es stock sin ubicación asignada.
+    """
+    __tablename__ = "stock_ubicaciones"
+    __table_args__ = (
+        Index('idx_stock_ubicacion', 'ubicacion_id', 'producto_id'),  # Qué hay en una ubicación
+        # Bajo el mínimo de la ubicación: la consulta debe repetir la condición para usarlo
+        Index('idx_stock_ubicacion_bajo', 'ubicacion_id', sqlite_where=text('cantidad < stock_minimo')),
+        {"sqlite_with_rowid": False},
+    )
+    
+    producto_id = Column(Integer, ForeignKey("productos.id", ondelete="CASCADE"), primary_key=True)
+    ubicacion_id = Column(Integer, ForeignKey("ubicaciones.id", ondelete="CASCADE"), primary_key=True)
+    cantidad = Column(Integer, nullable=False, default=0)
+    stock_minimo = Column(Integer, nullable=False, default=0, server_default="0")
+    actualizado = Column(DateTime, default=datetime.utcnow)
+    
+    producto = relationship("Producto")
+    ubicacion = relationship("Ubicacion")
+
+class Lote(Base):
+    """Lote recibido en una entrada, con su vencimiento y lo que queda de él."""
+    __tablename__ = "lotes"
+    __table_args__ = (
+        # Asignación FEFO: lotes con saldo de un producto, por vencimiento
+        Index('idx_lote_fefo', 'producto_id', 'fecha_vencimiento', 'id', sqlite_where=text('cantidad > 0')),
+        # Reporte de próximos vencimientos
+        Index('idx_lote_vencimiento', 'fecha_vencimiento', sqlite_where=text('cantidad > 0')),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    producto_id = Column(Integer, ForeignKey("productos.id", ondelete="CASCADE"), nullable=False)
+    codigo = Column(String(100), nullable=True)           # Número de lote del proveedor
+    fecha_vencimiento = Column(Date, nullable=True)       # None = no vence
+    cantidad_inicial = Column(Integer, nullable=False)
+    cantidad = Column(Integer, nullable=False)            # Saldo
+    movimiento_id = Column(Integer, ForeignKey("movimientos.id", ondelete="SET NULL"), nullable=True)  # Entrada que lo creó
+    fecha_ingreso = Column(DateTime, default=datetime.utcnow)
+    
+    producto = relationship("Producto")
+    movimiento = relationship("Movimiento")
+
+class MovimientoLote(Base):
+    """De qué lotes salió (o a cuál entró) cada movimiento, para trazabilidad."""
+    __tablename__ = "movimientos_lotes"
+    __table_args__ = (
+        Index('idx_movimiento_lote_lote', 'lote_id'),  # Movimientos de un lote
+    )
+    
+    movimiento_id = Column(Integer, ForeignKey("movimientos.id", ondelete="CASCADE"), primary_key=True)
+    lote_id = Column(Integer, ForeignKey("lotes.id", ondelete="CASCADE"), primary_key=True)
+    cantidad = Column(Integer, nullable=False)
+    
+    movimiento = relationship("Movimiento")
+    lote = relationship("Lote")
@@ -0,0 +1,84 @@
+# app/routers/documentos.py
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from datetime import datetime
+
+from .. import crud, schemas
+from ..database import get_db
+from ..utils.pdf_cache import obtener_comprobante_documento
+
+router = APIRouter(prefix="/documentos", tags=["documentos"])
+
+@router.get("/", response_model=List[schemas.Documento])
+def leer_documentos(
+    tipo: Optional[str] = Query(None, pattern="^(entrada|salida)$"),
+    skip: int = 0,
+    limit: int = 50,
+    db: Session = Depends(get_db)
+):
+    """
+    Obtener los documentos (entradas y salidas múltiples) más recientes con sus líneas.
+    """
+    return crud.get_documentos(db, tipo=tipo, skip=skip, limit=limit)
+
+@router.get("/{documento_id}", response_model=schemas.Documento)
+def leer_documento(documento_id: int, db: Session = Depends(get_db)):
+    """
+    Obtener un documento con todas sus líneas y productos.
+    """
+    documento = crud.get_documento(db, documento_id=documento_id)
+    if documento is None:
+        raise HTTPException(status_code=404, detail="Documento no encontrado")
+    return documento
+
+@router.get("/{documento_id}/pdf")
+def generar_pdf_documento(documento_id: int, db: Session = Depends(get_db)):
+    """
+    Generar el comprobante consolidado de un documento.
+    """
+    documento = crud.get_documento(db, documento_id=documento_id)
+    if documento is None:
+        raise HTTPException(status_code=404, detail="Documento no encontrado")
+    
+    try:
+        productos_data = [
+            {
+                'producto_nombre': mov.producto.nombre if mov.producto else "Producto",
+                'producto_codigo': mov.producto.codigo if mov.producto else "N/A",
+                'cantidad': mov.cantidad
+            }
+            for mov in documento.movimientos
+        ]
+        
+        datos = {
+            'observaciones': documento.observaciones or "",
+            'usuario': documento.usuario or "admin",
+            'fecha': documento.fecha.strftime("%d/%m/%Y %H:%M:%S")
+        }
+        if documento.tipo == "entrada":
+            datos.update({
+                'tipo_origen': documento.tipo_origen,
+                'origen_nombre': documento.origen_nombre,
+                'ubicacion': documento.ubicacion
+            })
+        else:
+            datos.update({
+                'destino': documento.destino or "No especificado",
+                'razon': documento.razon or "No especificada"
+            })
+        
+        ruta_pdf = obtener_comprobante_documento(documento.id, documento.tipo, datos, productos_data)
+        
+        filename = f"comprobante_{documento.tipo}_doc{documento.id}_{datetime.now().strftime('%Y%m%d')}.pdf"
+        return FileResponse(
+            ruta_pdf,
+            media_type="application/pdf",
+            headers={"Content-Disposition": f"attachment; filename={filename}"}
+        )
+        
+    except Exception as e:
+        import traceback
+        print(f"Error generando PDF: {traceback.format_exc()}")
+        raise HTTPException(status_code=500, detail=f"Error generando PDF: {str(e)}")
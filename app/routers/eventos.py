@@ -0,0 +1,67 @@
+# app/routers/eventos.py
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+
+from ..utils import eventos
+from ..utils.serializacion import a_json
+
+router = APIRouter(prefix="/eventos", tags=["eventos"])
+
+LATIDO_S = 15       # comentario periódico para que proxies no corten la conexión
+MAX_REPETICION = 1000  # eventos reenviados al reconectar; si faltan más, resync
+
+def _formatear(evento: dict) -> bytes:
+    if evento is eventos.RESYNC:
+        return b"event: resync\ndata: {}\n\n"
+    return b"id: %d\nevent: stock\ndata: %s\n\n" % (evento["id"], a_json(evento))
+
+@router.get("")
+async def stream_eventos(last_event_id: Optional[str] = Header(None)):
+    """
+    Server-Sent Events con los cambios de stock:
+    `event: stock` con {id, producto_id, tipo, stock, delta, bajo_minimo}.
+    Al reconectar, EventSource envía Last-Event-ID y se reenvía lo que faltó;
+    `event: resync` indica que el cliente debe recargar sus datos.
+    """
+    # Límite de la repetición, leído antes de suscribirse: lo publicado después
+    # llega por la cola y lo anterior se salta ahí (id <= ultimo)
+    inicial = eventos.difusor.ultimo_id
+    try:
+        cola = eventos.difusor.suscribir()
+    except OverflowError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    async def generar():
+        try:
+            yield b"retry: 3000\n\n"
+            ultimo = inicial
+            if last_event_id and last_event_id.isdigit():
+                perdidos = await run_in_threadpool(eventos.leer_desde, int(last_event_id), MAX_REPETICION + 1)
+                if len(perdidos) > MAX_REPETICION:
+                    yield _formatear(eventos.RESYNC)
+                else:
+                    for evento in perdidos:
+                        yield _formatear(evento)
+                    if perdidos:
+                        ultimo = max(ultimo, perdidos[-1]["id"])
+            while True:
+                try:
+                    evento = await asyncio.wait_for(cola.get(), LATIDO_S)
+                except asyncio.TimeoutError:
+                    yield b": ping\n\n"
+                    continue
+                if evento is not eventos.RESYNC and evento["id"] <= ultimo:
+                    continue  # ya enviado en la repetición
+                yield _formatear(evento)
+        finally:
+            eventos.difusor.desuscribir(cola)
+
+    return StreamingResponse(
+        generar(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,10 +1,15 @@
 # app/routers/inventario.py
-from fastapi import APIRouter, Depends
+from datetime import date, datetime, timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import func
-from typing import List
+from typing import List, Optional
 from .. import crud, schemas, models
 from ..database import get_db
+from ..utils import cache_local, clasificacion
+from ..utils.http_cache import respuesta_condicional
+from ..utils.serializacion import respuesta_rapida
 
 
 router = APIRouter(prefix="/inventario", tags=["inventario"])
@@ -27,12 +32,134 @@ def obtener_reporte_inventario(db: Session = Depends(get_db)):
     }
 
 @router.get("/bajo-stock", response_model=List[schemas.Producto])
-def obtener_productos_bajo_stock(db: Session = Depends(get_db)):
+def obtener_productos_bajo_stock(request: Request, response: Response, db: Session = Depends(get_db)):
     """
     Obtener productos con stock por debajo del mínimo.
     """
+    no_modificado = respuesta_condicional(request, response, db, "productos")
+    if no_modificado:
+        return no_modificado
     return crud.get_productos_bajo_stock(db)
 
+@router.get("/alertas", response_model=List[schemas.AlertaStock])
+def obtener_alertas_stock(pendientes: bool = True, limit: int = Query(100, ge=1, le=1000), db: Session = Depends(get_db)):
+    """
+    Cola de alertas: productos que bajaron del stock mínimo o se repusieron.
+    """
+    return crud.get_alertas_stock(db, pendientes=pendientes, limit=limit)
+
+@router.post("/alertas/atender")
+def atender_alertas_stock(datos: schemas.AtenderAlertas, db: Session = Depends(get_db)):
+    """
+    Marca alertas como atendidas (todas las pendientes si no se envían ids).
+    """
+    return {"atendidas": crud.atender_alertas_stock(db, alerta_ids=datos.alerta_ids)}
+
+@router.get("/pronostico")
+def obtener_pronostico(
+    request: Request,
+    response: Response,
+    producto_id: Optional[int] = None,
+    solo_reponer: bool = False,
+    limit: int = Query(100, ge=1, le=5000),
+    db: Session = Depends(get_db)
+):
+    """
+    Consumo diario proyectado, días de cobertura y cantidad sugerida a reponer.
+    Lo calcula una tarea en segundo plano; aquí solo se lee la tabla.
+    """
+    no_modificado = respuesta_condicional(request, response, db, "pronosticos", "productos")
+    if no_modificado:
+        return no_modificado
+    return respuesta_rapida(
+        crud.get_pronosticos_filas(db, producto_id=producto_id, solo_reponer=solo_reponer, limit=limit),
+        response
+    )
+
+@router.get("/series")
+def obtener_series(
+    request: Request,
+    response: Response,
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    granularidad: str = Query("dia", pattern="^(dia|semana|mes)$"),
+    producto_id: Optional[int] = None,
+    categoria: Optional[str] = None,
+    agrupar: Optional[str] = Query(None, pattern="^(producto|categoria)$"),
+    db: Session = Depends(get_db)
+):
+    """
+    Unidades de entrada y salida por día, semana o mes (por defecto, los últimos 30 días).
+    Se calcula sobre el resumen diario, no sobre los movimientos.
+    """
+    hasta = hasta or datetime.utcnow().date()
+    desde = desde or hasta - timedelta(days=29)
+    if desde > hasta:
+        raise HTTPException(status_code=400, detail="'desde' debe ser anterior a 'hasta'")
+    no_modificado = respuesta_condicional(request, response, db, "movimientos", "productos", "resumen_diario")
+    if no_modificado:
+        return no_modificado
+    return respuesta_rapida(
+        crud.get_series_movimientos(
+            db, desde, hasta, granularidad=granularidad,
+            producto_id=producto_id, categoria=categoria, agrupar=agrupar
+        ),
+        response
+    )
+
+@router.get("/stock-a-fecha")
+def obtener_stock_a_fecha(
+    request: Request,
+    response: Response,
+    fecha: date,
+    producto_id: Optional[int] = None,
+    categoria: Optional[str] = None,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=5000),
+    db: Session = Depends(get_db)
+):
+    """
+    Stock de los productos al cierre de una fecha (incluye movimientos archivados si hace falta).
+    """
+    no_modificado = respuesta_condicional(request, response, db, "movimientos", "productos")
+    if no_modificado:
+        return no_modificado
+    return respuesta_rapida(
+        crud.get_stock_a_fecha(db, fecha, producto_id=producto_id, categoria=categoria, skip=skip, limit=limit),
+        response
+    )
+
+@router.get("/abc")
+def obtener_resumen_abc(request: Request, response: Response, db: Session = Depends(get_db)):
+    """
+    Resumen de la última clasificación ABC: productos, unidades y participación por clase.
+    Para listar los productos de una clase: /api/productos/?clase=A
+    """
+    no_modificado = respuesta_condicional(request, response, db, "clasificacion_abc")
+    if no_modificado:
+        return no_modificado
+    return respuesta_rapida(clasificacion.resumen(db), response)
+
+@router.get("/vencimientos")
+def obtener_vencimientos(
+    dias: int = Query(30, ge=0, le=3650),
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db)
+):
+    """
+    Lotes con saldo que vencen en los próximos `dias`, incluidos los ya vencidos.
+    """
+    return crud.get_lotes_por_vencer(db, dias=dias, limit=limit)
+
+@router.get("/lotes/{producto_id}")
+def obtener_lotes_producto(producto_id: int, incluir_agotados: bool = False, db: Session = Depends(get_db)):
+    """
+    Lotes de un producto en el orden en que se asignan las salidas (FEFO).
+    """
+    if crud.get_producto(db, producto_id=producto_id) is None:
+        raise HTTPException(status_code=404, detail="Producto no encontrado")
+    return crud.get_lotes_producto(db, producto_id, incluir_agotados=incluir_agotados)
+
 @router.get("/valor-total")
 def obtener_valor_total_inventario(db: Session = Depends(get_db)):
     """
@@ -61,25 +188,15 @@ def obtener_historial_producto(
         "total_movimientos": len(historial)
     }
 @router.get("/dashboard")
-def get_dashboard_stats(db: Session = Depends(get_db)):
+def get_dashboard_stats(request: Request, response: Response, db: Session = Depends(get_db)):
     """
     Obtener estadísticas para el dashboard principal.
     """
-    # Total de productos
-    total_productos = db.query(models.Producto).count()
-    
-    # Productos bajo stock
-    productos_bajo_stock = db.query(models.Producto).filter(
-        models.Producto.stock_actual < models.Producto.stock_minimo
-    ).count()
-    
-    # Últimos 10 movimientos con sus productos
-    ultimos_movimientos = db.query(models.Movimiento).order_by(
-        models.Movimiento.fecha_movimiento.desc()
-    ).limit(10).all()
-    
-    return {
-        "total_productos": total_productos,
-        "productos_bajo_stock": productos_bajo_stock,
-        "ultimos_movimientos": ultimos_movimientos
-    }
\ No newline at end of file
+    no_modificado = respuesta_condicional(request, response, db, "productos", "movimientos")
+    if no_modificado:
+        return no_modificado
+    # Caché del proceso: se recalcula solo cuando cambian productos o movimientos
+    estadisticas = cache_local.estadisticas_dashboard.obtener(
+        db, "dashboard", lambda: crud.get_estadisticas_dashboard(db)
+    )
+    return respuesta_rapida(estadisticas, response)
@@ -1,24 +1,37 @@
 # app/routers/movimientos.py
-from fastapi import APIRouter, Depends, HTTPException, Query,File, UploadFile, Form
+from fastapi import APIRouter, Depends, HTTPException, Query,File, UploadFile, Form, Request
+from fastapi.concurrency import run_in_threadpool
+from starlette.datastructures import UploadFile as StarletteUploadFile
+from starlette.formparsers import MultiPartException, MultiPartParser
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
-from fastapi.responses import Response
-from ..utils.pdf_generator import PDFGenerator
-import pandas as pd
+from fastapi.responses import Response, FileResponse, StreamingResponse
+from ..utils.http_cache import respuesta_condicional
+from ..utils.serializacion import respuesta_rapida
+from ..utils.pdf_cache import obtener_comprobante_salida
+from ..utils.procesos import obtener_pool, MAX_WORKERS
+from ..utils.zip_stream import generar_zip
+from collections import deque
 import io
+import csv
 import json
 import os
-import shutil
+import hashlib
+import tempfile
+import time
 
 # Importaciones locales
 from .. import crud, schemas, models  # Añadí 'models' aquí
 from ..database import get_db
+from ..utils import archivo, metricas
 
 router = APIRouter(prefix="/movimientos", tags=["movimientos"])
 
 @router.get("/", response_model=List[schemas.Movimiento])
 def leer_movimientos(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db)
@@ -26,19 +39,48 @@ def leer_movimientos(
     """
     Obtener lista de todos los movimientos.
     """
-    movimientos = crud.get_movimientos(db, skip=skip, limit=limit)
-    return movimientos
+    no_modificado = respuesta_condicional(request, response, db, "movimientos", "productos")
+    if no_modificado:
+        return no_modificado
+    # Ruta rápida: movimiento + producto en un JOIN por columnas, sin Pydantic
+    return respuesta_rapida(crud.get_movimientos_filas(db, skip=skip, limit=limit), response)
 
 @router.get("/producto/{producto_id}", response_model=List[schemas.Movimiento])
 def leer_movimientos_producto(
     producto_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ):
     """
     Obtener movimientos de un producto específico.
     """
-    movimientos = crud.get_movimientos_por_producto(db, producto_id=producto_id)
-    return movimientos
+    no_modificado = respuesta_condicional(request, response, db, "movimientos", "productos")
+    if no_modificado:
+        return no_modificado
+    return respuesta_rapida(crud.get_movimientos_por_producto_filas(db, producto_id=producto_id), response)
+
+@router.get("/producto/{producto_id}/historial", response_model=schemas.HistorialPagina)
+def historial_producto(
+    producto_id: int,
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limite: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db)
+):
+    """
+    Historial de un producto por páginas. Pasar el `siguiente_cursor`
+    de la respuesta anterior para obtener la página siguiente.
+    """
+    no_modificado = respuesta_condicional(request, response, db, "movimientos")
+    if no_modificado:
+        return no_modificado
+    try:
+        movimientos, siguiente = crud.get_historial_producto(db, producto_id, limite=limite, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return respuesta_rapida({"movimientos": movimientos, "siguiente_cursor": siguiente}, response)
 
 @router.post("/", response_model=schemas.Movimiento)
 def crear_movimiento(
@@ -46,17 +88,20 @@ def crear_movimiento(
     db: Session = Depends(get_db)
 ):
     """
-    Crear un nuevo movimiento (entrada o salida).
+    Crear un nuevo movimiento (entrada, salida o traslado entre ubicaciones).
+    
+    - **ubicacion_id** / **ubicacion**: entrada: dónde se guarda; salida: de dónde sale
+    - **ubicacion_destino_id**: destino del traslado (el stock total no cambia)
     """
     try:
         # Limpiar campos según el tipo de movimiento
-        if movimiento.tipo == "salida":
-            # Para salidas: limpiar campos de entrada
+        # (la ubicación se conserva: en una salida indica de dónde se saca)
+        if movimiento.tipo in ("salida", "traslado"):
+            # Para salidas y traslados: limpiar campos de entrada
             movimiento.tipo_origen = None
             movimiento.origen_nombre = None
-            movimiento.ubicacion = None
-        elif movimiento.tipo == "entrada":
-            # Para entradas: limpiar campos de salida
+        if movimiento.tipo in ("entrada", "traslado"):
+            # Para entradas y traslados: limpiar campos de salida
             movimiento.cliente_destino = None
         
         return crud.crear_movimiento(db=db, movimiento=movimiento)
@@ -136,7 +181,9 @@ def crear_salida_multiple(
         productos_lista = [
             {
                 'producto_id': item['producto_id'],
-                'cantidad': item['cantidad']
+                'cantidad': item['cantidad'],
+                'ubicacion_id': item.get('ubicacion_id'),
+                'lote_id': item.get('lote_id')
             }
             for item in salida.productos
         ]
@@ -214,7 +261,8 @@ def generar_pdf_salida_endpoint(
             'kit_nombre': kit_nombre
         }
         
-        # Generar PDF
+        # Generar PDF (reportlab se importa solo cuando hace falta)
+        from ..utils.pdf_generator import PDFGenerator
         pdf_generator = PDFGenerator()
         pdf_bytes = pdf_generator.generar_comprobante_salida(datos_salida, productos_info)
         
@@ -257,18 +305,17 @@ def exportar_movimientos_excel(
     """
     Exportar movimientos a Excel.
     """
+    import pandas as pd  # carga diferida: pandas tarda en importarse y solo se usa aquí
+
     try:
         print(f"=== INICIANDO EXPORTACIÓN EXCEL ===")
         print(f"Filtros: inicio={fecha_inicio}, fin={fecha_fin}, tipo={tipo}")
         
-        # Obtener movimientos con sus productos (usar join para mejor performance)
-        query = db.query(models.Movimiento).join(models.Producto)
-        
+        fecha_inicio_dt = fecha_fin_dt = None
         if fecha_inicio:
             try:
                 # Convertir string a fecha
                 fecha_inicio_dt = datetime.strptime(fecha_inicio, "%Y-%m-%d")
-                query = query.filter(models.Movimiento.fecha_movimiento >= fecha_inicio_dt)
             except ValueError:
                 raise HTTPException(status_code=400, detail="Formato de fecha inicio inválido. Use YYYY-MM-DD")
         
@@ -277,14 +324,20 @@ def exportar_movimientos_excel(
                 # Convertir string a fecha y agregar 23:59:59
                 fecha_fin_dt = datetime.strptime(fecha_fin, "%Y-%m-%d")
                 fecha_fin_dt = fecha_fin_dt.replace(hour=23, minute=59, second=59)
-                query = query.filter(models.Movimiento.fecha_movimiento <= fecha_fin_dt)
             except ValueError:
                 raise HTTPException(status_code=400, detail="Formato de fecha fin inválido. Use YYYY-MM-DD")
         
-        if tipo:
-            query = query.filter(models.Movimiento.tipo == tipo)
-        
-        movimientos = query.order_by(models.Movimiento.fecha_movimiento.desc()).all()
+        # Movimientos con sus productos (join); el archivo solo si el rango llega a él
+        movimientos = []
+        for mov in archivo.modelos(db, fecha_inicio_dt):
+            query = db.query(mov).join(mov.producto)
+            if fecha_inicio_dt:
+                query = query.filter(mov.fecha_movimiento >= fecha_inicio_dt)
+            if fecha_fin_dt:
+                query = query.filter(mov.fecha_movimiento <= fecha_fin_dt)
+            if tipo:
+                query = query.filter(mov.tipo == tipo)
+            movimientos += query.order_by(mov.fecha_movimiento.desc()).all()
         print(f"Total movimientos encontrados: {len(movimientos)}")
         
         if not movimientos:
@@ -429,17 +482,133 @@ def exportar_movimientos_excel(
             status_code=500, 
             detail=f"Error al generar archivo Excel: {str(e)}"
         )
+@router.get("/pdfs.zip")
+def descargar_pdfs_zip(
+    desde: Optional[str] = None,
+    hasta: Optional[str] = None,
+    destino: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Descargar en un ZIP los PDFs firmados y los comprobantes de las salidas
+    de un periodo. El ZIP se arma y se envía por partes.
+    """
+    desde_dt = hasta_dt = None
+    if desde:
+        try:
+            desde_dt = datetime.strptime(desde, "%Y-%m-%d")
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Formato de fecha desde inválido. Use YYYY-MM-DD")
+    if hasta:
+        try:
+            hasta_dt = datetime.strptime(hasta, "%Y-%m-%d").replace(hour=23, minute=59, second=59)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Formato de fecha hasta inválido. Use YYYY-MM-DD")
+    
+    # Del más antiguo al más reciente: primero el archivo (si el rango llega), después movimientos
+    salidas = []
+    for mov in reversed(archivo.modelos(db, desde_dt)):
+        query = db.query(
+            mov.id,
+            mov.fecha_movimiento,
+            mov.cliente_destino,
+            mov.motivo,
+            mov.notas,
+            mov.usuario,
+            mov.cantidad,
+            mov.pdf_firmado,
+            mov.pdf_nombre,
+            models.Producto.nombre.label("producto_nombre"),
+            models.Producto.codigo.label("producto_codigo")
+        ).outerjoin(models.Producto, mov.producto_id == models.Producto.id).filter(mov.tipo == "salida")
+        
+        # Filtros por fecha (usa idx_movimiento_fecha_tipo)
+        if desde_dt:
+            query = query.filter(mov.fecha_movimiento >= desde_dt)
+        if hasta_dt:
+            query = query.filter(mov.fecha_movimiento <= hasta_dt)
+        if destino:
+            query = query.filter(mov.cliente_destino == destino)
+        salidas += query.order_by(mov.fecha_movimiento).all()
+    if not salidas:
+        raise HTTPException(status_code=404, detail="No hay salidas con los filtros aplicados")
+    
+    def entradas_zip():
+        # Índice de las salidas incluidas
+        indice = io.StringIO()
+        escritor = csv.writer(indice)
+        escritor.writerow(["ID", "Fecha", "Destino", "Producto", "Código", "Cantidad", "PDF firmado"])
+        for s in salidas:
+            escritor.writerow([
+                s.id, s.fecha_movimiento.strftime("%Y-%m-%d %H:%M:%S"), s.cliente_destino or "",
+                s.producto_nombre or "", s.producto_codigo or "", s.cantidad, s.pdf_nombre or ""
+            ])
+        yield "indice.csv", indice.getvalue().encode("utf-8-sig")
+        
+        for s, ruta_comprobante in _comprobantes_en_paralelo(salidas):
+            if s.pdf_firmado:
+                ruta_firmado = os.path.join("app", s.pdf_firmado.lstrip("/"))
+                if os.path.exists(ruta_firmado):
+                    yield f"firmados/salida_{s.id}.pdf", ruta_firmado
+            yield f"comprobantes/comprobante_salida_{s.id}.pdf", ruta_comprobante
+    
+    nombre_zip = f"pdfs_salidas_{desde or 'inicio'}_{hasta or datetime.now().strftime('%Y-%m-%d')}.zip"
+    return StreamingResponse(
+        generar_zip(entradas_zip()),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename={nombre_zip}"}
+    )
+
+def _comprobantes_en_paralelo(salidas):
+    """
+    Genera (o toma de la caché) el comprobante de cada salida en el pool de
+    procesos, con una ventana limitada de trabajos adelantados y en orden.
+    """
+    if len(salidas) < 4:
+        for s in salidas:
+            yield s, obtener_comprobante_salida(s.id, *_datos_comprobante_salida(s, s.producto_nombre, s.producto_codigo))
+        return
+    
+    pool = obtener_pool()
+    ventana = 2 * MAX_WORKERS
+    pendientes = deque()
+    for s in salidas:
+        datos, productos = _datos_comprobante_salida(s, s.producto_nombre, s.producto_codigo)
+        pendientes.append((s, pool.submit(obtener_comprobante_salida, s.id, datos, productos)))
+        if len(pendientes) >= ventana:
+            lista, futuro = pendientes.popleft()
+            yield lista, futuro.result()
+    while pendientes:
+        lista, futuro = pendientes.popleft()
+        yield lista, futuro.result()
+
+def _datos_comprobante_salida(movimiento, producto_nombre, producto_codigo):
+    """
+    Datos del comprobante de una salida individual. Acepta el modelo o una
+    fila con las mismas columnas, para que la clave de caché sea la misma.
+    """
+    salida_data = {
+        'destino': movimiento.cliente_destino or "No especificado",
+        'razon': movimiento.motivo or "No especificada",
+        'observaciones': movimiento.notas or "",
+        'usuario': movimiento.usuario or "admin",
+        'fecha': movimiento.fecha_movimiento.strftime("%d/%m/%Y %H:%M:%S")
+    }
+    productos_data = [{
+        'producto_nombre': producto_nombre or "Producto",
+        'producto_codigo': producto_codigo or "N/A",
+        'cantidad': movimiento.cantidad
+    }]
+    return salida_data, productos_data
+
 @router.get("/salida/{salida_id}/pdf")
 def generar_pdf_salida(salida_id: int, db: Session = Depends(get_db)):
     """
      Generar PDF de comprobante de salida individual.
     """
     try:
-        # Obtener el movimiento
-        movimiento = db.query(models.Movimiento).filter(
-            models.Movimiento.id == salida_id,
-            models.Movimiento.tipo == "salida"
-        ).first()
+        # Obtener el movimiento (también si ya está archivado)
+        movimiento = crud.get_movimiento_salida(db, salida_id)
         
         if not movimiento:
             raise HTTPException(status_code=404, detail="Salida no encontrada")
@@ -447,31 +616,20 @@ def generar_pdf_salida(salida_id: int, db: Session = Depends(get_db)):
         # Obtener el producto
         producto = movimiento.producto
         
-        # Preparar datos de la salida
-        salida_data = {
-            'destino': movimiento.cliente_destino or "No especificado",
-            'razon': movimiento.motivo or "No especificada",
-            'observaciones': movimiento.notas or "",
-            'usuario': movimiento.usuario or "admin",
-            'fecha': movimiento.fecha_movimiento.strftime("%d/%m/%Y %H:%M:%S")
-        }
-        
-        # Preparar datos del producto
-        productos_data = [{
-            'producto_nombre': producto.nombre if producto else "Producto",
-            'producto_codigo': producto.codigo if producto else "N/A",
-            'cantidad': movimiento.cantidad
-        }]
+        salida_data, productos_data = _datos_comprobante_salida(
+            movimiento,
+            producto.nombre if producto else None,
+            producto.codigo if producto else None
+        )
         
-        # Generar PDF
-        pdf_generator = PDFGenerator()
-        pdf_bytes = pdf_generator.generar_comprobante_salida(salida_data, productos_data)
+        # Generar PDF (o reutilizar el ya generado con los mismos datos)
+        ruta_pdf = obtener_comprobante_salida(salida_id, salida_data, productos_data)
         
         # Nombre del archivo
         filename = f"comprobante_salida_{salida_id}_{datetime.now().strftime('%Y%m%d')}.pdf"
         
-        return Response(
-            content=pdf_bytes,
+        return FileResponse(
+            ruta_pdf,
             media_type="application/pdf",
             headers={"Content-Disposition": f"attachment; filename={filename}"}
         )
@@ -496,7 +654,9 @@ def crear_salida_multiple(
         productos_lista = [
             {
                 'producto_id': item['producto_id'],
-                'cantidad': item['cantidad']
+                'cantidad': item['cantidad'],
+                'ubicacion_id': item.get('ubicacion_id'),
+                'lote_id': item.get('lote_id')
             }
             for item in salida.productos
         ]
@@ -548,7 +708,10 @@ def crear_entrada_multiple(
         productos_lista = [
             {
                 'producto_id': item['producto_id'],
-                'cantidad': item['cantidad']
+                'cantidad': item['cantidad'],
+                'ubicacion_id': item.get('ubicacion_id'),
+                'lote': item.get('lote'),
+                'fecha_vencimiento': item.get('fecha_vencimiento')
             }
             for item in entrada.productos
         ]
@@ -571,69 +734,143 @@ def crear_entrada_multiple(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
     
-PDF_UPLOAD_DIR = "app/static/pdfs/salidas"
-os.makedirs(PDF_UPLOAD_DIR, exist_ok=True)
+# PDFs firmados guardados por contenido: firmados/<2 primeros del hash>/<sha256>.pdf
+PDF_FIRMADOS_DIR = "app/static/pdfs/firmados"
+MAX_PDF_BYTES = 10 * 1024 * 1024  # 10MB
+CHUNK_PDF_BYTES = 1024 * 1024
+
+def _escribir_bloque(archivo, sha, bloque):
+    sha.update(bloque)
+    archivo.write(bloque)
+
+def _guardar_por_contenido(temporal: str, sha256: str) -> tuple:
+    """
+    Mueve el temporal a su ruta por contenido. Si ya existe un archivo
+    idéntico se descarta el temporal. Devuelve (ruta, era_duplicado).
+    """
+    carpeta = os.path.join(PDF_FIRMADOS_DIR, sha256[:2])
+    os.makedirs(carpeta, exist_ok=True)
+    ruta = os.path.join(carpeta, f"{sha256}.pdf")
+    if os.path.exists(ruta):
+        os.remove(temporal)
+        return ruta, True
+    os.replace(temporal, ruta)
+    return ruta, False
+
+async def _cuerpo_limitado(request: Request, limite: int):
+    """El cuerpo de la petición por bloques, cortando apenas pasa de `limite` bytes."""
+    recibidos = 0
+    async for bloque in request.stream():
+        recibidos += len(bloque)
+        if recibidos > limite:
+            raise HTTPException(status_code=400, detail="El archivo no puede ser mayor a 10MB")
+        yield bloque
+
+def _buscar_salida(db: Session, movimiento_id: int):
+    return db.query(models.Movimiento).filter(
+        models.Movimiento.id == movimiento_id,
+        models.Movimiento.tipo == "salida"
+    ).first()
 
 @router.post("/{movimiento_id}/subir-pdf")
 async def subir_pdf_salida(
     movimiento_id: int,
-    file: UploadFile = File(...),
+    request: Request,
     db: Session = Depends(get_db)
 ):
     """
-    Subir PDF firmado para una salida específica.
+    Subir PDF firmado para una salida específica (multipart, campo `file`).
+    El formulario se lee aquí y no en FastAPI: así el límite de tamaño corta
+    la subida mientras llega, en vez de después de guardarla entera.
+    El archivo se copia por bloques fuera del event loop, calculando su
+    SHA-256 mientras se escribe; archivos idénticos se guardan una sola vez.
     """
+    inicio = time.perf_counter()
+    temporal = None
+    formulario = None
     try:
-        # Buscar movimiento
-        movimiento = db.query(models.Movimiento).filter(
-            models.Movimiento.id == movimiento_id,
-            models.Movimiento.tipo == "salida"
-        ).first()
+        # Rechazo temprano si el cuerpo declarado ya supera el límite
+        limite_cuerpo = MAX_PDF_BYTES + 64 * 1024  # el archivo más las cabeceras del multipart
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > limite_cuerpo:
+            raise HTTPException(status_code=400, detail="El archivo no puede ser mayor a 10MB")
+        
+        # Buscar movimiento (antes de recibir el archivo)
+        movimiento = await run_in_threadpool(_buscar_salida, db, movimiento_id)
         
         if not movimiento:
             raise HTTPException(status_code=404, detail="Salida no encontrada")
         
+        try:
+            formulario = await MultiPartParser(
+                request.headers, _cuerpo_limitado(request, limite_cuerpo), max_files=1, max_fields=10
+            ).parse()
+        except MultiPartException as e:
+            raise HTTPException(status_code=400, detail=f"Formulario inválido: {e.message}")
+        file = formulario.get("file")
+        if not isinstance(file, StarletteUploadFile):
+            raise HTTPException(status_code=400, detail="Falta el archivo (campo 'file')")
+        
         # Validar que sea PDF
         if not file.filename.lower().endswith('.pdf'):
             raise HTTPException(status_code=400, detail="Solo se permiten archivos PDF")
         
-        # Validar tamaño (máximo 10MB)
-        file.file.seek(0, 2)  # Ir al final
-        file_size = file.file.tell()
-        file.file.seek(0)  # Volver al inicio
-        
-        if file_size > 10 * 1024 * 1024:  # 10MB
-            raise HTTPException(status_code=400, detail="El archivo no puede ser mayor a 10MB")
-        
-        # Generar nombre único para el archivo
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        destino_limpio = "".join([c for c in (movimiento.cliente_destino or "salida") if c.isalnum() or c == ' '])[:20]
-        destino_limpio = destino_limpio.replace(' ', '_')
-        
-        filename = f"salida_{movimiento_id}_{destino_limpio}_{timestamp}.pdf"
-        file_path = os.path.join(PDF_UPLOAD_DIR, filename)
-        
-        # Guardar archivo
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        # Actualizar movimiento con la ruta del PDF
-        movimiento.pdf_firmado = f"/static/pdfs/salidas/{filename}"
+        # Copiar por bloques validando el tamaño y calculando el hash
+        await run_in_threadpool(os.makedirs, PDF_FIRMADOS_DIR, exist_ok=True)
+        fd, temporal = await run_in_threadpool(tempfile.mkstemp, dir=PDF_FIRMADOS_DIR, suffix=".part")
+        sha = hashlib.sha256()
+        tamano = 0
+        with os.fdopen(fd, "wb") as buffer:
+            while True:
+                bloque = await file.read(CHUNK_PDF_BYTES)
+                if not bloque:
+                    break
+                tamano += len(bloque)
+                if tamano > MAX_PDF_BYTES:
+                    raise HTTPException(status_code=400, detail="El archivo no puede ser mayor a 10MB")
+                await run_in_threadpool(_escribir_bloque, buffer, sha, bloque)
+        
+        sha256 = sha.hexdigest()
+        ruta, duplicado = await run_in_threadpool(_guardar_por_contenido, temporal, sha256)
+        temporal = None
+        
+        # Actualizar movimiento con la ruta del PDF (tras el commit sus atributos
+        # expiran y leerlos haría un SELECT en el event loop)
+        pdf_url = f"/static/pdfs/firmados/{sha256[:2]}/{sha256}.pdf"
+        movimiento.pdf_firmado = pdf_url
         movimiento.pdf_nombre = file.filename
-        db.commit()
+        await run_in_threadpool(db.commit)
+        
+        # Métricas de la transferencia
+        duracion = time.perf_counter() - inicio
+        metricas.registrar("subida_pdf.latencia_ms", duracion * 1000)
+        metricas.registrar("subida_pdf.mb_por_s", (tamano / (1024 * 1024)) / duracion if duracion > 0 else 0)
+        metricas.incrementar("subida_pdf.archivos")
+        metricas.incrementar("subida_pdf.bytes", tamano)
+        if duplicado:
+            metricas.incrementar("subida_pdf.duplicados")
         
         return {
             "success": True,
             "message": "PDF subido exitosamente",
-            "pdf_url": movimiento.pdf_firmado,
-            "movimiento_id": movimiento.id,
-            "filename": filename
+            "pdf_url": pdf_url,
+            "movimiento_id": movimiento_id,
+            "filename": os.path.basename(ruta),
+            "sha256": sha256,
+            "duplicado": duplicado
         }
         
     except HTTPException:
+        metricas.incrementar("subida_pdf.rechazados")
         raise
     except Exception as e:
+        metricas.incrementar("subida_pdf.errores")
         raise HTTPException(status_code=500, detail=f"Error al subir PDF: {str(e)}")
+    finally:
+        if temporal and os.path.exists(temporal):
+            os.remove(temporal)
+        if formulario is not None:
+            await formulario.close()
     
 
 @router.get("/{movimiento_id}/pdf-info")
@@ -641,10 +878,7 @@ def obtener_info_pdf(movimiento_id: int, db: Session = Depends(get_db)):
     """
     Obtener información del PDF asociado a un movimiento.
     """
-    movimiento = db.query(models.Movimiento).filter(
-        models.Movimiento.id == movimiento_id,
-        models.Movimiento.tipo == "salida"
-    ).first()
+    movimiento = crud.get_movimiento_salida(db, movimiento_id)
     
     if not movimiento:
         raise HTTPException(status_code=404, detail="Movimiento no encontrado")
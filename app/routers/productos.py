@@ -1,69 +1,176 @@
 # app/routers/productos.py
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, UploadFile, File
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from .. import crud, schemas
 from ..database import get_db
-from ..utils.codigos import generar_codigo_barras, generar_qr_code, generar_codigo_producto
-from fastapi.responses import JSONResponse
+from ..utils import cache_local
+from ..utils.http_cache import respuesta_condicional
+from ..utils.serializacion import respuesta_rapida
+from ..utils.codigos import generar_codigo_barras, generar_qr_code, normalizar_codigo, reservar_codigos
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi import status
-import pandas as pd
+from datetime import datetime
 import io
+from collections import Counter
 from typing import List
-import chardet
 
 router = APIRouter(prefix="/productos", tags=["productos"])
 
 @router.get("/", response_model=List[schemas.Producto])
 def leer_productos(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    clase: Optional[str] = Query(None, pattern="^[ABC]$", description="Clase ABC"),
     db: Session = Depends(get_db)
 ):
     """
-    Obtener lista de todos los productos.
+    Obtener lista de todos los productos (opcionalmente solo los de una clase ABC).
     """
-    productos = crud.get_productos(db, skip=skip, limit=limit)
-    return productos
+    no_modificado = respuesta_condicional(request, response, db, "productos")
+    if no_modificado:
+        return no_modificado
+    # Ruta rápida: columnas como tuplas serializadas directamente
+    return respuesta_rapida(crud.get_productos_filas(db, skip=skip, limit=limit, clase=clase), response)
 
 @router.get("/buscar", response_model=List[schemas.Producto])
 def buscar_productos(
+    request: Request,
+    response: Response,
     q: str = Query(..., min_length=1, description="Término de búsqueda"),
+    clase: Optional[str] = Query(None, pattern="^[ABC]$", description="Clase ABC"),
     db: Session = Depends(get_db)
 ):
     """
     Buscar productos por nombre, código o descripción.
     """
-    print(f"=== BUSQUEDA RECIBIDA ===")
-    print(f"Término: {q}")
-    print(f"Tipo: {type(q)}")
-    
-    productos = crud.buscar_productos(db, query=q)
-    
-    print(f"Productos encontrados: {len(productos)}")
-    for p in productos:
-        print(f"  - {p.codigo}: {p.nombre}")
-    
-    return productos
+    no_modificado = respuesta_condicional(request, response, db, "productos")
+    if no_modificado:
+        return no_modificado
+    productos = crud.buscar_productos_filas(db, query=q, clase=clase)
+    return respuesta_rapida(productos, response)
+@router.post("/etiquetas")
+def generar_etiquetas(
+    seleccion: schemas.EtiquetasCreate,
+    db: Session = Depends(get_db)
+):
+    """
+    Generar una hoja PDF de etiquetas (código de barras y/o QR) para
+    los productos seleccionados por IDs, códigos, categoría o fecha de importación.
+    Más de 50 páginas se devuelven como un ZIP de PDFs de 50 páginas.
+    """
+    query = crud.get_productos_para_etiquetas(
+        db,
+        producto_ids=seleccion.producto_ids,
+        codigos=seleccion.codigos,
+        categoria=seleccion.categoria,
+        creados_desde=seleccion.creados_desde
+    )
+    total = query.count()
+    if total == 0:
+        raise HTTPException(status_code=404, detail="No hay productos para la selección indicada")
+    return _respuesta_etiquetas(
+        query.yield_per(500),
+        total=total,
+        columnas=seleccion.columnas,
+        filas=seleccion.filas,
+        tipo=seleccion.tipo,
+        copias=seleccion.copias,
+        incluir_nombre=seleccion.incluir_nombre
+    )
+
+@router.post("/codigos/reservar")
+def reservar_bloque_codigos(
+    reserva: schemas.ReservaCodigos,
+    db: Session = Depends(get_db)
+):
+    """
+    Reservar un bloque de códigos únicos (PREFIJO-YYYYMMDD-NNNNNN) para
+    etiquetas preimpresas. Los códigos quedan apartados aunque todavía no
+    haya productos con ellos. Con `etiquetas` devuelve directamente la hoja PDF
+    (o un ZIP de PDFs si pasa de 50 páginas).
+    """
+    try:
+        codigos = reservar_codigos(db, reserva.cantidad, reserva.prefijo)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    db.commit()
+    if reserva.etiquetas:
+        return _respuesta_etiquetas(
+            ((codigo, "") for codigo in codigos),
+            total=len(codigos),
+            columnas=reserva.columnas,
+            filas=reserva.filas,
+            tipo=reserva.tipo,
+            incluir_nombre=False
+        )
+    return {"cantidad": len(codigos), "desde": codigos[0], "hasta": codigos[-1], "codigos": codigos}
+
+def _respuesta_etiquetas(productos, total: int, **opciones) -> Response:
+    """
+    Hoja PDF de etiquetas para pares (código, nombre). Si ocupa más de
+    PAGINAS_POR_PDF páginas se parte en varios PDF dentro de un ZIP.
+    """
+    from itertools import chain
+    from ..utils.etiquetas import PAGINAS_POR_PDF, generar_hojas_etiquetas
+    from ..utils.zip_stream import generar_zip
+
+    partes = generar_hojas_etiquetas(productos, total=total, **opciones)
+    try:
+        # La primera parte se arma antes de responder para poder devolver el error
+        primera = next(partes)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Error generando etiquetas: {str(e)}")
+
+    fecha = datetime.now().strftime('%Y%m%d_%H%M%S')
+    por_pdf = PAGINAS_POR_PDF * opciones.get("columnas", 3) * opciones.get("filas", 8)
+    if total * opciones.get("copias", 1) <= por_pdf:
+        return Response(
+            primera,
+            media_type="application/pdf",
+            headers={"Content-Disposition": f"attachment; filename=etiquetas_{fecha}.pdf"}
+        )
+
+    # El resto de las partes se genera mientras se envía el ZIP
+    entradas = ((f"etiquetas_{fecha}_{i:03d}.pdf", parte) for i, parte in enumerate(chain([primera], partes), 1))
+    return StreamingResponse(
+        generar_zip(entradas),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename=etiquetas_{fecha}.zip"}
+    )
+
 @router.get("/{producto_id}", response_model=schemas.Producto)
-def leer_producto(producto_id: int, db: Session = Depends(get_db)):
+def leer_producto(producto_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
     """
     Obtener un producto por su ID.
     """
+    no_modificado = respuesta_condicional(request, response, db, "productos")
+    if no_modificado:
+        return no_modificado
     db_producto = crud.get_producto(db, producto_id=producto_id)
     if db_producto is None:
         raise HTTPException(status_code=404, detail="Producto no encontrado")
     return db_producto
 
 @router.get("/codigo/{codigo}", response_model=schemas.Producto)
-def leer_producto_por_codigo(codigo: str, db: Session = Depends(get_db)):
+def leer_producto_por_codigo(codigo: str, request: Request, response: Response, db: Session = Depends(get_db)):
     """
     Obtener un producto por su código.
     """
-    db_producto = crud.get_producto_por_codigo(db, codigo=codigo)
-    if db_producto is None:
+    no_modificado = respuesta_condicional(request, response, db, "productos")
+    if no_modificado:
+        return no_modificado
+    # Clave canónica: el mismo GTIN con o sin ceros a la izquierda comparte la entrada
+    producto = cache_local.productos_por_codigo.obtener(
+        db, normalizar_codigo(codigo), lambda: crud.get_producto_por_codigo_fila(db, codigo)
+    )
+    if producto is None:
         raise HTTPException(status_code=404, detail="Producto no encontrado")
-    return db_producto
+    return respuesta_rapida(producto, response)
 
 @router.post("/", response_model=schemas.Producto, status_code=status.HTTP_201_CREATED)
 def crear_producto(
@@ -80,7 +187,10 @@ def crear_producto(
         if existente:
             raise HTTPException(status_code=400, detail="El código ya existe")
 
-    nuevo_producto = crud.crear_producto(db=db, producto=producto)
+    try:
+        nuevo_producto = crud.crear_producto(db=db, producto=producto)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return nuevo_producto
 
 @router.put("/{producto_id}", response_model=schemas.Producto)
@@ -144,8 +254,13 @@ async def cargar_productos_excel(
 ):
     """
     Carga masiva de productos desde archivo Excel o CSV
-    El archivo DEBE tener columna 'codigo' (único) y 'nombre'
+    El archivo DEBE tener columna 'codigo' (único) y 'nombre'.
+    Las filas con el código vacío reciben uno nuevo (PROD-YYYYMMDD-NNNNNN).
     """
+    # Carga diferida: pandas y chardet solo se usan en la importación masiva
+    import chardet
+    import pandas as pd
+
     try:
         # Validar extensión
         if not (archivo.filename.endswith('.xlsx') or 
@@ -176,30 +291,42 @@ async def cargar_productos_excel(
         if 'nombre' not in df.columns:
             raise HTTPException(400, "El archivo debe tener una columna 'nombre'")
         
-        # Validar que no haya códigos duplicados en el Excel
+        # Celdas de código vacías: se les asigna un código nuevo, todos en una sola reserva
         codigos_excel = df['codigo'].astype(str).str.strip().tolist()
-        codigos_duplicados = [c for c in set(codigos_excel) if codigos_excel.count(c) > 1]
+        vacios = [i for i, c in enumerate(codigos_excel) if not c or c == 'nan']
+        
+        # Validar que no haya códigos duplicados en el Excel (también el mismo GTIN escrito distinto)
+        codigos_dados = [c for c in codigos_excel if c and c != 'nan']
+        normalizados = [normalizar_codigo(c) for c in codigos_dados]
+        repeticiones = Counter(normalizados)
+        codigos_duplicados = list(dict.fromkeys(c for c, n in zip(codigos_dados, normalizados) if repeticiones[n] > 1))
         
         if codigos_duplicados:
             raise HTTPException(400, 
                 f"Códigos duplicados en el Excel: {', '.join(codigos_duplicados[:5])}")
         
-        # Validar que los códigos no existan ya en la BD
+        # Validar que los códigos no existan ya en la BD (por bloques, no uno por uno)
         from .. import models
         
         codigos_existentes = []
-        for codigo in codigos_excel:
-            if codigo and codigo != 'nan':
-                existe = db.query(models.Producto).filter(
-                    models.Producto.codigo == codigo
-                ).first()
-                if existe:
-                    codigos_existentes.append(codigo)
+        for inicio in range(0, len(codigos_dados), 500):
+            codigos_existentes.extend(c for (c,) in db.query(models.Producto.codigo).filter(
+                models.Producto.codigo_normalizado.in_(normalizados[inicio:inicio + 500])
+                | models.Producto.codigo.in_(codigos_dados[inicio:inicio + 500])
+            ))
         
         if codigos_existentes:
             raise HTTPException(400, 
                 f"Los siguientes códigos ya existen en la BD: {', '.join(codigos_existentes[:5])}")
         
+        if vacios:
+            # La reserva se confirma sola y enseguida: queda consumida aunque la importación
+            # falle, y el lock de escritura de secuencias_codigo no dura toda la carga
+            for i, codigo in zip(vacios, reservar_codigos(db, len(vacios))):
+                codigos_excel[i] = codigo
+            db.commit()
+            df['codigo'] = codigos_excel
+        
         # Preparar resultados
         resultados = []
         exitosos = 0
@@ -227,8 +354,10 @@ async def cargar_productos_excel(
                     stock_actual=0
                 )
                 
-                db.add(producto)
-                db.flush()
+                # Cada fila en su SAVEPOINT: si el INSERT falla, se descarta solo esa fila
+                with db.begin_nested():
+                    db.add(producto)
+                    db.flush()
                 
                 resultados.append({
                     "codigo": codigo,
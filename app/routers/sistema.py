@@ -0,0 +1,109 @@
+# app/routers/sistema.py
+import os
+
+from typing import List
+
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+
+from ..database import get_db
+from ..utils import cache_local, mantenimiento, metricas, perfilador, verificador
+
+router = APIRouter(prefix="/sistema", tags=["sistema"])
+
+@router.get("/metricas")
+def obtener_metricas():
+    """
+    Métricas del proceso (subidas de archivos, tiempos, contadores).
+    Con varios workers cada respuesta corresponde al proceso que la atendió.
+    """
+    return {
+        "proceso": os.getpid(),
+        **metricas.resumen(),
+        "caches": {
+            "productos_por_codigo": cache_local.productos_por_codigo.resumen(),
+            "estadisticas_dashboard": cache_local.estadisticas_dashboard.resumen(),
+        },
+    }
+
+@router.get("/verificar-stock")
+def verificar_stock(db: Session = Depends(get_db)):
+    """
+    Productos cuyo stock_actual no coincide con entradas - salidas de sus movimientos.
+    """
+    descuadres = verificador.verificar(db.connection())
+    return {"total": len(descuadres), "descuadres": descuadres}
+
+@router.post("/verificar-stock/reparar", dependencies=[Depends(perfilador.requiere_admin)])
+def reparar_stock(db: Session = Depends(get_db)):
+    """
+    Verifica y corrige en bloque los descuadres (stock_actual = saldo de movimientos).
+    """
+    resultado = verificador.verificar_stock(db, reparar_descuadres=True)
+    return {"total": len(resultado["descuadres"]), "corregidos": resultado["corregidos"],
+            "descuadres": resultado["descuadres"]}
+
+@router.get("/base-datos", dependencies=[Depends(perfilador.requiere_admin)])
+def estado_base_datos():
+    """
+    Tamaño de la base y del WAL, último checkpoint y respaldos disponibles.
+    """
+    return mantenimiento.estado()
+
+@router.post("/checkpoint", dependencies=[Depends(perfilador.requiere_admin)])
+def checkpoint_wal(modo: str = Query("passive", pattern="^(passive|truncate)$")):
+    """
+    Pasar el WAL a la base. `truncate` además deja el archivo -wal en cero
+    (espera a que terminen las lecturas y escrituras en curso).
+    """
+    resultado = mantenimiento.checkpoint(modo)
+    if resultado["ocupado"]:
+        raise HTTPException(status_code=409, detail="El checkpoint no pudo completarse: hay lecturas o escrituras en curso")
+    return resultado
+
+@router.post("/respaldo", dependencies=[Depends(perfilador.requiere_admin)])
+def crear_respaldo():
+    """
+    Respaldo en línea de la base (sin detener las escrituras).
+    """
+    return mantenimiento.respaldar()
+
+# ===== Perfiles (solo administradores) =====
+@router.get("/perfiles", dependencies=[Depends(perfilador.requiere_admin)])
+def listar_perfiles():
+    """
+    Perfiles capturados (del más nuevo al más viejo) y configuración del modo rotativo.
+    """
+    return {"rotativo": perfilador.estado_rotativo(), "perfiles": perfilador.listar()}
+
+@router.put("/perfiles/rotativo", dependencies=[Depends(perfilador.requiere_admin)])
+def configurar_perfil_rotativo(
+    rutas: List[str] = Body(..., description="Prefijos de ruta, p. ej. /api/movimientos/exportar"),
+    cada: int = Body(..., ge=0, description="Perfilar 1 de cada N peticiones (0 lo apaga)"),
+):
+    """
+    Perfilar 1 de cada N peticiones a las rutas elegidas (en este worker).
+    """
+    return perfilador.configurar_rotativo(rutas, cada)
+
+@router.delete("/perfiles/rotativo", dependencies=[Depends(perfilador.requiere_admin)])
+def apagar_perfil_rotativo():
+    return perfilador.configurar_rotativo([], 0)
+
+@router.get("/perfiles/{perfil_id}", dependencies=[Depends(perfilador.requiere_admin)])
+def descargar_perfil(perfil_id: str):
+    """
+    Descargar un perfil en formato folded (flamegraph.pl, inferno, speedscope).
+    """
+    ruta = perfilador.archivo_perfil(perfil_id)
+    if ruta is None:
+        raise HTTPException(status_code=404, detail="Perfil no encontrado")
+    return FileResponse(ruta, media_type="text/plain; charset=utf-8", filename=f"{perfil_id}.folded")
+
+@router.delete("/perfiles/{perfil_id}", dependencies=[Depends(perfilador.requiere_admin)])
+def borrar_perfil(perfil_id: str):
+    if perfilador.archivo_perfil(perfil_id) is None:
+        raise HTTPException(status_code=404, detail="Perfil no encontrado")
+    perfilador.borrar(perfil_id)
+    return {"borrado": perfil_id}
@@ -0,0 +1,141 @@
+# app/routers/ubicaciones.py
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from .. import crud, models, schemas
+from ..database import get_db
+from ..utils.http_cache import respuesta_condicional
+from ..utils.serializacion import respuesta_rapida
+
+router = APIRouter(prefix="/ubicaciones", tags=["ubicaciones"])
+
+def _obtener_ubicacion(db: Session, ubicacion_id: int):
+    ubicacion = db.get(models.Ubicacion, ubicacion_id)
+    if ubicacion is None:
+        raise HTTPException(status_code=404, detail="Ubicación no encontrada")
+    return ubicacion
+
+@router.get("/")
+def leer_ubicaciones(
+    request: Request,
+    response: Response,
+    incluir_inactivas: bool = False,
+    db: Session = Depends(get_db)
+):
+    """
+    Ubicaciones con la cantidad de productos y unidades que tienen.
+    """
+    no_modificado = respuesta_condicional(request, response, db, "ubicaciones", "stock_ubicaciones")
+    if no_modificado:
+        return no_modificado
+    return respuesta_rapida(crud.get_ubicaciones_filas(db, incluir_inactivas=incluir_inactivas), response)
+
+@router.post("/", response_model=schemas.Ubicacion)
+def crear_ubicacion(datos: schemas.UbicacionCreate, db: Session = Depends(get_db)):
+    """
+    Dar de alta una ubicación (bodega, estante, sector).
+    """
+    clave = crud.clave_ubicacion(datos.nombre)
+    if not clave:
+        raise HTTPException(status_code=400, detail="El nombre no puede estar vacío")
+    if db.query(models.Ubicacion).filter(models.Ubicacion.clave == clave).first():
+        raise HTTPException(status_code=400, detail="Ya existe una ubicación con ese nombre")
+    ubicacion = models.Ubicacion(nombre=" ".join(datos.nombre.split()), clave=clave, descripcion=datos.descripcion)
+    db.add(ubicacion)
+    db.commit()
+    db.refresh(ubicacion)
+    return ubicacion
+
+@router.put("/{ubicacion_id}", response_model=schemas.Ubicacion)
+def actualizar_ubicacion(ubicacion_id: int, datos: schemas.UbicacionUpdate, db: Session = Depends(get_db)):
+    """
+    Renombrar, describir o desactivar una ubicación.
+    """
+    ubicacion = _obtener_ubicacion(db, ubicacion_id)
+    if datos.nombre is not None:
+        clave = crud.clave_ubicacion(datos.nombre)
+        otra = db.query(models.Ubicacion).filter(models.Ubicacion.clave == clave).first()
+        if otra is not None and otra.id != ubicacion_id:
+            raise HTTPException(status_code=400, detail="Ya existe una ubicación con ese nombre")
+        ubicacion.nombre = " ".join(datos.nombre.split())
+        ubicacion.clave = clave
+    if datos.descripcion is not None:
+        ubicacion.descripcion = datos.descripcion
+    if datos.activa is not None:
+        ubicacion.activa = datos.activa
+    db.commit()
+    db.refresh(ubicacion)
+    return ubicacion
+
+@router.get("/bajo-stock")
+def leer_bajo_minimo(
+    request: Request,
+    response: Response,
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db)
+):
+    """
+    Productos bajo el stock mínimo de su ubicación, en todas las ubicaciones.
+    """
+    no_modificado = respuesta_condicional(request, response, db, "stock_ubicaciones", "productos", "ubicaciones")
+    if no_modificado:
+        return no_modificado
+    return respuesta_rapida(crud.get_stock_bajo_minimo_ubicacion(db, limit=limit), response)
+
+@router.get("/producto/{producto_id}")
+def leer_stock_producto(producto_id: int, db: Session = Depends(get_db)):
+    """
+    En qué ubicaciones está un producto y cuánto stock no tiene ubicación asignada.
+    """
+    producto = crud.get_producto(db, producto_id=producto_id)
+    if producto is None:
+        raise HTTPException(status_code=404, detail="Producto no encontrado")
+    return crud.get_stock_producto_por_ubicacion(db, producto)
+
+@router.get("/{ubicacion_id}/stock")
+def leer_stock_ubicacion(
+    ubicacion_id: int,
+    request: Request,
+    response: Response,
+    producto_id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=5000),
+    db: Session = Depends(get_db)
+):
+    """
+    Stock de una ubicación (o de un producto en ella con `producto_id`).
+    """
+    _obtener_ubicacion(db, ubicacion_id)
+    no_modificado = respuesta_condicional(request, response, db, "stock_ubicaciones", "productos", "ubicaciones")
+    if no_modificado:
+        return no_modificado
+    return respuesta_rapida(
+        crud.get_stock_en_ubicacion(db, ubicacion_id, producto_id=producto_id, skip=skip, limit=limit),
+        response
+    )
+
+@router.get("/{ubicacion_id}/bajo-stock")
+def leer_bajo_minimo_ubicacion(ubicacion_id: int, db: Session = Depends(get_db)):
+    """
+    Productos bajo el stock mínimo definido para esta ubicación.
+    """
+    _obtener_ubicacion(db, ubicacion_id)
+    return crud.get_stock_bajo_minimo_ubicacion(db, ubicacion_id=ubicacion_id)
+
+@router.put("/{ubicacion_id}/stock/{producto_id}")
+def fijar_minimo(
+    ubicacion_id: int,
+    producto_id: int,
+    datos: schemas.MinimoUbicacion,
+    db: Session = Depends(get_db)
+):
+    """
+    Definir el stock mínimo de un producto en esta ubicación.
+    """
+    _obtener_ubicacion(db, ubicacion_id)
+    if crud.get_producto(db, producto_id=producto_id) is None:
+        raise HTTPException(status_code=404, detail="Producto no encontrado")
+    fila = crud.fijar_minimo_ubicacion(db, ubicacion_id, producto_id, datos.stock_minimo)
+    return {"producto_id": producto_id, "ubicacion_id": ubicacion_id,
+            "cantidad": fila.cantidad, "stock_minimo": fila.stock_minimo}
@@ -1,7 +1,7 @@
 # app/schemas.py
 from pydantic import BaseModel, Field, validator
 from typing import Optional, List
-from datetime import datetime
+from datetime import date, datetime
 
 # Esquemas para Productos
 class ProductoBase(BaseModel):
@@ -27,6 +27,8 @@ class Producto(ProductoBase):
     id: int
     codigo: str
     stock_actual: int
+    bajo_stock: bool = False
+    clase_abc: Optional[str] = None
     fecha_creacion: datetime
     fecha_actualizacion: Optional[datetime] = None
     
@@ -37,7 +39,7 @@ class Producto(ProductoBase):
 # app/schemas.py - Modifica MovimientoBase y MovimientoCreate
 class MovimientoBase(BaseModel):
     producto_id: int
-    tipo: str = Field(..., pattern="^(entrada|salida)$")
+    tipo: str = Field(..., pattern="^(entrada|salida|traslado)$")
     cantidad: int = Field(..., gt=0)
     motivo: Optional[str] = None
     tipo_origen: Optional[str] = Field(
@@ -47,6 +49,12 @@ class MovimientoBase(BaseModel):
         None, description="Proveedor, donante o tercero"
     )
     ubicacion: Optional[str] = None
+    ubicacion_id: Optional[int] = Field(
+        None, description="Entrada: dónde se guarda. Salida/traslado: de dónde sale"
+    )
+    ubicacion_destino_id: Optional[int] = Field(
+        None, description="Destino (solo traslados)"
+    )
     notas: Optional[str] = None
     usuario: str = "admin"
     # 🆕 AGREGAR estos campos para salidas
@@ -55,7 +63,10 @@ class MovimientoBase(BaseModel):
     )
 
 class MovimientoCreate(MovimientoBase):
-    pass
+    # Lotes: en una entrada crean un lote; en una salida, lote_id elige de cuál sale (si no, FEFO)
+    lote: Optional[str] = Field(None, max_length=100, description="Número de lote (entradas)")
+    fecha_vencimiento: Optional[date] = Field(None, description="Vencimiento del lote (entradas)")
+    lote_id: Optional[int] = Field(None, description="Lote del que sale (salidas)")
 
 class Movimiento(MovimientoBase):
     id: int
@@ -63,6 +74,70 @@ class Movimiento(MovimientoBase):
     producto: Optional[Producto] = None
     pdf_firmado: Optional[str] = None
     pdf_nombre: Optional[str] = None
+    documento_id: Optional[int] = None
+    
+    class Config:
+        from_attributes = True
+
+# Página del historial de un producto (paginación por cursor)
+class HistorialPagina(BaseModel):
+    movimientos: List[Movimiento]
+    siguiente_cursor: Optional[str] = None
+
+# Alertas de cruce del stock mínimo
+class AlertaStock(BaseModel):
+    id: int
+    producto_id: int
+    tipo: str
+    stock: int
+    stock_minimo: int
+    fecha: datetime
+    atendida: bool
+    fecha_atendida: Optional[datetime] = None
+    producto: Optional[Producto] = None
+    
+    class Config:
+        from_attributes = True
+
+class AtenderAlertas(BaseModel):
+    alerta_ids: Optional[List[int]] = None
+
+# Ubicaciones y stock por ubicación
+class UbicacionCreate(BaseModel):
+    nombre: str = Field(..., min_length=1, max_length=100)
+    descripcion: Optional[str] = None
+
+class UbicacionUpdate(BaseModel):
+    nombre: Optional[str] = Field(None, min_length=1, max_length=100)
+    descripcion: Optional[str] = None
+    activa: Optional[bool] = None
+
+class Ubicacion(BaseModel):
+    id: int
+    nombre: str
+    descripcion: Optional[str] = None
+    activa: bool = True
+    fecha_creacion: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+class MinimoUbicacion(BaseModel):
+    stock_minimo: int = Field(..., ge=0)
+
+# Esquema para documentos (lotes de movimientos creados juntos)
+class Documento(BaseModel):
+    id: int
+    tipo: str
+    destino: Optional[str] = None
+    razon: Optional[str] = None
+    tipo_origen: Optional[str] = None
+    origen_nombre: Optional[str] = None
+    ubicacion: Optional[str] = None
+    observaciones: Optional[str] = None
+    usuario: str
+    fecha: datetime
+    movimientos: List[Movimiento] = []
     
     class Config:
         from_attributes = True
@@ -133,4 +208,31 @@ class EntradaMultipleCreate(BaseModel):
         v_lower = v.lower()
         if v_lower not in tipos_validos:
             raise ValueError(f"Tipo de origen debe ser uno de: {', '.join(tipos_validos)}")
-        return v_lower
\ No newline at end of file
+        return v_lower
+
+# Reserva de códigos para etiquetas preimpresas
+class ReservaCodigos(BaseModel):
+    cantidad: int = Field(..., ge=1, le=10000)
+    prefijo: str = Field("PROD", pattern="^[A-Z0-9]{1,10}$")
+    etiquetas: bool = Field(False, description="Devolver la hoja PDF de etiquetas en vez de la lista")
+    columnas: int = Field(3, ge=1, le=6)
+    filas: int = Field(8, ge=1, le=20)
+    tipo: str = Field("ambos", pattern="^(barras|qr|ambos)$")
+
+# Esquema para impresión masiva de etiquetas
+class EtiquetasCreate(BaseModel):
+    producto_ids: Optional[List[int]] = Field(None, description="IDs de productos")
+    codigos: Optional[List[str]] = Field(None, description="Códigos (p. ej. los devueltos por la carga de Excel)")
+    categoria: Optional[str] = None
+    creados_desde: Optional[datetime] = Field(None, description="Productos creados desde esta fecha (lote de importación)")
+    columnas: int = Field(3, ge=1, le=6)
+    filas: int = Field(8, ge=1, le=20)
+    tipo: str = Field("ambos", pattern="^(barras|qr|ambos)$")
+    copias: int = Field(1, ge=1, le=100)
+    incluir_nombre: bool = True
+    
+    @validator('creados_desde', always=True)
+    def validar_seleccion(cls, v, values):
+        if not (values.get('producto_ids') or values.get('codigos') or values.get('categoria') or v):
+            raise ValueError("Debe indicar producto_ids, codigos, categoria o creados_desde")
+        return v
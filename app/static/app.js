@@ -176,8 +176,56 @@ class EscanerQR {
     }
 }
 
+// Stream de cambios de stock (Server-Sent Events): una sola conexión por página
+class EventosStock {
+    constructor() {
+        this.fuente = null;
+        this.alCambiar = [];
+        this.alResincronizar = [];
+    }
+
+    conectar() {
+        if (this.fuente || !window.EventSource) return;
+        // EventSource reconecta solo y reenvía Last-Event-ID para recuperar lo perdido
+        this.fuente = new EventSource('/api/eventos');
+        this.fuente.addEventListener('stock', (e) => {
+            const evento = JSON.parse(e.data);
+            actualizarStockEnPagina(evento);
+            this.alCambiar.forEach(fn => fn(evento));
+        });
+        this.fuente.addEventListener('resync', () => {
+            this.alResincronizar.forEach(fn => fn());
+        });
+    }
+
+    // callback(evento) por cada cambio; alResincronizar() si se perdieron eventos
+    suscribir(callback, alResincronizar = null) {
+        this.alCambiar.push(callback);
+        this.alResincronizar.push(alResincronizar || (() => callback(null)));
+        this.conectar();
+    }
+}
+
+// Actualiza los elementos marcados con data-stock-producto="<id>"
+function actualizarStockEnPagina(evento) {
+    document.querySelectorAll(`[data-stock-producto="${evento.producto_id}"]`).forEach(el => {
+        el.textContent = evento.stock;
+        el.classList.toggle('text-warning', evento.bajo_minimo);
+    });
+}
+
+// Agrupa ráfagas de eventos en una sola llamada
+function agruparLlamadas(fn, espera = 500) {
+    let temporizador = null;
+    return () => {
+        clearTimeout(temporizador);
+        temporizador = setTimeout(fn, espera);
+    };
+}
+
 // Instancias globales
 const api = new InventarioAPI();
+const eventosStock = new EventosStock();
 const escaner = new EscanerQR();
 
 // Funciones globales
@@ -251,7 +299,7 @@ function mostrarProductoEncontrado(producto, tipoOperacion) {
         <div class="producto-info">
             <p><strong>Nombre:</strong> ${producto.nombre}</p>
             <p><strong>Código:</strong> ${producto.codigo}</p>
-            <p><strong>Stock Actual:</strong> ${producto.stock_actual}</p>
+            <p><strong>Stock Actual:</strong> <span data-stock-producto="${producto.id}">${producto.stock_actual}</span></p>
             <p><strong>Precio:</strong> $${producto.precio_unitario}</p>
         </div>
         
@@ -293,6 +341,7 @@ function mostrarProductoEncontrado(producto, tipoOperacion) {
     `);
     
     mostrarModal(modal);
+    eventosStock.conectar();  // el stock del modal se actualiza si otro equipo lo cambia
 }
 
 async function registrarMovimiento(productoId, tipo) {
@@ -670,4 +719,6 @@ window.crearProductoDesdeCodigo = crearProductoDesdeCodigo;
 window.cerrarModal = cerrarModal;
 window.generarQR = generarQR;
 window.generarBarcode = generarBarcode;
-window.buscarProductoGlobal = buscarProductoGlobal;
\ No newline at end of file
+window.buscarProductoGlobal = buscarProductoGlobal;
+window.eventosStock = eventosStock;
+window.agruparLlamadas = agruparLlamadas;
\ No newline at end of file
@@ -0,0 +1,937 @@
+// ===== VARIABLES GLOBALES =====
+let scanner = null;
+let entradasPendientes = [];
+let productoSeleccionado = null;
+let productosSeleccionadosEntrada = []; // Para cuando se agregan varios
+
+// ===== INICIALIZACIÓN =====
+document.addEventListener('DOMContentLoaded', function() {
+    cargarHistorialEntradas();
+    
+    // Configurar fecha actual por defecto
+    const now = new Date();
+    const fechaInput = document.getElementById('fecha');
+    fechaInput.value = now.toISOString().slice(0, 16);
+    
+    // Buscar producto al presionar Enter
+    document.getElementById('buscarProducto').addEventListener('keypress', function(e) {
+        if (e.key === 'Enter') {
+            e.preventDefault();
+            buscarProducto();
+        }
+    });
+});
+
+// ===== BUSCAR PRODUCTO =====
+async function buscarProducto() {
+    const query = document.getElementById('buscarProducto').value.trim();
+    
+    if (!query) {
+        alert('Por favor ingresa un código o nombre para buscar');
+        return;
+    }
+    
+    try {
+        const url = `/api/productos/buscar?q=${encodeURIComponent(query)}`;
+        const response = await fetch(url);
+        
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}`);
+        }
+        
+        const productos = await response.json();
+        
+        if (productos.length === 0) {
+            alert('No se encontró ningún producto');
+            return;
+        }
+        
+        if (productos.length === 1) {
+            seleccionarProducto(productos[0]);
+        } else {
+            mostrarSelectorProductos(productos);
+        }
+        
+    } catch (error) {
+        console.error('Error buscando producto:', error);
+        alert(`Error al buscar producto: ${error.message}`);
+    }
+}
+
+// ===== SELECCIONAR PRODUCTO =====
+function seleccionarProducto(producto) {
+    // SIEMPRE agregar a la lista de productos seleccionados
+    agregarProductoALista(producto);
+}
+
+function agregarProductoALista(producto) {
+    // Verificar si ya está en la lista
+    const existente = productosSeleccionadosEntrada.find(p => p.id === producto.id);
+    
+    if (existente) {
+        existente.cantidad += 1;
+        mostrarExito(`${producto.nombre}: +1 unidad (total: ${existente.cantidad})`);
+    } else {
+        productosSeleccionadosEntrada.push({
+            id: producto.id,
+            nombre: producto.nombre,
+            codigo: producto.codigo,
+            stock_actual: producto.stock_actual,
+            cantidad: 1
+        });
+        mostrarExito(`${producto.nombre} agregado a la lista`);
+    }
+    
+    // Actualizar la interfaz
+    actualizarListaProductosSeleccionados();
+    actualizarVistaProductoSeleccionado();
+    
+    // Limpiar campo de búsqueda
+    document.getElementById('buscarProducto').value = '';
+    document.getElementById('buscarProducto').focus();
+    
+    // Habilitar botón de agregar
+    document.getElementById('btnAgregar').disabled = false;
+}
+
+function actualizarVistaProductoSeleccionado() {
+    if (productosSeleccionadosEntrada.length === 0) {
+        document.getElementById('productoSeleccionado').classList.add('hidden');
+        return;
+    }
+    
+    // Mostrar el primer producto como referencia
+    const producto = productosSeleccionadosEntrada[0];
+    const container = document.getElementById('productoSeleccionado');
+    
+    container.innerHTML = `
+        <div class="producto-info">
+            <div class="producto-header">
+                <span class="producto-codigo">${producto.codigo}</span>
+                <button onclick="limpiarListaProductos()" class="btn-icon" title="Limpiar todos">
+                    <i class="fas fa-times"></i>
+                </button>
+            </div>
+            <h3 class="producto-nombre">${producto.nombre}</h3>
+            <div class="producto-detalles">
+                <div class="detalle-item">
+                    <span class="detalle-label">Stock Actual</span>
+                    <span class="detalle-valor">${producto.stock_actual}</span>
+                </div>
+                <div class="detalle-item">
+                    <span class="detalle-label">Productos</span>
+                    <span class="detalle-valor">${productosSeleccionadosEntrada.length}</span>
+                </div>
+                <div class="detalle-item">
+                    <span class="detalle-label">Total Unidades</span>
+                    <span class="detalle-valor">${calcularTotalUnidades()}</span>
+                </div>
+            </div>
+        </div>
+    `;
+    
+    container.classList.remove('hidden');
+}
+
+function actualizarListaProductosSeleccionados() {
+    // Crear contenedor si no existe
+    let container = document.getElementById('productosSeleccionadosContainer');
+    
+    if (!container) {
+        container = document.createElement('div');
+        container.id = 'productosSeleccionadosContainer';
+        container.className = 'productos-seleccionados-container';
+        
+        const formSection = document.querySelector('.form-section:last-of-type');
+        formSection.parentNode.insertBefore(container, formSection.nextSibling);
+    }
+    
+    if (productosSeleccionadosEntrada.length === 0) {
+        container.classList.add('hidden');
+        return;
+    }
+    
+    container.classList.remove('hidden');
+    
+    let html = `
+        <div class="productos-seleccionados-header">
+            <h4><i class="fas fa-boxes"></i> Productos para Entrada</h4>
+            <span class="badge">${productosSeleccionadosEntrada.length}</span>
+        </div>
+        <div class="productos-seleccionados-list">
+    `;
+    
+    productosSeleccionadosEntrada.forEach((producto, index) => {
+        html += `
+            <div class="producto-seleccionado-item">
+                <div class="producto-seleccionado-info">
+                    <strong>${producto.nombre}</strong>
+                    <small>${producto.codigo} • Stock: ${producto.stock_actual}</small>
+                </div>
+                <div class="producto-seleccionado-cantidad">
+                    <input type="number" 
+                           value="${producto.cantidad}" 
+                           min="1" 
+                           onchange="actualizarCantidadProducto(${index}, this.value)"
+                           class="form-control form-control-sm">
+                    <span>unidades</span>
+                    <button onclick="eliminarProducto(${index})" 
+                            class="btn-icon-sm" title="Eliminar">
+                        <i class="fas fa-times"></i>
+                    </button>
+                </div>
+            </div>
+        `;
+    });
+    
+    html += `</div>`;
+    
+    container.innerHTML = html;
+}
+
+function actualizarCantidadProducto(index, cantidad) {
+    if (productosSeleccionadosEntrada[index]) {
+        cantidad = parseInt(cantidad) || 1;
+        if (cantidad <= 0) cantidad = 1;
+        productosSeleccionadosEntrada[index].cantidad = cantidad;
+        actualizarVistaProductoSeleccionado();
+        actualizarListaProductosSeleccionados();
+    }
+}
+
+function eliminarProducto(index) {
+    if (confirm('¿Eliminar este producto de la lista?')) {
+        productosSeleccionadosEntrada.splice(index, 1);
+        actualizarListaProductosSeleccionados();
+        actualizarVistaProductoSeleccionado();
+        
+        if (productosSeleccionadosEntrada.length === 0) {
+            deseleccionarProducto();
+        }
+    }
+}
+
+function limpiarListaProductos() {
+    if (productosSeleccionadosEntrada.length > 0) {
+        if (confirm('¿Limpiar todos los productos de la lista?')) {
+            productosSeleccionadosEntrada = [];
+            actualizarListaProductosSeleccionados();
+            deseleccionarProducto();
+        }
+    }
+}
+
+function calcularTotalUnidades() {
+    return productosSeleccionadosEntrada.reduce((sum, p) => sum + p.cantidad, 0);
+}
+
+function deseleccionarProducto() {
+    productoSeleccionado = null;
+    productosSeleccionadosEntrada = [];
+    
+    document.getElementById('productoSeleccionado').classList.add('hidden');
+    document.getElementById('btnAgregar').disabled = true;
+    
+    const container = document.getElementById('productosSeleccionadosContainer');
+    if (container) {
+        container.classList.add('hidden');
+    }
+}
+
+function mostrarSelectorProductos(productos) {
+    const modal = crearModal(`
+        <h3><i class="fas fa-boxes"></i> Seleccionar Producto</h3>
+        <p>Se encontraron ${productos.length} productos:</p>
+        
+        <div class="productos-lista">
+            ${productos.map(producto => `
+                <div class="producto-opcion" onclick="seleccionarDesdeLista(${producto.id})">
+                    <div class="producto-opcion-info">
+                        <strong>${producto.nombre}</strong>
+                        <small>${producto.codigo} • Stock: ${producto.stock_actual}</small>
+                    </div>
+                    <i class="fas fa-chevron-right"></i>
+                </div>
+            `).join('')}
+        </div>
+        
+        <div class="modal-buttons">
+            <button onclick="cerrarModal()" class="btn btn-secondary">
+                <i class="fas fa-times"></i> Cancelar
+            </button>
+        </div>
+    `);
+    
+    mostrarModal(modal);
+}
+
+async function seleccionarDesdeLista(productoId) {
+    try {
+        const response = await fetch(`/api/productos/${productoId}`);
+        const producto = await response.json();
+        seleccionarProducto(producto);
+        cerrarModal();
+    } catch (error) {
+        alert('Error al cargar producto');
+    }
+}
+
+// ===== AGREGAR A LISTA DE ENTRADAS PENDIENTES =====
+
+function agregarALista() {
+    if (productosSeleccionadosEntrada.length === 0) {
+        alert('❌ Por favor selecciona al menos un producto');
+        return;
+    }
+    
+    const motivo = document.getElementById('motivo').value;
+    const origenNombre = document.getElementById('origen_nombre').value;
+    const ubicacion = document.getElementById('ubicacion').value;
+    const notas = document.getElementById('notas').value;
+    const fecha = document.getElementById('fecha').value;
+    
+    // Validaciones
+    if (!origenNombre.trim()) {
+        alert('❌ Por favor ingresa el proveedor/donante');
+        document.getElementById('origen_nombre').focus();
+        return;
+    }
+    
+    // CONFIRMAR ANTES DE AGREGAR
+    let mensajeConfirmacion = '';
+    
+    if (productosSeleccionadosEntrada.length === 1) {
+        const producto = productosSeleccionadosEntrada[0];
+        mensajeConfirmacion = `¿Agregar esta entrada?\n\n` +
+            `📦 Producto: ${producto.nombre}\n` +
+            `🔢 Cantidad: ${producto.cantidad} unidades\n` +
+            `🏢 Proveedor: ${origenNombre}\n` +
+            `📍 Ubicación: ${ubicacion || 'No especificada'}`;
+    } else {
+        const totalUnidades = calcularTotalUnidades();
+        mensajeConfirmacion = `¿Agregar esta ENTRADA MÚLTIPLE?\n\n` +
+            `📦 Productos: ${productosSeleccionadosEntrada.length} diferentes\n` +
+            `🔢 Total unidades: ${totalUnidades}\n` +
+            `🏢 Proveedor: ${origenNombre}\n` +
+            `📍 Ubicación: ${ubicacion || 'No especificada'}\n\n` +
+            `Lista de productos:\n` +
+            productosSeleccionadosEntrada.map(p => 
+                `  • ${p.nombre}: ${p.cantidad} unidades`
+            ).join('\n');
+    }
+    
+    if (!confirm(mensajeConfirmacion)) {
+        return; // Usuario canceló
+    }
+    
+    if (productosSeleccionadosEntrada.length === 1) {
+        // Entrada INDIVIDUAL
+        const producto = productosSeleccionadosEntrada[0];
+        const entrada = {
+            id: Date.now(),
+            producto: {
+                id: producto.id,
+                nombre: producto.nombre,
+                codigo: producto.codigo,
+                stock_actual: producto.stock_actual
+            },
+            producto_id: producto.id,
+            cantidad: producto.cantidad,
+            motivo: motivo,
+            origen_nombre: origenNombre,
+            ubicacion: ubicacion,
+            notas: notas,
+            fecha: fecha || new Date().toISOString()
+        };
+        
+        entradasPendientes.push(entrada);
+        mostrarExito(`✅ ${producto.cantidad} unidades de "${producto.nombre}" agregadas a la lista de pendientes`);
+        
+    } else {
+        // Entrada MÚLTIPLE
+        const entradaMultiple = {
+            id: Date.now(),
+            tipo: 'multiple',
+            productos: productosSeleccionadosEntrada.map(p => ({
+                producto_id: p.id,
+                producto_nombre: p.nombre,
+                producto_codigo: p.codigo,
+                cantidad: p.cantidad,
+                stock_actual: p.stock_actual
+            })),
+            total_productos: productosSeleccionadosEntrada.length,
+            total_unidades: calcularTotalUnidades(),
+            motivo: motivo,
+            origen_nombre: origenNombre,
+            ubicacion: ubicacion,
+            notas: notas,
+            fecha: fecha || new Date().toISOString()
+        };
+        
+        entradasPendientes.push(entradaMultiple);
+        mostrarExito(`✅ Entrada múltiple agregada: ${productosSeleccionadosEntrada.length} productos, ${calcularTotalUnidades()} unidades totales`);
+    }
+    
+    // Limpiar todo después de agregar
+    productosSeleccionadosEntrada = [];
+    actualizarListaEntradas();
+    limpiarFormulario();
+    
+    // Ocultar contenedor de productos seleccionados
+    const container = document.getElementById('productosSeleccionadosContainer');
+    if (container) {
+        container.classList.add('hidden');
+    }
+    console.log('✅ Entrada agregada, pendientes:', entradasPendientes.length); // Debug
+}
+
+
+// ===== ACTUALIZAR LISTA DE ENTRADAS PENDIENTES =====
+function actualizarListaEntradas() {
+    console.log('Actualizando lista de entradas...', entradasPendientes); // Debug
+    
+    const lista = document.getElementById('listaEntradas');
+    const contador = document.getElementById('contadorEntradas');
+    const btnRegistrar = document.getElementById('btnRegistrar');
+    
+    if (!lista) {
+        console.error('❌ No se encontró el elemento listaEntradas');
+        return;
+    }
+    
+    // Actualizar contador y botón
+    contador.textContent = entradasPendientes.length;
+    btnRegistrar.disabled = entradasPendientes.length === 0;
+    
+    if (entradasPendientes.length === 0) {
+        lista.innerHTML = `
+            <div class="empty-state">
+                <i class="fas fa-clipboard-list fa-3x"></i>
+                <p>No hay entradas pendientes</p>
+                <small>Agrega productos usando el formulario</small>
+            </div>
+        `;
+    } else {
+        let html = '';
+        
+        entradasPendientes.forEach((entrada, index) => {
+            if (entrada.tipo === 'multiple') {
+                // Entrada MÚLTIPLE
+                html += `
+                    <div class="entrada-item entrada-multiple-item">
+                        <div class="entrada-info">
+                            <div class="entrada-producto">
+                                <i class="fas fa-boxes"></i> Entrada Múltiple
+                                <span class="badge bg-primary">${entrada.total_productos} prod.</span>
+                            </div>
+                            <div class="entrada-detalles">
+                                <small>
+                                    <i class="fas fa-truck"></i> ${entrada.origen_nombre} • 
+                                    <i class="fas fa-map-marker-alt"></i> ${entrada.ubicacion || 'Sin ubicación'} • 
+                                    <i class="fas fa-cubes"></i> ${entrada.total_unidades} unid.
+                                </small>
+                                <div class="productos-resumen">
+                                    <small class="text-muted">
+                                        ${entrada.productos.map(p => 
+                                            `${p.producto_nombre} (${p.cantidad})`
+                                        ).join(', ').substring(0, 60)}...
+                                    </small>
+                                </div>
+                            </div>
+                        </div>
+                        <div class="entrada-cantidad">${entrada.total_unidades}</div>
+                        <div class="entrada-acciones">
+                            <button class="btn-icon" onclick="verDetalleEntrada(${index})" title="Ver detalles">
+                                <i class="fas fa-eye"></i>
+                            </button>
+                            <button class="btn-icon" onclick="eliminarEntrada(${index})" title="Eliminar">
+                                <i class="fas fa-trash"></i>
+                            </button>
+                        </div>
+                    </div>
+                `;
+            } else {
+                // Entrada INDIVIDUAL
+                html += `
+                    <div class="entrada-item">
+                        <div class="entrada-info">
+                            <div class="entrada-producto">
+                                ${entrada.producto.nombre}
+                                <span class="badge bg-secondary">${entrada.producto.codigo}</span>
+                            </div>
+                            <div class="entrada-detalles">
+                                <small>
+                                    <i class="fas fa-tag"></i> ${entrada.motivo} • 
+                                    <i class="fas fa-truck"></i> ${entrada.origen_nombre}
+                                    ${entrada.ubicacion ? ` • <i class="fas fa-map-marker-alt"></i> ${entrada.ubicacion}` : ''}
+                                </small>
+                            </div>
+                        </div>
+                        <div class="entrada-cantidad">+${entrada.cantidad}</div>
+                        <div class="entrada-acciones">
+                            <button class="btn-icon" onclick="eliminarEntrada(${index})" title="Eliminar">
+                                <i class="fas fa-trash"></i>
+                            </button>
+                        </div>
+                    </div>
+                `;
+            }
+        });
+        
+        lista.innerHTML = html;
+    }
+    
+    // Actualizar totales
+    actualizarTotales();
+    console.log('✅ Lista actualizada, total:', entradasPendientes.length);
+}
+
+function verDetalleEntrada(index) {
+    const entrada = entradasPendientes[index];
+    
+    if (entrada.tipo !== 'multiple') {
+        alert('Esta es una entrada individual');
+        return;
+    }
+    
+    let html = `
+        <h3><i class="fas fa-boxes"></i> Detalle de Entrada Múltiple</h3>
+        <div class="detalle-info">
+            <p><strong>Proveedor/Donante:</strong> ${entrada.origen_nombre}</p>
+            <p><strong>Motivo:</strong> ${entrada.motivo}</p>
+            <p><strong>Ubicación:</strong> ${entrada.ubicacion || 'No especificada'}</p>
+            <p><strong>Fecha:</strong> ${new Date(entrada.fecha).toLocaleString()}</p>
+            ${entrada.notas ? `<p><strong>Notas:</strong> ${entrada.notas}</p>` : ''}
+        </div>
+        <h4>Productos:</h4>
+        <table class="detalle-table">
+            <thead>
+                <tr>
+                    <th>Producto</th>
+                    <th>Código</th>
+                    <th>Cantidad</th>
+                </tr>
+            </thead>
+            <tbody>
+    `;
+    
+    entrada.productos.forEach(p => {
+        html += `
+            <tr>
+                <td>${p.producto_nombre}</td>
+                <td>${p.producto_codigo}</td>
+                <td>${p.cantidad}</td>
+            </tr>
+        `;
+    });
+    
+    html += `
+            </tbody>
+            <tfoot>
+                <tr>
+                    <th colspan="2">Total</th>
+                    <th>${entrada.total_unidades} unidades</th>
+                </tr>
+            </tfoot>
+        </table>
+    `;
+    
+    const modal = crearModal(html);
+    mostrarModal(modal);
+}
+
+function eliminarEntrada(index) {
+    if (confirm('¿Eliminar esta entrada de la lista?')) {
+        entradasPendientes.splice(index, 1);
+        actualizarListaEntradas();
+    }
+}
+
+function actualizarTotales() {
+    const totalProductos = entradasPendientes.length;
+    let totalUnidades = 0;
+    let proveedores = {};
+    
+    entradasPendientes.forEach(entrada => {
+        if (entrada.tipo === 'multiple') {
+            totalUnidades += entrada.total_unidades;
+            proveedores[entrada.origen_nombre] = (proveedores[entrada.origen_nombre] || 0) + 1;
+        } else {
+            totalUnidades += entrada.cantidad;
+            proveedores[entrada.origen_nombre] = (proveedores[entrada.origen_nombre] || 0) + 1;
+        }
+    });
+    
+    let proveedorPrincipal = 'Varios';
+    if (Object.keys(proveedores).length === 1) {
+        proveedorPrincipal = Object.keys(proveedores)[0];
+    }
+    
+    document.getElementById('totalProductos').textContent = totalProductos;
+    document.getElementById('totalUnidades').textContent = totalUnidades;
+    document.getElementById('proveedorPrincipal').textContent = proveedorPrincipal;
+}
+
+function limpiarFormulario() {
+    try {
+        // Deseleccionar producto
+        deseleccionarProducto();
+        
+        // Limpiar campos de forma segura
+        const cantidadInput = document.getElementById('cantidad');
+        if (cantidadInput) cantidadInput.value = 1;
+        
+        const origenInput = document.getElementById('origen_nombre');
+        if (origenInput) origenInput.value = '';
+        
+        const ubicacionInput = document.getElementById('ubicacion');
+        if (ubicacionInput) ubicacionInput.value = '';
+        
+        const notasInput = document.getElementById('notas');
+        if (notasInput) notasInput.value = '';
+        
+        // Establecer fecha actual
+        const fechaInput = document.getElementById('fecha');
+        if (fechaInput) {
+            const now = new Date();
+            fechaInput.value = now.toISOString().slice(0, 16);
+        }
+        
+        // Enfocar en búsqueda
+        const buscarInput = document.getElementById('buscarProducto');
+        if (buscarInput) {
+            buscarInput.value = '';
+            buscarInput.focus();
+        }
+        
+        // Deshabilitar botón de agregar
+        const btnAgregar = document.getElementById('btnAgregar');
+        if (btnAgregar) btnAgregar.disabled = true;
+        
+    } catch (error) {
+        console.error('Error en limpiarFormulario:', error);
+    }
+}
+
+// ===== REGISTRAR ENTRADAS =====
+// ===== REGISTRAR ENTRADAS =====
+async function registrarEntradas() {
+    if (entradasPendientes.length === 0) {
+        alert('No hay entradas pendientes para registrar');
+        return;
+    }
+    
+    const confirmar = confirm(`¿Registrar ${entradasPendientes.length} entrada(s) con un total de ${entradasPendientes.reduce((s, e) => s + (e.total_unidades || e.cantidad || 0), 0)} unidades?`);
+    
+    if (!confirmar) return;
+    
+    try {
+        const resultados = [];
+        let exitosas = 0;
+        
+        for (const entrada of entradasPendientes) {
+            if (entrada.tipo === 'multiple') {
+                // Entrada MÚLTIPLE
+                const data = {
+                    productos: entrada.productos.map(p => ({
+                        producto_id: p.producto_id,
+                        cantidad: p.cantidad
+                    })),
+                    tipo_origen: entrada.motivo.toLowerCase().includes('donación') ? 'donacion' : 
+                                entrada.motivo.toLowerCase().includes('compra') ? 'compra' : 
+                                entrada.motivo.toLowerCase().includes('devolución') ? 'devolucion' : 
+                                entrada.motivo.toLowerCase().includes('traslado') ? 'traslado' : 'ajuste',
+                    origen_nombre: entrada.origen_nombre,
+                    ubicacion: entrada.ubicacion || '',
+                    observaciones: entrada.notas || '',
+                    usuario: 'admin'
+                };
+                
+                const response = await fetch('/api/movimientos/entrada-multiple', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify(data)
+                });
+                
+                if (response.ok) {
+                    exitosas++;
+                    resultados.push(`✅ Entrada múltiple: ${entrada.productos.length} productos registrados`);
+                } else {
+                    const error = await response.json();
+                    resultados.push(`❌ Error en entrada múltiple: ${error.detail || 'Error desconocido'}`);
+                }
+                
+            } else {
+                // Entrada INDIVIDUAL
+                const movimiento = {
+                    producto_id: entrada.producto_id,
+                    tipo: 'entrada',
+                    cantidad: entrada.cantidad,
+                    motivo: entrada.motivo,
+                    tipo_origen: entrada.motivo.toLowerCase().includes('donación') ? 'donacion' : 
+                                entrada.motivo.toLowerCase().includes('compra') ? 'compra' : 
+                                entrada.motivo.toLowerCase().includes('devolución') ? 'devolucion' : 
+                                entrada.motivo.toLowerCase().includes('traslado') ? 'traslado' : 'ajuste',
+                    origen_nombre: entrada.origen_nombre,
+                    ubicacion: entrada.ubicacion || '',
+                    notas: entrada.notas || '',
+                    usuario: 'admin'
+                };
+                
+                const response = await fetch('/api/movimientos/', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify(movimiento)
+                });
+                
+                if (response.ok) {
+                    exitosas++;
+                    resultados.push(`✅ ${entrada.producto.nombre}: ${entrada.cantidad} unidades`);
+                } else {
+                    const error = await response.json();
+                    resultados.push(`❌ ${entrada.producto.nombre}: ${error.detail || 'Error desconocido'}`);
+                }
+            }
+        }
+        
+        // Mostrar resultados
+        let mensaje = `✅ ${exitosas} de ${entradasPendientes.length} entradas registradas exitosamente\n\n`;
+        mensaje += resultados.slice(0, 5).join('\n'); // Mostrar solo primeros 5
+        if (resultados.length > 5) {
+            mensaje += `\n... y ${resultados.length - 5} más`;
+        }
+        alert(mensaje);
+        
+        if (exitosas > 0) {
+            // LIMPIAR TODO SIN ERRORES
+            entradasPendientes = [];
+            productosSeleccionadosEntrada = [];
+            
+            // Actualizar interfaces
+            actualizarListaEntradas();
+            
+            // Limpiar formulario de forma segura
+            try {
+                const fechaInput = document.getElementById('fecha');
+                if (fechaInput) {
+                    const now = new Date();
+                    fechaInput.value = now.toISOString().slice(0, 16);
+                }
+                
+                const origenInput = document.getElementById('origen_nombre');
+                if (origenInput) origenInput.value = '';
+                
+                const ubicacionInput = document.getElementById('ubicacion');
+                if (ubicacionInput) ubicacionInput.value = '';
+                
+                const notasInput = document.getElementById('notas');
+                if (notasInput) notasInput.value = '';
+                
+                const buscarInput = document.getElementById('buscarProducto');
+                if (buscarInput) {
+                    buscarInput.value = '';
+                    buscarInput.focus();
+                }
+                
+                // Deseleccionar producto
+                const productoContainer = document.getElementById('productoSeleccionado');
+                if (productoContainer) productoContainer.classList.add('hidden');
+                
+                // Deshabilitar botón
+                const btnAgregar = document.getElementById('btnAgregar');
+                if (btnAgregar) btnAgregar.disabled = true;
+                
+                // Ocultar contenedor de productos seleccionados
+                const productosContainer = document.getElementById('productosSeleccionadosContainer');
+                if (productosContainer) productosContainer.classList.add('hidden');
+                
+            } catch (e) {
+                console.error('Error al limpiar formulario:', e);
+            }
+            
+            // Recargar historial
+            await cargarHistorialEntradas();
+            
+            mostrarExito('🎉 Entradas registradas exitosamente');
+        }
+        
+    } catch (error) {
+        console.error('Error completo:', error);
+        alert(`Error al registrar entradas: ${error.message}`);
+    }
+}
+
+// ===== ESCANEO =====
+function iniciarEscaneoEntrada() {
+    const modal = document.getElementById('modalEscaneo');
+    modal.classList.remove('hidden');
+    
+    setTimeout(() => {
+        if (!scanner) {
+            scanner = new QRScanner({
+                elementId: 'scannerEntrada',
+                onScan: procesarCodigoEscaneado,
+                onError: (error) => {
+                    console.error('Error del escáner:', error);
+                    alert('Error al acceder a la cámara');
+                    cerrarModalEscaneo();
+                }
+            });
+        }
+        scanner.start();
+    }, 100);
+}
+
+function cerrarModalEscaneo() {
+    if (scanner) {
+        scanner.stop();
+    }
+    const modal = document.getElementById('modalEscaneo');
+    modal.classList.add('hidden');
+    document.getElementById('codigoManual').value = '';
+}
+
+async function procesarCodigoEscaneado(resultado) {
+    if (resultado.valid) {
+        try {
+            // Usar el mismo endpoint que la búsqueda manual
+            const response = await fetch(`/api/productos/buscar?q=${encodeURIComponent(resultado.code)}`);
+            
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}`);
+            }
+            
+            const productos = await response.json();
+            
+            if (productos.length === 0) {
+                if (confirm(`El código "${resultado.code}" no existe. ¿Deseas crear un nuevo producto?`)) {
+                    cerrarModalEscaneo();
+                    setTimeout(() => {
+                        window.location.href = `/productos/crear?codigo=${encodeURIComponent(resultado.code)}`;
+                    }, 500);
+                }
+                return;
+            }
+            
+            // Si hay exactamente 1 producto, seleccionarlo
+            if (productos.length === 1) {
+                seleccionarProducto(productos[0]);
+                cerrarModalEscaneo();
+                document.getElementById('cantidad').focus();
+            } else {
+                // Si hay múltiples, mostrar selector
+                mostrarSelectorProductos(productos);
+                cerrarModalEscaneo();
+            }
+            
+        } catch (error) {
+            console.error('Error buscando producto escaneado:', error);
+            alert(`Error al buscar producto: ${error.message}`);
+        }
+    }
+}
+
+function procesarCodigoManual() {
+    const codigo = document.getElementById('codigoManual').value.trim();
+    if (!codigo) {
+        alert('Por favor ingresa un código');
+        return;
+    }
+    procesarCodigoEscaneado({ code: codigo, valid: true, type: 'manual' });
+}
+
+// ===== HISTORIAL =====
+async function cargarHistorialEntradas() {
+    try {
+        const response = await fetch('/api/movimientos/');
+        const movimientos = await response.json();
+        
+        const entradas = movimientos
+            .filter(m => m.tipo === 'entrada')
+            .slice(0, 10);
+        
+        const historial = document.getElementById('historialEntradas');
+        
+        if (entradas.length === 0) {
+            historial.innerHTML = `
+                <div class="empty-state">
+                    <i class="fas fa-history fa-2x"></i>
+                    <p>No hay entradas registradas</p>
+                </div>
+            `;
+            return;
+        }
+        
+        let html = '';
+        entradas.forEach(movimiento => {
+            const fecha = new Date(movimiento.fecha_movimiento).toLocaleString();
+            html += `
+                <div class="historial-item">
+                    <div class="historial-fecha">${fecha}</div>
+                    <div class="historial-info">
+                        <span class="historial-producto">${movimiento.producto ? movimiento.producto.nombre : 'Producto'}</span>
+                        <span class="historial-cantidad">+${movimiento.cantidad}</span>
+                    </div>
+                </div>
+            `;
+        });
+        
+        historial.innerHTML = html;
+        
+    } catch (error) {
+        console.error('Error cargando historial:', error);
+        document.getElementById('historialEntradas').innerHTML = `
+            <div class="empty-state">
+                <i class="fas fa-exclamation-triangle"></i>
+                <p>Error cargando historial</p>
+            </div>
+        `;
+    }
+}
+// ===== LIMPIAR TODA LA LISTA =====
+function limpiarLista() {
+    if (entradasPendientes.length === 0) return;
+    
+    if (confirm(`¿Eliminar todas las ${entradasPendientes.length} entradas pendientes?`)) {
+        entradasPendientes = [];
+        actualizarListaEntradas();
+        mostrarExito('🧹 Lista de entradas limpiada');
+    }
+}
+// ===== FUNCIONES AUXILIARES =====
+function mostrarExito(mensaje) {
+    const alerta = document.createElement('div');
+    alerta.className = 'alert alert-success';
+    alerta.innerHTML = `<i class="fas fa-check-circle"></i> ${mensaje}`;
+    alerta.style.position = 'fixed';
+    alerta.style.top = '20px';
+    alerta.style.right = '20px';
+    alerta.style.zIndex = '1000';
+    document.body.appendChild(alerta);
+    setTimeout(() => alerta.remove(), 3000);
+}
+
+function crearModal(content) {
+    const modal = document.createElement('div');
+    modal.className = 'modal';
+    modal.innerHTML = `
+        <div class="modal-overlay" onclick="cerrarModal()"></div>
+        <div class="modal-content">
+            ${content}
+        </div>
+    `;
+    return modal;
+}
+
+function mostrarModal(modal) {
+    document.body.appendChild(modal);
+}
+
+function cerrarModal() {
+    const modal = document.querySelector('.modal');
+    if (modal) modal.remove();
+}
+
+function registrarMultiples() {
+    registrarEntradas();
+}
@@ -0,0 +1,76 @@
+# app/utils/alertas.py
+"""
+Marca bajo_stock y cola de alertas.
+
+La condición stock_actual < stock_minimo compara dos columnas y no puede
+usar un índice, así que se guarda en productos.bajo_stock (con índice
+parcial) y se recalcula solo para los productos que cambian en cada flush.
+Cuando un producto existente cruza el mínimo, en cualquier sentido, se
+encola una fila en alertas_stock en la misma transacción.
+"""
+from datetime import datetime
+
+from sqlalchemy import bindparam, event, inspect, text
+from sqlalchemy.orm import Session
+
+from .. import models
+from . import versiones
+
+_CONDICION = "(COALESCE(stock_actual, 0) < COALESCE(stock_minimo, 0))"
+
+def esta_bajo(stock_actual, stock_minimo) -> bool:
+    return (stock_actual or 0) < (stock_minimo or 0)
+
+@event.listens_for(Session, "before_flush")
+def _mantener_bajo_stock(session, flush_context, instances):
+    for obj in session.new:
+        if isinstance(obj, models.Producto):
+            # Un producto nuevo no genera alerta: recién se da de alta
+            obj.bajo_stock = esta_bajo(obj.stock_actual, obj.stock_minimo)
+    for obj in list(session.dirty):
+        if not isinstance(obj, models.Producto):
+            continue
+        estado = inspect(obj)
+        if not (estado.attrs.stock_actual.history.has_changes()
+                or estado.attrs.stock_minimo.history.has_changes()):
+            continue
+        bajo = esta_bajo(obj.stock_actual, obj.stock_minimo)
+        if bajo != bool(obj.bajo_stock):
+            obj.bajo_stock = bajo
+            session.add(models.AlertaStock(
+                producto=obj,
+                tipo="bajo_minimo" if bajo else "repuesto",
+                stock=obj.stock_actual or 0,
+                stock_minimo=obj.stock_minimo or 0,
+            ))
+
+def recalcular_bajo_stock(conexion, producto_ids=None) -> int:
+    """
+    Recalcula la marca para escrituras que no pasan por el ORM (UPDATE masivos,
+    reparaciones) y encola las alertas de los productos que cruzaron el mínimo.
+    Devuelve cuántos productos cambiaron.
+    """
+    filtro = f"bajo_stock != {_CONDICION}"
+    parametros = {"ahora": datetime.utcnow()}
+    if producto_ids is not None:
+        filtro += " AND id IN :ids"
+        parametros["ids"] = list(producto_ids)
+
+    def _sql(sentencia):
+        consulta = text(sentencia)
+        if producto_ids is not None:
+            consulta = consulta.bindparams(bindparam("ids", expanding=True))
+        return consulta
+
+    conexion.execute(_sql(
+        "INSERT INTO alertas_stock (producto_id, tipo, stock, stock_minimo, fecha, atendida) "
+        f"SELECT id, CASE WHEN {_CONDICION} THEN 'bajo_minimo' ELSE 'repuesto' END, "
+        "COALESCE(stock_actual, 0), COALESCE(stock_minimo, 0), :ahora, 0 "
+        f"FROM productos WHERE {filtro}"
+    ), parametros)
+    resultado = conexion.execute(_sql(
+        f"UPDATE productos SET bajo_stock = {_CONDICION} WHERE {filtro}"
+    ), {k: v for k, v in parametros.items() if k != "ahora"})
+    if resultado.rowcount:
+        versiones.incrementar(conexion, "productos")
+    return resultado.rowcount
@@ -0,0 +1,160 @@
+# app/utils/archivo.py
+"""
+Archivo de movimientos viejos (partición caliente/fría).
+
+Los movimientos con más de HORIZONTE_DIAS se mueven por lotes a la base
+adjunta "archivo" (inventario_archivo.db, o INVENTARIO_ARCHIVO_DB) con el
+mismo id. La tabla movimientos queda chica y sus índices entran en caché.
+El traslado es SQL directo, sin los listeners de la sesión: stock_actual,
+resumen_diario y los lotes no cambian.
+
+Las lecturas (historial, exportaciones, stock a una fecha, verificador)
+unen las dos tablas, pero solo consultan el archivo si el rango pedido
+llega a él.
+
+Se activa con INVENTARIO_ARCHIVO_DIAS (p. ej. 365). Archivar a mano:
+    python -m app.utils.archivo [dias]
+"""
+import os
+from datetime import datetime, time, timedelta
+
+from sqlalchemy import DateTime, bindparam, func, select, text
+
+from .. import models
+from ..database import ARCHIVO_ADJUNTO
+from . import metricas, tareas, versiones
+
+HORIZONTE_DIAS = int(os.getenv("INVENTARIO_ARCHIVO_DIAS", "0"))
+HORIZONTE_MINIMO_DIAS = 30  # el pronóstico lee sus 28 días solo de la tabla caliente
+TAMANO_LOTE = 5000
+INTERVALO_S = 24 * 3600
+
+NOMBRE_TAREA = "archivar_movimientos"
+
+COLUMNAS = ", ".join(c.name for c in models.Movimiento.__table__.columns)
+
+# El movimiento de id más alto nunca se archiva: en las bases creadas antes de
+# AUTOINCREMENT, SQLite da a cada fila nueva MAX(id) + 1 de la tabla caliente y,
+# si se vaciara, volvería a usar id que ya están en el archivo
+_SQL_LOTE = text(
+    "SELECT id FROM main.movimientos WHERE fecha_movimiento < :limite "
+    "AND id < (SELECT MAX(id) FROM main.movimientos) AND id NOT IN :excluidos "
+    "ORDER BY fecha_movimiento, id LIMIT :n"
+).bindparams(bindparam("limite", type_=DateTime), bindparam("excluidos", expanding=True))
+
+# Id del lote que ya están en el archivo con otros datos: no se pisan ni se
+# borran, quedan en la tabla caliente y se informan
+_SQL_CONFLICTOS = text(
+    "SELECT m.id FROM main.movimientos m JOIN archivo.movimientos a ON a.id = m.id "
+    "WHERE m.id IN :ids AND NOT (a.producto_id IS m.producto_id AND a.tipo = m.tipo "
+    "AND a.cantidad = m.cantidad AND a.fecha_movimiento IS m.fecha_movimiento)"
+).bindparams(bindparam("ids", expanding=True))
+
+# En WAL una transacción sobre dos bases no es atómica entre ellas: si se corta
+# entre los dos commits, el lote queda en ambas y la próxima pasada lo borra sin
+# volver a copiarlo
+_SQL_COPIAR = text(
+    f"INSERT INTO archivo.movimientos ({COLUMNAS}) "
+    f"SELECT {COLUMNAS} FROM main.movimientos m WHERE m.id IN :ids AND NOT EXISTS ("
+    "SELECT 1 FROM archivo.movimientos a WHERE a.id = m.id AND a.producto_id IS m.producto_id "
+    "AND a.tipo = m.tipo AND a.cantidad = m.cantidad AND a.fecha_movimiento IS m.fecha_movimiento)"
+).bindparams(bindparam("ids", expanding=True))
+
+_SQL_BORRAR = text("DELETE FROM main.movimientos WHERE id IN :ids").bindparams(bindparam("ids", expanding=True))
+
+def limite(conexion):
+    """Fecha del último movimiento archivado (None si no hay archivo o está vacío)."""
+    if not ARCHIVO_ADJUNTO:
+        return None
+    return conexion.execute(select(func.max(models.MovimientoArchivado.fecha_movimiento))).scalar()
+
+def alcanza(conexion, desde=None) -> bool:
+    """Si un rango que empieza en `desde` (fecha, datetime o None = desde el principio) llega al archivo."""
+    ultimo = limite(conexion)
+    if ultimo is None:
+        return False
+    if desde is None:
+        return True
+    if not isinstance(desde, datetime):
+        desde = datetime.combine(desde, time.min)
+    return desde <= ultimo
+
+def modelos(conexion, desde=None) -> tuple:
+    """Modelos a consultar para el rango, del más reciente al más antiguo."""
+    if alcanza(conexion, desde):
+        return (models.Movimiento, models.MovimientoArchivado)
+    return (models.Movimiento,)
+
+def fuente_sql(conexion, columnas: str, desde=None) -> str:
+    """FROM para SQL directo: movimientos, o su unión con el archivo si el rango llega."""
+    if not alcanza(conexion, desde):
+        return "movimientos"
+    return f"(SELECT {columnas} FROM main.movimientos UNION ALL SELECT {columnas} FROM archivo.movimientos)"
+
+def borrar_producto(conexion, producto_id: int):
+    """Los movimientos archivados no tienen clave foránea: se borran a mano con el producto."""
+    if ARCHIVO_ADJUNTO:
+        conexion.execute(text("DELETE FROM archivo.movimientos WHERE producto_id = :p"), {"p": producto_id})
+
+def archivar(engine, horizonte_dias: int = HORIZONTE_DIAS, tamano_lote: int = TAMANO_LOTE) -> int:
+    """Mueve al archivo los movimientos anteriores al horizonte. Devuelve cuántos movió."""
+    if not ARCHIVO_ADJUNTO or horizonte_dias <= 0:
+        return 0
+    limite_fecha = datetime.utcnow() - timedelta(days=max(horizonte_dias, HORIZONTE_MINIMO_DIAS))
+    movidos = 0
+    with engine.connect() as conexion:
+        # Con las claves foráneas activas, borrar el movimiento borraría sus filas de
+        # movimientos_lotes y dejaría NULL en lotes.movimiento_id; el id sigue
+        # existiendo en el archivo. Solo se puede cambiar fuera de una transacción
+        dbapi = conexion.connection.dbapi_connection
+        dbapi.execute("PRAGMA foreign_keys=OFF")
+        excluidos = []
+        try:
+            while True:
+                # Un lote por transacción: el lock de escritura dura poco
+                with conexion.begin():
+                    ids = conexion.execute(
+                        _SQL_LOTE, {"limite": limite_fecha, "n": tamano_lote, "excluidos": excluidos}
+                    ).scalars().all()
+                    if not ids:
+                        break
+                    conflictos = conexion.execute(_SQL_CONFLICTOS, {"ids": ids}).scalars().all()
+                    if conflictos:
+                        # Sin esto el lote fallaría siempre igual y el archivo no avanzaría más
+                        print(f"⚠️ Movimientos no archivados, su id ya está en el archivo con otros datos: {conflictos}")
+                        metricas.incrementar("archivo.conflictos", len(conflictos))
+                        excluidos.extend(conflictos)
+                        omitir = set(conflictos)
+                        ids = [i for i in ids if i not in omitir]
+                    if ids:
+                        conexion.execute(_SQL_COPIAR, {"ids": ids})
+                        conexion.execute(_SQL_BORRAR, {"ids": ids})
+                        versiones.incrementar(conexion, "movimientos")
+                movidos += len(ids)
+        finally:
+            dbapi.execute("PRAGMA foreign_keys=ON")
+    return movidos
+
+@tareas.registrar(NOMBRE_TAREA, INTERVALO_S)
+def archivar_movimientos(db) -> dict:
+    movidos = archivar(db.get_bind())
+    if movidos:
+        print(f"🗄️ {movidos} movimientos archivados")
+    return {"archivados": movidos}
+
+if __name__ == "__main__":
+    import sys
+    import time as reloj
+
+    from ..database import engine, init_db
+
+    if not ARCHIVO_ADJUNTO:
+        sys.exit("Definir INVENTARIO_ARCHIVO_DIAS para activar el archivo")
+    init_db()
+    dias = int(sys.argv[1]) if len(sys.argv) > 1 else HORIZONTE_DIAS
+    inicio = reloj.perf_counter()
+    movidos = archivar(engine, dias)
+    segundos = reloj.perf_counter() - inicio
+    with engine.connect() as conexion:
+        ultimo = limite(conexion)
+    print(f"🗄️ {movidos} movimientos archivados ({segundos:.2f} s); archivo hasta {ultimo}")
@@ -0,0 +1,58 @@
+# app/utils/cache_local.py
+import threading
+from collections import OrderedDict
+
+from . import versiones
+
+class CacheVersionada:
+    """
+    Caché en memoria del proceso, válida mientras no cambie la versión de
+    las tablas de las que depende (tabla versiones_tabla).
+
+    Con varios workers cada proceso tiene su propia copia; como la versión
+    vive en la base compartida, una escritura hecha por cualquier worker
+    invalida la caché de todos con una sola consulta por clave primaria.
+    Los valores guardados deben ser datos planos (dicts, listas), nunca
+    objetos del ORM ligados a una sesión.
+    """
+    def __init__(self, *tablas, max_entradas: int = 2048):
+        self.tablas = tablas
+        self.max_entradas = max_entradas
+        self._datos = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, db, clave, calcular):
+        """
+        Devuelve el valor de `clave`, calculándolo con `calcular()` si no está
+        o si las tablas cambiaron. La versión se lee en la misma transacción
+        que `calcular`, así nunca se guarda un valor más viejo que su versión.
+        """
+        estado = versiones.obtener(db, *self.tablas)
+        version = tuple(estado[tabla][0] for tabla in self.tablas)
+        with self._lock:
+            if version != self._version:
+                self._datos.clear()
+                self._version = version
+            elif clave in self._datos:
+                self._datos.move_to_end(clave)
+                self.aciertos += 1
+                return self._datos[clave]
+
+        valor = calcular()
+        with self._lock:
+            self.fallos += 1
+            if version == self._version:
+                self._datos[clave] = valor
+                if len(self._datos) > self.max_entradas:
+                    self._datos.popitem(last=False)
+        return valor
+
+    def resumen(self) -> dict:
+        return {"entradas": len(self._datos), "aciertos": self.aciertos, "fallos": self.fallos}
+
+# Cachés compartidas por los routers
+productos_por_codigo = CacheVersionada("productos")
+estadisticas_dashboard = CacheVersionada("productos", "movimientos", max_entradas=1)
@@ -0,0 +1,151 @@
+# app/utils/clasificacion.py
+"""
+Clasificación ABC (Pareto) de productos según sus salidas.
+
+Se recorre una sola vez el libro de movimientos (salidas de la ventana) por
+bloques y se acumulan unidades y cantidad de salidas por producto con
+np.bincount, así la memoria depende de la cantidad de productos y no de
+la de movimientos. Luego se ordena y se asigna la clase por participación
+acumulada:
+  A: hasta UMBRAL_A del total (80%)
+  B: hasta UMBRAL_B (95%)
+  C: el resto, incluidos los productos sin salidas
+Se clasifica por unidades y por frecuencia; la clase final es la mejor de
+las dos (un producto que sale poco pero muy seguido también importa para
+los conteos cíclicos). Se guarda en productos.clase_abc y el detalle en
+clasificacion_abc.
+
+Recalcular a mano:
+    python -m app.utils.clasificacion
+"""
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, text
+
+from .. import models
+from . import archivo, tareas, versiones
+
+VENTANA_DIAS = int(os.getenv("INVENTARIO_ABC_VENTANA", "365"))
+UMBRAL_A = 0.80
+UMBRAL_B = 0.95
+TAMANO_BLOQUE = 100_000
+INTERVALO_S = 24 * 3600
+
+NOMBRE_TAREA = "clasificacion_abc"
+
+def acumular_salidas(conexion, desde: datetime, max_producto_id: int):
+    """Unidades y cantidad de salidas por producto_id (índice del arreglo), en una pasada."""
+    import numpy as np
+
+    unidades = np.zeros(max_producto_id + 1, dtype=np.int64)
+    salidas = np.zeros(max_producto_id + 1, dtype=np.int64)
+    # Cursor del driver: filas como tuplas simples, leídas por bloques
+    cursor = conexion.connection.dbapi_connection.cursor()
+    try:
+        # La ventana puede llegar a los movimientos archivados
+        fuente = archivo.fuente_sql(conexion, "producto_id, tipo, cantidad, fecha_movimiento", desde)
+        cursor.execute(
+            f"SELECT producto_id, cantidad FROM {fuente} "
+            "WHERE tipo = 'salida' AND fecha_movimiento >= ? AND producto_id IS NOT NULL",
+            (str(desde),)
+        )
+        while True:
+            bloque = cursor.fetchmany(TAMANO_BLOQUE)
+            if not bloque:
+                break
+            datos = np.array(bloque, dtype=np.int64)
+            ids, cantidades = datos[:, 0], datos[:, 1]
+            largo = max(len(unidades), int(ids.max()) + 1)
+            if largo > len(unidades):
+                # Movimientos huérfanos con un id mayor al último producto
+                unidades = np.pad(unidades, (0, largo - len(unidades)))
+                salidas = np.pad(salidas, (0, largo - len(salidas)))
+            unidades += np.bincount(ids, weights=cantidades, minlength=largo).astype(np.int64)
+            salidas += np.bincount(ids, minlength=largo)
+    finally:
+        cursor.close()
+    return unidades, salidas
+
+def clasificar(valores):
+    """
+    Clase A/B/C por participación acumulada, más la participación acumulada
+    y el orden (de mayor a menor) de cada elemento.
+    """
+    import numpy as np
+
+    orden = np.argsort(-valores, kind="stable")
+    total = valores.sum()
+    acumulada = np.zeros(len(valores))
+    if total > 0:
+        acumulada[orden] = np.cumsum(valores[orden]) / total
+    # Se mira la participación acumulada ANTES de sumar el producto: el que
+    # cruza el umbral todavía entra en la clase
+    previa = acumulada - (valores / total if total > 0 else 0)
+    clases = np.where(valores <= 0, "C",
+             np.where(previa < UMBRAL_A, "A",
+             np.where(previa < UMBRAL_B, "B", "C")))
+    ranking = np.empty(len(valores), dtype=np.int64)
+    ranking[orden] = np.arange(1, len(valores) + 1)
+    return clases, acumulada, ranking
+
+@tareas.registrar(NOMBRE_TAREA, INTERVALO_S)
+def actualizar_clasificacion(db) -> dict:
+    """Recalcula la clasificación de todos los productos. Devuelve cuántos hay de cada clase."""
+    import numpy as np
+
+    ahora = datetime.utcnow()
+    ids = np.array([fila[0] for fila in db.query(models.Producto.id).all()], dtype=np.int64)
+    if not len(ids):
+        return {}
+    unidades, salidas = acumular_salidas(db.connection(), ahora - timedelta(days=VENTANA_DIAS), int(ids.max()))
+    unidades, salidas = unidades[ids], salidas[ids]
+
+    clase_volumen, acumulada, ranking = clasificar(unidades)
+    clase_frecuencia, _, _ = clasificar(salidas)
+    clase = np.where(clase_frecuencia < clase_volumen, clase_frecuencia, clase_volumen)  # "A" < "B" < "C"
+
+    filas = [
+        {"producto_id": p, "unidades": u, "salidas": s, "participacion_acumulada": round(a * 100, 4),
+         "ranking": r, "clase_volumen": cv, "clase_frecuencia": cf, "clase": c, "actualizado": ahora}
+        for p, u, s, a, r, cv, cf, c in zip(
+            ids.tolist(), unidades.tolist(), salidas.tolist(), acumulada.tolist(), ranking.tolist(),
+            clase_volumen.tolist(), clase_frecuencia.tolist(), clase.tolist()
+        )
+    ]
+    conexion = db.connection()
+    conexion.execute(text("DELETE FROM clasificacion_abc"))
+    conexion.execute(models.ClasificacionABC.__table__.insert(), filas)
+    # Solo se tocan los productos que cambiaron de clase
+    cambiados = conexion.execute(text(
+        "UPDATE productos SET clase_abc = :clase WHERE id = :producto_id AND clase_abc IS NOT :clase"
+    ), [{"producto_id": f["producto_id"], "clase": f["clase"]} for f in filas]).rowcount
+    tablas = ["clasificacion_abc"] + (["productos"] if cambiados else [])
+    versiones.incrementar(conexion, *tablas)
+    db.commit()
+
+    letras, cantidades = np.unique(clase, return_counts=True)
+    return dict(zip(letras.tolist(), cantidades.tolist()))
+
+def resumen(db) -> list:
+    """Productos, unidades y participación por clase de la última clasificación."""
+    cla = models.ClasificacionABC
+    filas = db.query(
+        cla.clase, func.count(cla.producto_id), func.sum(cla.unidades), func.sum(cla.salidas), func.max(cla.actualizado)
+    ).group_by(cla.clase).order_by(cla.clase).all()
+    total = sum(f[2] or 0 for f in filas) or 1
+    return [
+        {"clase": c, "productos": n, "unidades": u or 0, "salidas": s or 0,
+         "participacion": round((u or 0) * 100 / total, 2), "actualizado": a}
+        for c, n, u, s, a in filas
+    ]
+
+if __name__ == "__main__":
+    from ..database import SessionLocal, init_db
+
+    init_db()
+    db = SessionLocal()
+    try:
+        print(f"🔤 Clasificación ABC: {actualizar_clasificacion(db)}")
+    finally:
+        db.close()
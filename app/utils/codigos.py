@@ -1,56 +1,173 @@
 # app/utils/codigos.py
-import random
-import string
 from datetime import datetime
-import qrcode
-import barcode
-from barcode.writer import ImageWriter
 import io
+import re
 import base64
-from typing import Optional
-from PIL import Image, ImageDraw
+from typing import List, Optional
 
-def generar_codigo_producto(prefix: str = "PROD") -> str:
+from sqlalchemy import bindparam, event, inspect, text
+from sqlalchemy.orm import Session
+
+from .. import models
+
+# qrcode, python-barcode y PIL se importan dentro de las funciones que los usan:
+# generar códigos de producto no debe cargar las librerías de imágenes al arrancar
+
+# GTIN: de EAN-8 a GTIN-14. Con menos dígitos se trata como código interno
+# (un número corto cualquiera tiene 1 en 10 de pasar el dígito verificador)
+MIN_DIGITOS_GTIN = 8
+DIGITOS_GTIN = 14
+
+DIGITOS_SECUENCIA = 6
+# Prefijo como en schemas.ReservaCodigos
+_CODIGO_INTERNO = re.compile(r"[A-Z0-9]{1,10}-\d{8}-[A-Z0-9]{6}")
+MAX_POR_DIA = 10 ** DIGITOS_SECUENCIA - 1
+
+_SQL_RESERVAR = text(
+    "INSERT INTO secuencias_codigo (prefijo, fecha, ultimo) VALUES (:prefijo, :fecha, :cantidad) "
+    "ON CONFLICT(prefijo, fecha) DO UPDATE SET ultimo = ultimo + :cantidad "
+    "RETURNING ultimo"
+)
+
+_SQL_EXISTENTES = text("SELECT codigo FROM productos WHERE codigo IN :codigos").bindparams(
+    bindparam("codigos", expanding=True)
+)
+
+def digito_verificador(digitos: str) -> int:
+    """Dígito verificador GS1 (módulo 10) de un GTIN sin su último dígito."""
+    suma = sum(int(d) * (3 if i % 2 == 0 else 1) for i, d in enumerate(reversed(digitos)))
+    return (10 - suma % 10) % 10
+
+def es_gtin(codigo: str) -> bool:
+    """Si es un GTIN (8 a 14 dígitos, sin contar ceros a la izquierda de más) con el dígito verificador correcto."""
+    return (codigo.isascii() and codigo.isdigit() and len(codigo) >= MIN_DIGITOS_GTIN
+            and len(codigo.lstrip("0")) <= DIGITOS_GTIN
+            and digito_verificador(codigo[:-1]) == int(codigo[-1]))
+
+def normalizar_codigo(codigo) -> Optional[str]:
     """
-    Genera un código único para productos.
-    Formato: PREFIJO-YYYYMMDD-XXXXXX
+    Forma canónica de un código para buscarlo: los GTIN válidos (EAN-8,
+    UPC-A, EAN-13, GTIN-14, con ceros a la izquierda de menos o de más)
+    quedan en 14 dígitos; esos ceros no cambian el dígito verificador.
+    Los demás códigos quedan como están, sin espacios en los extremos.
+    """
+    if codigo is None:
+        return None
+    codigo = str(codigo).strip()
+    if not codigo:
+        return None
+    return codigo.lstrip("0").zfill(DIGITOS_GTIN) if es_gtin(codigo) else codigo
+
+@event.listens_for(Session, "before_flush")
+def _mantener_codigo_normalizado(session, flush_context, instances):
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, models.Producto):
+            continue
+        if obj in session.new or inspect(obj).attrs.codigo.history.has_changes():
+            obj.codigo_normalizado = normalizar_codigo(obj.codigo)
+
+def reservar_codigos(conexion, cantidad: int, prefijo: str = "PROD") -> List[str]:
+    """
+    Reserva `cantidad` códigos consecutivos PREFIJO-YYYYMMDD-NNNNNN.
+
+    El bloque sale de secuencias_codigo con un solo UPSERT: en SQLite la
+    escritura toma el lock de la base, así dos workers nunca reciben el mismo
+    número. Se omiten los que ya existan en productos (códigos aleatorios
+    del generador anterior) y se reservan otros en su lugar. La reserva es
+    parte de la transacción de `conexion`; si se descarta, no se reutilizan.
     """
     fecha = datetime.now().strftime("%Y%m%d")
-    random_chars = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
-    return f"{prefix}-{fecha}-{random_chars}"
+    codigos = []
+    while len(codigos) < cantidad:
+        faltan = cantidad - len(codigos)
+        ultimo = conexion.execute(_SQL_RESERVAR, {"prefijo": prefijo, "fecha": fecha, "cantidad": faltan}).scalar()
+        if ultimo > MAX_POR_DIA:
+            raise ValueError(f"Se agotaron los códigos {prefijo} del día ({MAX_POR_DIA})")
+        bloque = [f"{prefijo}-{fecha}-{n:0{DIGITOS_SECUENCIA}d}" for n in range(ultimo - faltan + 1, ultimo + 1)]
+        existentes = set()
+        for inicio in range(0, len(bloque), 500):
+            existentes.update(conexion.execute(_SQL_EXISTENTES, {"codigos": bloque[inicio:inicio + 500]}).scalars())
+        codigos.extend(c for c in bloque if c not in existentes)
+    return codigos
+
+def generar_codigo_producto(conexion, prefix: str = "PROD") -> str:
+    """
+    Genera un código único para productos.
+    Formato: PREFIJO-YYYYMMDD-NNNNNN (secuencia diaria, ver reservar_codigos)
+    """
+    return reservar_codigos(conexion, 1, prefix)[0]
+
+def generar_codigo_barras_png(codigo: str, opciones: Optional[dict] = None) -> bytes:
+    """
+    Genera la imagen PNG (bytes) de un código de barras Code128.
+    """
+    import barcode
+    from barcode.writer import ImageWriter
+
+    # Usar Code128 que acepta cualquier texto
+    code128 = barcode.get_barcode_class('code128')
+    
+    # Configuración del writer
+    writer_options = {
+        'write_text': False,
+        'quiet_zone': 2.0,
+        'module_height': 10.0,
+        'module_width': 0.3,
+        'font_size': 10,
+    }
+    if opciones:
+        writer_options.update(opciones)
+    
+    barcode_img = code128(codigo, writer=ImageWriter())
+    
+    # Guardar en buffer
+    buffer = io.BytesIO()
+    barcode_img.write(buffer, options=writer_options)
+    return buffer.getvalue()
 
 def generar_codigo_barras(codigo: str) -> str:
     """
     Genera imagen de código de barras en base64.
     """
     try:
-        # Usar Code128 que acepta cualquier texto
-        code128 = barcode.get_barcode_class('code128')
-        
-        # Configuración del writer
-        writer_options = {
-            'write_text': False,
-            'quiet_zone': 2.0,
-            'module_height': 10.0,
-            'module_width': 0.3,
-            'font_size': 10,
-        }
-        
-        barcode_img = code128(codigo, writer=ImageWriter())
-        
-        # Guardar en buffer
-        buffer = io.BytesIO()
-        barcode_img.write(buffer, options=writer_options)
-        buffer.seek(0)
+        png = generar_codigo_barras_png(codigo)
         
         # Convertir a base64
-        b64_string = base64.b64encode(buffer.getvalue()).decode()
+        b64_string = base64.b64encode(png).decode()
         return f"data:image/png;base64,{b64_string}"
         
     except Exception as e:
         print(f"Error generando código de barras: {e}")
         return ""
 
+def generar_qr_png(contenido: str, box_size: int = 10, con_logo: bool = True) -> bytes:
+    """
+    Genera la imagen PNG (bytes) de un código QR con el contenido dado.
+    """
+    import qrcode
+
+    # Crear QR
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_H,
+        box_size=box_size,
+        border=4,
+    )
+    qr.add_data(contenido)
+    qr.make(fit=True)
+    
+    # Crear imagen
+    img = qr.make_image(fill_color="#1e40af", back_color="#f8fafc")
+    
+    # Opcional: agregar logo
+    if con_logo:
+        img = agregar_logo_qr(img)
+    
+    # Guardar en buffer
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
 def generar_qr_code(codigo: str, data_extra: Optional[dict] = None) -> str:
     """
     Genera código QR en base64.
@@ -67,29 +184,10 @@ def generar_qr_code(codigo: str, data_extra: Optional[dict] = None) -> str:
         if data_extra:
             qr_data.update(data_extra)
         
-        # Crear QR
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_H,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(str(qr_data))
-        qr.make(fit=True)
-        
-        # Crear imagen
-        img = qr.make_image(fill_color="#1e40af", back_color="#f8fafc")
-        
-        # Opcional: agregar logo
-        img = agregar_logo_qr(img)
-        
-        # Guardar en buffer
-        buffer = io.BytesIO()
-        img.save(buffer, format="PNG", optimize=True)
-        buffer.seek(0)
+        png = generar_qr_png(str(qr_data))
         
         # Convertir a base64
-        b64_string = base64.b64encode(buffer.getvalue()).decode()
+        b64_string = base64.b64encode(png).decode()
         return f"data:image/png;base64,{b64_string}"
         
     except Exception as e:
@@ -100,6 +198,8 @@ def agregar_logo_qr(img_qr):
     """
     Agrega un logo simple al centro del QR.
     """
+    from PIL import Image, ImageDraw
+
     try:
         # Tamaño del logo (10% del tamaño del QR)
         qr_size = img_qr.size[0]
@@ -148,24 +248,28 @@ def agregar_logo_qr(img_qr):
 
 def validar_formato_codigo(codigo: str) -> dict:
     """
-    Valida y determina el tipo de código.
+    Valida y determina el tipo de código. Los EAN/UPC deben tener el dígito
+    verificador correcto; `normalizado` es la forma con la que se busca.
     """
     codigo = str(codigo).strip()
+    normalizado = normalizar_codigo(codigo)
     
-    # Código de producto interno
-    if codigo.startswith('PROD-') and len(codigo) == 20:
-        return {"valido": True, "tipo": "producto_interno"}
+    # Código de producto interno: PREFIJO-YYYYMMDD-NNNNNN con cualquier prefijo
+    # reservable (los viejos PROD- llevan 6 caracteres aleatorios al final)
+    if _CODIGO_INTERNO.fullmatch(codigo):
+        return {"valido": True, "tipo": "producto_interno", "normalizado": normalizado}
     
-    # EAN-13 (13 dígitos)
-    if codigo.isdigit() and len(codigo) == 13:
-        return {"valido": True, "tipo": "ean13"}
+    # EAN-8, UPC (12 dígitos, u 11 si el lector le quitó el cero), EAN-13 o GTIN-14
+    if es_gtin(codigo):
+        tipos = {14: "gtin14", 13: "ean13", 12: "upc", 11: "upc", 8: "ean8"}
+        return {"valido": True, "tipo": tipos.get(len(codigo), "gtin"), "normalizado": normalizado}
     
-    # UPC (12 dígitos)
-    if codigo.isdigit() and len(codigo) == 12:
-        return {"valido": True, "tipo": "upc"}
+    if codigo.isdigit() and len(codigo) in (12, 13, 14):
+        return {"valido": False, "tipo": "gtin", "normalizado": normalizado,
+                "error": "Dígito verificador incorrecto"}
     
     # Código de barras genérico
     if 8 <= len(codigo) <= 20 and all(c.isalnum() for c in codigo):
-        return {"valido": True, "tipo": "codigo_barras"}
+        return {"valido": True, "tipo": "codigo_barras", "normalizado": normalizado}
     
-    return {"valido": False, "tipo": "desconocido"}
\ No newline at end of file
+    return {"valido": False, "tipo": "desconocido", "normalizado": normalizado}
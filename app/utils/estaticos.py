@@ -0,0 +1,173 @@
+# app/utils/estaticos.py
+"""
+Pipeline de archivos estáticos.
+
+Construcción (antes de arrancar el servidor):
+    python -m app.utils.estaticos
+
+Copia los CSS/JS listados en ASSETS a app/static/dist con el hash del
+contenido en el nombre, minificados y precomprimidos (.gz y, si está
+instalado el paquete brotli, .br), y escribe dist/manifest.json.
+En ejecución, static_url() resuelve la ruta con el manifest y
+ArchivosEstaticos sirve la variante comprimida con Cache-Control immutable.
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+
+from starlette.responses import FileResponse
+from starlette.staticfiles import StaticFiles
+
+try:
+    import brotli
+except ImportError:  # opcional
+    brotli = None
+
+try:
+    import rjsmin
+except ImportError:  # opcional
+    rjsmin = None
+
+try:
+    import rcssmin
+except ImportError:  # opcional
+    rcssmin = None
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static")
+DIST = "dist"
+DIST_DIR = os.path.join(STATIC_DIR, DIST)
+MANIFEST_PATH = os.path.join(DIST_DIR, "manifest.json")
+
+# Archivos (relativos a app/static) que pasan por el pipeline
+ASSETS = [
+    "style.css",
+    "app.js",
+    "qr-scanner.js",
+    "css/salida.css",
+    "css/entrada.css",
+    "css/movimientos.css",
+    "js/salida.js",
+    "js/entrada.js",
+    "js/movimientos.js",
+]
+
+CACHE_INMUTABLE = "public, max-age=31536000, immutable"
+
+# ===== Minificación =====
+def minificar_css(texto: str) -> str:
+    if rcssmin:
+        return rcssmin.cssmin(texto)
+    texto = re.sub(r"/\*.*?\*/", "", texto, flags=re.S)
+    texto = re.sub(r"\s+", " ", texto)
+    # Sin ":": el espacio de ".a :hover" (descendiente) es significativo
+    texto = re.sub(r"\s*([{};,>])\s*", r"\1", texto)
+    return texto.replace(";}", "}").strip()
+
+def minificar_js(texto: str) -> str:
+    """
+    Sin rjsmin se hace una minificación conservadora por líneas (sangría,
+    líneas vacías y comentarios de línea completa) que no toca el código.
+    """
+    if rjsmin:
+        return rjsmin.jsmin(texto)
+    lineas = []
+    for linea in texto.splitlines():
+        linea = linea.strip()
+        if not linea or linea.startswith("//"):
+            continue
+        lineas.append(linea)
+    return "\n".join(lineas) + "\n"
+
+# ===== Construcción =====
+def construir() -> dict:
+    """Genera dist/ y el manifest. Devuelve el manifest."""
+    if os.path.isdir(DIST_DIR):
+        shutil.rmtree(DIST_DIR)
+    os.makedirs(DIST_DIR)
+
+    manifest = {}
+    for ruta in ASSETS:
+        with open(os.path.join(STATIC_DIR, ruta), encoding="utf-8") as f:
+            texto = f.read()
+        if ruta.endswith(".css"):
+            texto = minificar_css(texto)
+        elif ruta.endswith(".js"):
+            texto = minificar_js(texto)
+        datos = texto.encode("utf-8")
+
+        huella = hashlib.sha256(datos).hexdigest()[:12]
+        base, extension = os.path.splitext(ruta)
+        destino = f"{DIST}/{base}.{huella}{extension}"
+        ruta_destino = os.path.join(STATIC_DIR, destino)
+        os.makedirs(os.path.dirname(ruta_destino), exist_ok=True)
+
+        with open(ruta_destino, "wb") as f:
+            f.write(datos)
+        with open(ruta_destino + ".gz", "wb") as f:
+            f.write(gzip.compress(datos, compresslevel=9, mtime=0))
+        if brotli:
+            with open(ruta_destino + ".br", "wb") as f:
+                f.write(brotli.compress(datos, quality=11))
+
+        manifest[ruta] = destino
+        print(f"📦 {ruta} -> {destino}")
+
+    with open(MANIFEST_PATH, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+# ===== Ejecución =====
+_manifest = None
+
+def cargar_manifest() -> dict:
+    global _manifest
+    if _manifest is None:
+        try:
+            with open(MANIFEST_PATH, encoding="utf-8") as f:
+                _manifest = json.load(f)
+        except (FileNotFoundError, ValueError):
+            # Sin construir: se sirven los archivos originales
+            _manifest = {}
+    return _manifest
+
+def static_url(ruta: str) -> str:
+    """URL pública de un archivo estático, con huella si está construido."""
+    return f"/static/{cargar_manifest().get(ruta, ruta)}"
+
+class ArchivosEstaticos(StaticFiles):
+    """
+    StaticFiles que para los archivos con huella (dist/) sirve la variante
+    .br/.gz según Accept-Encoding y los marca como inmutables.
+    """
+    async def get_response(self, path, scope):
+        if not path.startswith(DIST + "/") or path.endswith((".gz", ".br")):
+            return await super().get_response(path, scope)
+
+        aceptadas = ""
+        for nombre, valor in scope.get("headers", []):
+            if nombre == b"accept-encoding":
+                aceptadas = valor.decode("latin-1")
+                break
+
+        respuesta = None
+        for codificacion, sufijo in (("br", ".br"), ("gzip", ".gz")):
+            if codificacion in aceptadas:
+                ruta_completa, stat = self.lookup_path(path + sufijo)
+                if stat is not None:
+                    media_type = "text/css; charset=utf-8" if path.endswith(".css") else "text/javascript; charset=utf-8"
+                    respuesta = FileResponse(ruta_completa, stat_result=stat, media_type=media_type)
+                    respuesta.headers["Content-Encoding"] = codificacion
+                    break
+
+        if respuesta is None:
+            respuesta = await super().get_response(path, scope)
+        if respuesta.status_code == 200:
+            respuesta.headers["Cache-Control"] = CACHE_INMUTABLE
+            respuesta.headers["Vary"] = "Accept-Encoding"
+        return respuesta
+
+if __name__ == "__main__":
+    construir()
@@ -0,0 +1,149 @@
+# app/utils/etiquetas.py
+import io
+from collections import deque
+from typing import Iterable, Iterator, Tuple
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import cm
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+
+from .codigos import generar_codigo_barras_png, generar_qr_png
+from .procesos import obtener_pool
+
+# Por debajo de este número de etiquetas no compensa usar el pool de procesos
+UMBRAL_POOL = 24
+
+MARGEN = 1 * cm
+
+# ReportLab guarda todas las páginas de un Canvas hasta save(): las hojas más
+# largas se parten en varios PDF para que la memoria no crezca con el total
+PAGINAS_POR_PDF = 50
+
+# Opciones del código de barras para etiquetas (más pequeño que el de pantalla)
+OPCIONES_BARRAS = {
+    'module_height': 8.0,
+    'module_width': 0.25,
+    'quiet_zone': 1.0,
+    'dpi': 200,
+}
+
+def renderizar_etiqueta(codigo: str, tipo: str) -> dict:
+    """
+    Genera las imágenes de una etiqueta. Se ejecuta en los procesos del pool.
+    """
+    imagenes = {"barras": None, "qr": None}
+    if tipo in ("barras", "ambos"):
+        imagenes["barras"] = generar_codigo_barras_png(codigo, OPCIONES_BARRAS)
+    if tipo in ("qr", "ambos"):
+        # El QR de la etiqueta contiene solo el código para que el escáner lo busque directo
+        imagenes["qr"] = generar_qr_png(codigo, box_size=4, con_logo=False)
+    return imagenes
+
+def _renderizar_en_orden(productos: Iterable[Tuple[str, str]], tipo: str, usar_pool: bool, ventana: int) -> Iterator:
+    """
+    Renderiza las etiquetas conservando el orden y con un máximo de
+    `ventana` etiquetas en vuelo, para que la memoria no crezca con el total.
+    """
+    if not usar_pool:
+        for codigo, nombre in productos:
+            yield codigo, nombre, renderizar_etiqueta(codigo, tipo)
+        return
+
+    pool = obtener_pool()
+    pendientes = deque()
+    for codigo, nombre in productos:
+        pendientes.append((codigo, nombre, pool.submit(renderizar_etiqueta, codigo, tipo)))
+        if len(pendientes) >= ventana:
+            codigo_listo, nombre_listo, futuro = pendientes.popleft()
+            yield codigo_listo, nombre_listo, futuro.result()
+
+    while pendientes:
+        codigo_listo, nombre_listo, futuro = pendientes.popleft()
+        yield codigo_listo, nombre_listo, futuro.result()
+
+def generar_hojas_etiquetas(productos: Iterable[Tuple[str, str]], total: int,
+                            columnas: int = 3, filas: int = 8, tipo: str = "ambos",
+                            copias: int = 1, incluir_nombre: bool = True,
+                            paginas_por_pdf: int = PAGINAS_POR_PDF) -> Iterator[bytes]:
+    """
+    Compone las etiquetas en PDFs de N por página y de a lo sumo
+    `paginas_por_pdf` páginas cada uno.
+
+    Args:
+        productos: iterable de tuplas (codigo, nombre)
+        total: número de productos (para decidir si usar el pool)
+
+    Yields:
+        el contenido de cada PDF, a medida que se completa
+    """
+    ancho_pagina, alto_pagina = A4
+    ancho_celda = (ancho_pagina - 2 * MARGEN) / columnas
+    alto_celda = (alto_pagina - 2 * MARGEN) / filas
+    por_pagina = columnas * filas
+    por_pdf = por_pagina * paginas_por_pdf
+
+    usar_pool = total >= UMBRAL_POOL
+    posicion = 0
+    c = destino = None
+
+    for codigo, nombre, imagenes in _renderizar_en_orden(productos, tipo, usar_pool, ventana=2 * por_pagina):
+        for _ in range(copias):
+            if posicion % por_pdf == 0:
+                if c is not None:
+                    c.save()
+                    yield destino.getvalue()
+                destino = io.BytesIO()
+                c = canvas.Canvas(destino, pagesize=A4)
+                c.setTitle("Etiquetas Inventario FIMLM")
+            elif posicion % por_pagina == 0:
+                c.showPage()
+
+            indice = posicion % por_pagina
+            x = MARGEN + (indice % columnas) * ancho_celda
+            y = alto_pagina - MARGEN - (indice // columnas + 1) * alto_celda
+            _dibujar_etiqueta(c, x, y, ancho_celda, alto_celda, codigo, nombre, imagenes, incluir_nombre)
+            posicion += 1
+
+    if c is not None:
+        c.save()
+        yield destino.getvalue()
+
+def _dibujar_etiqueta(c, x, y, ancho, alto, codigo, nombre, imagenes, incluir_nombre):
+    """Dibuja una etiqueta dentro de su celda."""
+    relleno = 0.15 * cm
+
+    # Borde de corte
+    c.setLineWidth(0.25)
+    c.setStrokeColorRGB(0.8, 0.8, 0.8)
+    c.rect(x, y, ancho, alto)
+
+    # Texto: nombre arriba, código abajo
+    alto_texto = 0.35 * cm
+    superior = y + alto - relleno
+    if incluir_nombre and nombre:
+        c.setFont("Helvetica-Bold", 7)
+        max_chars = max(int(ancho / 3.6), 8)
+        c.drawCentredString(x + ancho / 2, superior - alto_texto + 2, nombre[:max_chars])
+        superior -= alto_texto
+
+    c.setFont("Helvetica", 7)
+    c.drawCentredString(x + ancho / 2, y + relleno + 1, codigo)
+    inferior = y + relleno + alto_texto
+
+    # Zona para imágenes
+    alto_img = superior - inferior - relleno
+    ancho_util = ancho - 2 * relleno
+    if alto_img <= 0:
+        return
+
+    barras, qr = imagenes.get("barras"), imagenes.get("qr")
+    if barras and qr:
+        lado_qr = min(alto_img, ancho_util * 0.4)
+        c.drawImage(ImageReader(io.BytesIO(qr)), x + relleno, inferior, lado_qr, alto_img,
+                    preserveAspectRatio=True, anchor='c')
+        c.drawImage(ImageReader(io.BytesIO(barras)), x + 2 * relleno + lado_qr, inferior,
+                    ancho_util - lado_qr - relleno, alto_img, preserveAspectRatio=True, anchor='c')
+    elif barras or qr:
+        c.drawImage(ImageReader(io.BytesIO(barras or qr)), x + relleno, inferior, ancho_util, alto_img,
+                    preserveAspectRatio=True, anchor='c')
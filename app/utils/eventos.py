@@ -0,0 +1,210 @@
+# app/utils/eventos.py
+"""
+Stream de cambios de stock en tiempo real.
+
+1. Registro: cada flush que cambia el stock de un producto (movimientos,
+   altas, bajas, ediciones) agrega filas a eventos_stock en la misma
+   transacción, así ningún cambio confirmado se pierde.
+2. Difusión: en cada worker una tarea lee los eventos nuevos por id
+   (al instante si el commit fue local, cada INTERVALO_LECTURA si vino de
+   otro worker) y los reparte a los clientes conectados por colas acotadas.
+   Un cliente lento no frena a los demás: si su cola se llena se descarta
+   lo pendiente y recibe un evento "resync" para que recargue los datos.
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import event, func, inspect, insert
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..database import SessionLocal
+from . import metricas
+
+TAMANO_COLA = 100            # eventos pendientes por cliente antes de pedirle resync
+MAX_SUSCRIPTORES = 500       # clientes por worker
+INTERVALO_LECTURA = 1.0      # segundos entre lecturas de eventos de otros workers
+RETENCION = timedelta(days=1)
+INTERVALO_LIMPIEZA = 600     # segundos entre borrados de eventos viejos
+
+RESYNC = {"tipo": "resync"}
+
+def evento_a_dict(fila) -> dict:
+    """Forma compacta que se envía a los clientes."""
+    return {
+        "id": fila.id,
+        "producto_id": fila.producto_id,
+        "tipo": fila.tipo,
+        "stock": fila.stock,
+        "delta": fila.delta,
+        "bajo_minimo": fila.stock < fila.stock_minimo,
+    }
+
+def leer_desde(ultimo_id: int, limite: int = 500) -> list:
+    """Eventos con id mayor a `ultimo_id`, en orden."""
+    db = SessionLocal()
+    try:
+        filas = db.query(models.EventoStock).filter(
+            models.EventoStock.id > ultimo_id
+        ).order_by(models.EventoStock.id).limit(limite).all()
+        return [evento_a_dict(f) for f in filas]
+    finally:
+        db.close()
+
+def ultimo_evento_id() -> int:
+    db = SessionLocal()
+    try:
+        return db.query(func.max(models.EventoStock.id)).scalar() or 0
+    finally:
+        db.close()
+
+def limpiar_eventos_viejos() -> int:
+    db = SessionLocal()
+    try:
+        borrados = db.query(models.EventoStock).filter(
+            models.EventoStock.fecha < datetime.utcnow() - RETENCION
+        ).delete(synchronize_session=False)
+        db.commit()
+        return borrados
+    finally:
+        db.close()
+
+# ===== Registro en el camino de escritura =====
+def _fila_evento(producto, tipo, stock, delta, ahora) -> dict:
+    return {
+        "producto_id": producto.id,
+        "tipo": tipo,
+        "stock": stock,
+        "delta": delta,
+        "stock_minimo": producto.stock_minimo or 0,
+        "fecha": ahora,
+    }
+
+@event.listens_for(Session, "after_flush")
+def _registrar_cambios_stock(session, flush_context):
+    ahora = datetime.utcnow()
+    filas = []
+    for obj in session.new:
+        if isinstance(obj, models.Producto):
+            stock = obj.stock_actual or 0
+            filas.append(_fila_evento(obj, "alta", stock, stock, ahora))
+    for obj in session.dirty:
+        if not isinstance(obj, models.Producto):
+            continue
+        estado = inspect(obj)
+        historia = estado.attrs.stock_actual.history
+        if historia.has_changes():
+            anterior = (historia.deleted[0] if historia.deleted else None) or 0
+            stock = obj.stock_actual or 0
+            filas.append(_fila_evento(obj, "cambio", stock, stock - anterior, ahora))
+        elif estado.attrs.stock_minimo.history.has_changes():
+            # Cambia si está bajo el mínimo aunque el stock sea el mismo
+            filas.append(_fila_evento(obj, "cambio", obj.stock_actual or 0, 0, ahora))
+    for obj in session.deleted:
+        if isinstance(obj, models.Producto):
+            filas.append(_fila_evento(obj, "baja", 0, -(obj.stock_actual or 0), ahora))
+    if filas:
+        session.connection().execute(insert(models.EventoStock), filas)
+        session.info["eventos_stock"] = True
+
+@event.listens_for(Session, "after_commit")
+def _avisar_commit(session):
+    if session.info.pop("eventos_stock", False):
+        difusor.despertar()
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_aviso(session):
+    session.info.pop("eventos_stock", None)
+
+# ===== Difusión a los clientes del worker =====
+class Difusor:
+    def __init__(self):
+        self._suscriptores = set()
+        self._loop = None
+        self._despertar = None
+        self._tarea = None
+        self._ultimo_id = 0
+
+    async def iniciar(self):
+        self._loop = asyncio.get_running_loop()
+        self._despertar = asyncio.Event()
+        self._ultimo_id = await run_in_threadpool(ultimo_evento_id)
+        self._tarea = asyncio.create_task(self._leer())
+
+    async def detener(self):
+        if self._tarea:
+            self._tarea.cancel()
+            try:
+                await self._tarea
+            except asyncio.CancelledError:
+                pass
+            self._tarea = None
+
+    def despertar(self):
+        """Se puede llamar desde cualquier hilo (p. ej. el del request que hizo commit)."""
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._despertar.set)
+
+    @property
+    def ultimo_id(self) -> int:
+        return self._ultimo_id
+
+    def suscribir(self) -> asyncio.Queue:
+        if len(self._suscriptores) >= MAX_SUSCRIPTORES:
+            raise OverflowError("Demasiados clientes conectados")
+        cola = asyncio.Queue(maxsize=TAMANO_COLA)
+        self._suscriptores.add(cola)
+        metricas.fijar("eventos.suscriptores", len(self._suscriptores))
+        return cola
+
+    def desuscribir(self, cola: asyncio.Queue):
+        self._suscriptores.discard(cola)
+        metricas.fijar("eventos.suscriptores", len(self._suscriptores))
+
+    def publicar(self, eventos: list):
+        for cola in list(self._suscriptores):
+            for evento in eventos:
+                try:
+                    cola.put_nowait(evento)
+                except asyncio.QueueFull:
+                    while not cola.empty():
+                        cola.get_nowait()
+                    cola.put_nowait(RESYNC)
+                    metricas.incrementar("eventos.resync")
+                    break
+
+    async def _leer(self):
+        ultima_limpieza = 0.0
+        while True:
+            try:
+                await asyncio.wait_for(self._despertar.wait(), INTERVALO_LECTURA)
+            except asyncio.TimeoutError:
+                pass
+            self._despertar.clear()
+            try:
+                if not self._suscriptores:
+                    # Sin clientes no se lee nada; se saltea lo ocurrido mientras tanto
+                    maximo = await run_in_threadpool(ultimo_evento_id)
+                    # Si alguien se suscribió mientras tanto, no saltear lo que le toca
+                    if not self._suscriptores:
+                        self._ultimo_id = maximo
+                else:
+                    while True:
+                        eventos = await run_in_threadpool(leer_desde, self._ultimo_id)
+                        if not eventos:
+                            break
+                        self._ultimo_id = eventos[-1]["id"]
+                        self.publicar(eventos)
+                        metricas.incrementar("eventos.enviados", len(eventos))
+                ahora = self._loop.time()
+                if ahora - ultima_limpieza > INTERVALO_LIMPIEZA:
+                    ultima_limpieza = ahora
+                    await run_in_threadpool(limpiar_eventos_viejos)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Error leyendo eventos de stock: {e}")
+                metricas.incrementar("eventos.errores")
+
+difusor = Difusor()
@@ -0,0 +1,59 @@
+# app/utils/http_cache.py
+import hashlib
+from email.utils import format_datetime, parsedate_to_datetime
+from datetime import timezone
+from typing import Optional
+
+from fastapi import Request, Response
+from starlette.middleware.gzip import GZipMiddleware
+
+from . import versiones
+
+def respuesta_condicional(request: Request, response: Response, db, *tablas) -> Optional[Response]:
+    """
+    GET condicional barato: el ETag sale de la versión de las tablas y de la URL.
+    Si el cliente ya tiene esa versión devuelve un 304 (antes de cargar nada del ORM);
+    si no, agrega ETag/Last-Modified a `response` y devuelve None.
+    """
+    estado = versiones.obtener(db, *tablas)
+    firma = f"{request.url.path}?{request.url.query}|" + "|".join(
+        f"{tabla}:{estado[tabla][0]}" for tabla in sorted(estado)
+    )
+    etag = f'W/"{hashlib.sha1(firma.encode()).hexdigest()[:20]}"'
+
+    fechas = [actualizado for _, actualizado in estado.values() if actualizado]
+    ultima = max(fechas).replace(tzinfo=timezone.utc, microsecond=0) if fechas else None
+
+    cabeceras = {"ETag": etag, "Cache-Control": "no-cache"}
+    if ultima:
+        cabeceras["Last-Modified"] = format_datetime(ultima, usegmt=True)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        if if_none_match.strip() == "*" or etag in [e.strip() for e in if_none_match.split(",")]:
+            return Response(status_code=304, headers=cabeceras)
+    elif ultima and request.headers.get("if-modified-since"):
+        try:
+            if ultima <= parsedate_to_datetime(request.headers["if-modified-since"]):
+                return Response(status_code=304, headers=cabeceras)
+        except (TypeError, ValueError):
+            pass
+
+    response.headers.update(cabeceras)
+    return None
+
+class CompresionGZip(GZipMiddleware):
+    """
+    GZip para las respuestas de la API y las páginas; no vuelve a comprimir
+    descargas que ya van comprimidas (PDF, ZIP, Excel) ni los estáticos precomprimidos.
+    Tampoco comprime el stream de eventos, que quedaría retenido en el buffer de gzip.
+    """
+    EXCLUIDAS = ("/pdf", ".pdf", ".zip", "/exportar/excel", "/etiquetas", "/eventos")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            path = scope.get("path", "")
+            if path.endswith(self.EXCLUIDAS) or path.startswith("/static/dist/"):
+                await self.app(scope, receive, send)
+                return
+        await super().__call__(scope, receive, send)
@@ -0,0 +1,192 @@
+# app/utils/mantenimiento.py
+"""
+Mantenimiento de SQLite: checkpoints del WAL y respaldos en línea.
+
+En modo WAL las escrituras van a inventario.db-wal y un checkpoint las pasa
+a la base. El checkpoint automático de SQLite no termina mientras haya
+lectores con una instantánea vieja, y el archivo -wal nunca se achica.
+La tarea periódica corre un checkpoint PASSIVE (no espera a nadie) y, si
+el -wal pasó de WAL_MAX_MB, uno TRUNCATE que lo deja en cero.
+
+Los respaldos usan la API de backup de sqlite3 por pasos de
+PAGINAS_POR_PASO páginas: en WAL los lectores no bloquean a los que
+escriben. Si otra conexión escribe entre dos pasos, SQLite reinicia la
+copia; después de MAX_REINICIOS se copia en un solo paso (una única
+lectura, que en WAL tampoco bloquea las escrituras). Se copia a un
+temporal que se renombra al terminar (nunca queda un respaldo a medias) y
+se conservan los últimos RESPALDOS_MAX.
+
+Desde la terminal:
+    python -m app.utils.mantenimiento checkpoint [truncate]
+    python -m app.utils.mantenimiento respaldo
+"""
+import glob
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+from ..database import ARCHIVO_ADJUNTO, ARCHIVO_DB, BASE_DIR, DB_PATH, engine
+from . import metricas, tareas
+
+WAL_MAX_MB = float(os.getenv("INVENTARIO_WAL_MAX_MB", "64"))
+CHECKPOINT_INTERVALO_S = int(os.getenv("INVENTARIO_CHECKPOINT_INTERVALO", "60"))
+RESPALDO_INTERVALO_S = int(os.getenv("INVENTARIO_RESPALDO_INTERVALO", str(24 * 3600)))
+RESPALDOS_DIR = os.getenv("INVENTARIO_RESPALDOS") or os.path.join(BASE_DIR, "respaldos")
+RESPALDOS_MAX = int(os.getenv("INVENTARIO_RESPALDOS_MAX", "7"))
+PAGINAS_POR_PASO = 1024
+PAUSA_ENTRE_PASOS_S = 0.01
+MAX_REINICIOS = 3
+# Los respaldos llevan el nombre de su base: los de otra (p. ej. la sintética
+# de los benchmarks) no desplazan a los de la real al podar
+PREFIJO = os.path.splitext(os.path.basename(DB_PATH))[0]
+PREFIJO_ARCHIVO = os.path.splitext(os.path.basename(ARCHIVO_DB))[0]
+ESPERA_TRUNCATE_MS = 2000  # TRUNCATE espera a lectores y escritores: no más que esto
+
+MODOS = ("PASSIVE", "TRUNCATE")
+
+_ultimo_checkpoint = {}
+
+def tamano_wal(ruta: str = DB_PATH) -> int:
+    try:
+        return os.path.getsize(ruta + "-wal")
+    except OSError:
+        return 0
+
+def checkpoint(modo: str = "PASSIVE") -> dict:
+    """Corre un checkpoint del WAL (y del archivo, si está adjunto) y devuelve su resultado."""
+    modo = modo.upper()
+    if modo not in MODOS:
+        raise ValueError(f"Modo de checkpoint inválido: {modo}")
+    inicio = time.perf_counter()
+    with engine.connect() as conexion:
+        dbapi = conexion.connection.dbapi_connection
+        espera = dbapi.execute("PRAGMA busy_timeout").fetchone()[0]
+        if modo == "TRUNCATE":
+            dbapi.execute(f"PRAGMA busy_timeout={ESPERA_TRUNCATE_MS}")
+        try:
+            ocupado, paginas_wal, copiadas = dbapi.execute(f"PRAGMA main.wal_checkpoint({modo})").fetchone()
+            if ARCHIVO_ADJUNTO:
+                dbapi.execute(f"PRAGMA archivo.wal_checkpoint({modo})")
+        finally:
+            dbapi.execute(f"PRAGMA busy_timeout={espera}")
+    duracion_ms = (time.perf_counter() - inicio) * 1000
+
+    resultado = {
+        "modo": modo,
+        "ocupado": bool(ocupado),
+        "paginas_wal": paginas_wal,
+        "paginas_copiadas": copiadas,
+        # Páginas del WAL que todavía no están en la base
+        "retraso_paginas": max(0, paginas_wal - copiadas),
+        "wal_bytes": tamano_wal(),
+        "ms": round(duracion_ms, 1),
+        "fecha": datetime.utcnow(),
+    }
+    _ultimo_checkpoint.update(resultado)
+    metricas.registrar("sqlite.checkpoint.ms", duracion_ms)
+    metricas.fijar("sqlite.wal_bytes", resultado["wal_bytes"])
+    metricas.fijar("sqlite.checkpoint_retraso_paginas", resultado["retraso_paginas"])
+    if ocupado:
+        metricas.incrementar("sqlite.checkpoint.ocupado")
+    return resultado
+
+@tareas.registrar("checkpoint_wal", CHECKPOINT_INTERVALO_S)
+def checkpoint_periodico(db) -> dict:
+    modo = "TRUNCATE" if tamano_wal() >= WAL_MAX_MB * 1024 * 1024 else "PASSIVE"
+    return checkpoint(modo)
+
+def _respaldos(directorio: str, prefijo: str) -> list:
+    # El nombre lleva la fecha: en orden alfabético quedan del más viejo al más nuevo
+    return sorted(glob.glob(os.path.join(directorio, f"{prefijo}_????????_??????.db")))
+
+class _CopiaReiniciada(Exception):
+    pass
+
+def _copiar(fuente, destino, esquema: str, paginas_por_paso: int) -> bool:
+    """Copia `esquema` a `destino` por pasos. Devuelve True si terminó en un solo paso."""
+    anterior = {"restantes": None, "reinicios": 0}
+
+    def progreso(status, restantes, total):
+        # Si quedan más páginas que en el paso anterior, la copia volvió a empezar
+        if anterior["restantes"] is not None and restantes > anterior["restantes"]:
+            anterior["reinicios"] += 1
+            if anterior["reinicios"] > MAX_REINICIOS:
+                raise _CopiaReiniciada()
+        anterior["restantes"] = restantes
+
+    try:
+        fuente.backup(destino, pages=paginas_por_paso, progress=progreso, name=esquema, sleep=PAUSA_ENTRE_PASOS_S)
+        return False
+    except _CopiaReiniciada:
+        metricas.incrementar("sqlite.respaldo.reiniciados")
+        fuente.backup(destino, pages=-1, name=esquema)
+        return True
+
+def respaldar(directorio: str = RESPALDOS_DIR, paginas_por_paso: int = PAGINAS_POR_PASO) -> dict:
+    """Respaldo en línea de la base (y del archivo, si está adjunto). Devuelve los archivos creados."""
+    os.makedirs(directorio, exist_ok=True)
+    marca = datetime.now().strftime("%Y%m%d_%H%M%S")
+    bases = [("main", PREFIJO)] + ([("archivo", PREFIJO_ARCHIVO)] if ARCHIVO_ADJUNTO else [])
+    inicio = time.perf_counter()
+    archivos = []
+    with engine.connect() as conexion:
+        fuente = conexion.connection.dbapi_connection
+        for esquema, prefijo in bases:
+            ruta = os.path.join(directorio, f"{prefijo}_{marca}.db")
+            temporal = ruta + ".tmp"
+            destino = sqlite3.connect(temporal)
+            try:
+                un_paso = _copiar(fuente, destino, esquema, paginas_por_paso)
+            except Exception:
+                destino.close()
+                os.remove(temporal)
+                raise
+            destino.close()
+            # Que el contenido esté en disco antes de que el nombre final lo dé por bueno
+            with open(temporal, "rb") as f:
+                os.fsync(f.fileno())
+            os.replace(temporal, ruta)
+            archivos.append({"ruta": ruta, "bytes": os.path.getsize(ruta), "un_paso": un_paso})
+            for viejo in _respaldos(directorio, prefijo)[:-RESPALDOS_MAX]:
+                os.remove(viejo)
+    segundos = time.perf_counter() - inicio
+    metricas.registrar("sqlite.respaldo.ms", segundos * 1000)
+    metricas.fijar("sqlite.ultimo_respaldo", marca)
+    return {"archivos": archivos, "segundos": round(segundos, 2)}
+
+@tareas.registrar("respaldo", RESPALDO_INTERVALO_S)
+def respaldo_periodico(db) -> dict:
+    resultado = respaldar()
+    print(f"💾 Respaldo: {', '.join(a['ruta'] for a in resultado['archivos'])} ({resultado['segundos']} s)")
+    return resultado
+
+def estado() -> dict:
+    """Tamaño de la base y del WAL, último checkpoint de este proceso y respaldos guardados."""
+    return {
+        "base_bytes": os.path.getsize(DB_PATH) if os.path.exists(DB_PATH) else 0,
+        "wal_bytes": tamano_wal(),
+        "wal_max_bytes": int(WAL_MAX_MB * 1024 * 1024),
+        "ultimo_checkpoint": _ultimo_checkpoint or None,
+        "respaldos": [
+            {"ruta": ruta, "bytes": os.path.getsize(ruta)}
+            for prefijo in (PREFIJO, PREFIJO_ARCHIVO)
+            for ruta in _respaldos(RESPALDOS_DIR, prefijo)
+        ],
+    }
+
+if __name__ == "__main__":
+    import sys
+
+    accion = sys.argv[1] if len(sys.argv) > 1 else "checkpoint"
+    if accion == "respaldo":
+        resultado = respaldar()
+        for archivo in resultado["archivos"]:
+            print(f"💾 {archivo['ruta']} ({archivo['bytes'] / 1024 / 1024:.1f} MB)")
+        print(f"Respaldo terminado en {resultado['segundos']} s")
+    else:
+        antes = tamano_wal()
+        resultado = checkpoint(sys.argv[2] if len(sys.argv) > 2 else "PASSIVE")
+        print(f"🧹 Checkpoint {resultado['modo']}: {resultado['paginas_copiadas']}/{resultado['paginas_wal']} páginas, "
+              f"WAL {antes / 1024 / 1024:.1f} MB -> {resultado['wal_bytes'] / 1024 / 1024:.1f} MB"
+              f"{' (ocupado)' if resultado['ocupado'] else ''}")
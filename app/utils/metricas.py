@@ -0,0 +1,47 @@
+# app/utils/metricas.py
+import threading
+import time
+
+# Registro de métricas en memoria del proceso (se consulta en /api/sistema/metricas)
+_lock = threading.Lock()
+_observaciones = {}
+_contadores = {}
+_valores = {}
+_inicio = time.time()
+
+def registrar(nombre: str, valor: float):
+    """Agrega una observación (latencia, tamaño, etc.) a una serie."""
+    with _lock:
+        serie = _observaciones.get(nombre)
+        if serie is None:
+            _observaciones[nombre] = {"cantidad": 1, "suma": valor, "min": valor, "max": valor, "ultimo": valor}
+        else:
+            serie["cantidad"] += 1
+            serie["suma"] += valor
+            serie["min"] = min(serie["min"], valor)
+            serie["max"] = max(serie["max"], valor)
+            serie["ultimo"] = valor
+
+def incrementar(nombre: str, cantidad: float = 1):
+    """Suma a un contador."""
+    with _lock:
+        _contadores[nombre] = _contadores.get(nombre, 0) + cantidad
+
+def fijar(nombre: str, valor):
+    """Guarda el valor actual de un indicador."""
+    with _lock:
+        _valores[nombre] = valor
+
+def resumen() -> dict:
+    """Copia de todas las métricas con el promedio de cada serie."""
+    with _lock:
+        observaciones = {
+            nombre: {**serie, "promedio": serie["suma"] / serie["cantidad"]}
+            for nombre, serie in _observaciones.items()
+        }
+        return {
+            "uptime_s": round(time.time() - _inicio, 1),
+            "contadores": dict(_contadores),
+            "valores": dict(_valores),
+            "observaciones": observaciones,
+        }
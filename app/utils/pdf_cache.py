@@ -0,0 +1,100 @@
+# app/utils/pdf_cache.py
+import glob
+import hashlib
+import json
+import os
+import tempfile
+
+from sqlalchemy import event, inspect
+
+from .. import models
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMPROBANTES_DIR = os.path.join(BASE_DIR, "static", "pdfs", "comprobantes")
+
+# Cambiar al modificar el diseño del comprobante para que no se sirvan PDFs viejos
+VERSION_PLANTILLA = "1"
+
+# Campos del movimiento que aparecen en el comprobante
+CAMPOS_COMPROBANTE = ("cantidad", "motivo", "notas", "cliente_destino", "usuario", "fecha_movimiento", "producto_id")
+
+def clave_comprobante(salida_data: dict, productos_data: list) -> str:
+    """Hash SHA-256 del contenido del comprobante."""
+    contenido = json.dumps(
+        {"v": VERSION_PLANTILLA, "salida": salida_data, "productos": productos_data},
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(contenido.encode("utf-8")).hexdigest()
+
+def _obtener_comprobante(prefijo: str, datos: dict, productos_data: list, generar) -> str:
+    """
+    Devuelve la ruta del comprobante en disco, generándolo solo si
+    no existe uno con el mismo contenido.
+    """
+    clave = clave_comprobante(datos, productos_data)
+    ruta = os.path.join(COMPROBANTES_DIR, f"{prefijo}_{clave[:32]}.pdf")
+    if os.path.exists(ruta):
+        return ruta
+
+    # Si el contenido cambió (p. ej. se renombró el producto) borrar las versiones anteriores
+    _invalidar(prefijo)
+
+    pdf_bytes = generar(datos, productos_data)
+
+    # Escritura atómica: otro proceso nunca ve un archivo a medias
+    os.makedirs(COMPROBANTES_DIR, exist_ok=True)
+    fd, temporal = tempfile.mkstemp(dir=COMPROBANTES_DIR, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(pdf_bytes)
+    os.replace(temporal, ruta)
+    return ruta
+
+def obtener_comprobante_salida(movimiento_id: int, salida_data: dict, productos_data: list) -> str:
+    """Comprobante de una salida individual."""
+    from .pdf_generator import PDFGenerator  # reportlab solo se carga al generar PDFs
+    return _obtener_comprobante(
+        f"salida_{movimiento_id}", salida_data, productos_data,
+        PDFGenerator().generar_comprobante_salida
+    )
+
+def obtener_comprobante_documento(documento_id: int, tipo: str, datos: dict, productos_data: list) -> str:
+    """Comprobante consolidado de un documento (entrada o salida múltiple)."""
+    from .pdf_generator import PDFGenerator
+    generador = PDFGenerator()
+    generar = generador.generar_comprobante_entrada if tipo == "entrada" else generador.generar_comprobante_salida
+    return _obtener_comprobante(f"documento_{documento_id}", datos, productos_data, generar)
+
+def _invalidar(prefijo: str):
+    for ruta in glob.glob(os.path.join(COMPROBANTES_DIR, f"{prefijo}_*.pdf")):
+        try:
+            os.remove(ruta)
+        except FileNotFoundError:
+            pass
+
+def invalidar_comprobante(movimiento_id: int):
+    """Elimina los comprobantes guardados de un movimiento."""
+    _invalidar(f"salida_{movimiento_id}")
+
+def invalidar_documento(documento_id: int):
+    """Elimina los comprobantes guardados de un documento."""
+    _invalidar(f"documento_{documento_id}")
+
+# ===== Invalidación al editar o eliminar movimientos =====
+@event.listens_for(models.Movimiento, "after_update")
+def _invalidar_al_editar(mapper, connection, target):
+    estado = inspect(target)
+    if any(estado.attrs[campo].history.has_changes() for campo in CAMPOS_COMPROBANTE):
+        invalidar_comprobante(target.id)
+        if target.documento_id:
+            invalidar_documento(target.documento_id)
+
+@event.listens_for(models.Movimiento, "after_delete")
+def _invalidar_al_eliminar(mapper, connection, target):
+    invalidar_comprobante(target.id)
+    if target.documento_id:
+        invalidar_documento(target.documento_id)
+
+@event.listens_for(models.Documento, "after_update")
+def _invalidar_documento_al_editar(mapper, connection, target):
+    invalidar_documento(target.id)
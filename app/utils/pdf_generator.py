@@ -5,13 +5,118 @@ from reportlab.lib.units import cm
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Table, TableStyle, Spacer
 from reportlab.lib import colors
+from reportlab.platypus.flowables import HRFlowable
 from datetime import datetime
+from functools import lru_cache
+import copy
 import io
 import os
 
+# ===== Plantilla compartida por proceso =====
+# Los estilos y los flowables fijos (encabezado y pie) se construyen una sola vez;
+# cada comprobante usa copias superficiales para no compartir el estado de maquetación.
+
+@lru_cache(maxsize=1)
+def _hoja_estilos():
+    """Estilos base de ReportLab más los estilos propios del comprobante."""
+    styles = getSampleStyleSheet()
+    propios = {
+        'TitleStyle': ParagraphStyle(
+            'TitleStyle',
+            parent=styles['Heading1'],
+            fontSize=18,
+            alignment=1,  # Centrado
+            spaceAfter=6,
+            textColor=colors.HexColor('#1a3d7c'),  # Azul oscuro
+            fontName='Helvetica-Bold'
+        ),
+        'SubtitleStyle': ParagraphStyle(
+            'SubtitleStyle',
+            parent=styles['Heading2'],
+            fontSize=14,
+            alignment=1,
+            spaceAfter=12,
+            textColor=colors.HexColor('#2c5282'),
+            fontName='Helvetica'
+        ),
+        'InfoStyle': ParagraphStyle(
+            'InfoStyle',
+            parent=styles['Normal'],
+            fontSize=10,
+            leading=12,
+            spaceAfter=3
+        ),
+        'TableTitle': ParagraphStyle(
+            'TableTitle',
+            parent=styles['Heading3'],
+            fontSize=12,
+            spaceAfter=8,
+            textColor=colors.black
+        ),
+        'ObservacionesStyle': ParagraphStyle(
+            'ObservacionesStyle',
+            parent=styles['Normal'],
+            fontSize=9,
+            leading=11,
+            backColor=colors.HexColor('#f8f9fa'),
+            borderPadding=8,
+            borderWidth=1,
+            borderColor=colors.grey,
+            borderRadius=3
+        ),
+        'FirmasTitle': ParagraphStyle(
+            'FirmasTitle',
+            parent=styles['Heading3'],
+            fontSize=11,
+            spaceAfter=15,
+            alignment=1
+        ),
+        'FooterStyle': ParagraphStyle(
+            'FooterStyle',
+            parent=styles['Normal'],
+            fontSize=8,
+            alignment=1,
+            textColor=colors.grey,
+            spaceBefore=10
+        ),
+    }
+    for estilo in propios.values():
+        styles.add(estilo)
+    return styles
+
+def _linea_divisoria():
+    return HRFlowable(
+        width="100%",
+        thickness=1,
+        color=colors.HexColor('#1a3d7c'),
+        spaceBefore=5,
+        spaceAfter=5
+    )
+
+@lru_cache(maxsize=None)
+def _encabezado_base(titulo_documento):
+    styles = _hoja_estilos()
+    # Logo FIMLM (texto por ahora - puedes cambiar por imagen)
+    return (
+        Paragraph("FUNDACIÓN INTERNACIONAL MARIA LUISA DE MORENO", styles['TitleStyle']),
+        Paragraph("FIMLM", styles['SubtitleStyle']),
+        Paragraph(titulo_documento, styles['SubtitleStyle']),
+        # Línea decorativa
+        Spacer(1, 0.2*cm),
+        _linea_divisoria(),
+    )
+
+@lru_cache(maxsize=1)
+def _pie_base():
+    footer_text = """
+    <b>FUNDACIÓN INTERNACIONAL MARIA LUISA DE MORENO - FIMLM</b><br/>
+    Sistema de Gestión de Inventarios • Documento generado automáticamente
+    """
+    return (_linea_divisoria(), Paragraph(footer_text, _hoja_estilos()['FooterStyle']))
+
 class PDFGenerator:
     def __init__(self):
-        self.styles = getSampleStyleSheet()
+        self.styles = _hoja_estilos()
         self.page_size = A4
         
     def generar_comprobante_salida(self, salida_data, productos_data):
@@ -38,6 +143,40 @@ class PDFGenerator:
         Returns:
             bytes del PDF
         """
+        return self._construir_comprobante(
+            "COMPROBANTE DE SALIDA DE INVENTARIO",
+            self._crear_info_salida(salida_data),
+            productos_data,
+            salida_data
+        )
+    
+    def generar_comprobante_entrada(self, entrada_data, productos_data):
+        """
+        Genera un comprobante de entrada PDF.
+        
+        Args:
+            entrada_data: dict con {
+                'tipo_origen': str,
+                'origen_nombre': str,
+                'ubicacion': str (opcional),
+                'observaciones': str,
+                'usuario': str,
+                'fecha': str (opcional)
+            }
+            productos_data: lista de dicts como en generar_comprobante_salida
+        
+        Returns:
+            bytes del PDF
+        """
+        return self._construir_comprobante(
+            "COMPROBANTE DE ENTRADA DE INVENTARIO",
+            self._crear_info_entrada(entrada_data),
+            productos_data,
+            entrada_data
+        )
+    
+    def _construir_comprobante(self, titulo_documento, info, productos_data, datos):
+        """Arma el documento común a los comprobantes y devuelve sus bytes."""
         # Crear buffer para el PDF
         buffer = io.BytesIO()
         
@@ -55,20 +194,20 @@ class PDFGenerator:
         story = []
         
         # 1. ENCABEZADO
-        story.extend(self._crear_encabezado())
+        story.extend(self._crear_encabezado(titulo_documento))
         story.append(Spacer(1, 1*cm))
         
-        # 2. INFORMACIÓN DE LA SALIDA
-        story.extend(self._crear_info_salida(salida_data))
+        # 2. INFORMACIÓN DEL MOVIMIENTO
+        story.extend(info)
         story.append(Spacer(1, 0.5*cm))
         
         # 3. TABLA DE PRODUCTOS
-        story.extend(self._crear_tabla_productos(productos_data, salida_data))
+        story.extend(self._crear_tabla_productos(productos_data, datos))
         story.append(Spacer(1, 1*cm))
         
         # 4. OBSERVACIONES
-        if salida_data.get('observaciones'):
-            story.extend(self._crear_observaciones(salida_data['observaciones']))
+        if datos.get('observaciones'):
+            story.extend(self._crear_observaciones(datos['observaciones']))
             story.append(Spacer(1, 0.5*cm))
         
         # 5. FIRMAS
@@ -85,56 +224,15 @@ class PDFGenerator:
         buffer.seek(0)
         return buffer.getvalue()
     
-    def _crear_encabezado(self):
+    def _crear_encabezado(self, titulo_documento="COMPROBANTE DE SALIDA DE INVENTARIO"):
         """Crea el encabezado con logo y título."""
-        elements = []
-        
-        # Agregar logo si existe
-        # Estilo para el título
-        title_style = ParagraphStyle(
-            'TitleStyle',
-            parent=self.styles['Heading1'],
-            fontSize=18,
-            alignment=1,  # Centrado
-            spaceAfter=6,
-            textColor=colors.HexColor('#1a3d7c'),  # Azul oscuro
-            fontName='Helvetica-Bold'
-        )
-        
-        # Estilo para subtítulo
-        subtitle_style = ParagraphStyle(
-            'SubtitleStyle',
-            parent=self.styles['Heading2'],
-            fontSize=14,
-            alignment=1,
-            spaceAfter=12,
-            textColor=colors.HexColor('#2c5282'),
-            fontName='Helvetica'
-        )
-        
-        # Logo FIMLM (texto por ahora - puedes cambiar por imagen)
-        elements.append(Paragraph("FUNDACIÓN INTERNACIONAL MARIA LUISA DE MORENO", title_style))
-        elements.append(Paragraph("FIMLM", subtitle_style))
-        elements.append(Paragraph("COMPROBANTE DE SALIDA DE INVENTARIO", subtitle_style))
-        
-        # Línea decorativa
-        elements.append(Spacer(1, 0.2*cm))
-        elements.append(self._crear_linea_divisoria())
-        
-        return elements
+        return [copy.copy(f) for f in _encabezado_base(titulo_documento)]
     
     def _crear_info_salida(self, salida_data):
         """Crea la sección de información de la salida."""
         elements = []
         
-        # Estilo para información
-        info_style = ParagraphStyle(
-            'InfoStyle',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            leading=12,
-            spaceAfter=3
-        )
+        info_style = self.styles['InfoStyle']
         
         fecha = salida_data.get('fecha') or datetime.now().strftime("%d/%m/%Y %H:%M:%S")
         
@@ -152,18 +250,29 @@ class PDFGenerator:
         elements.append(Paragraph(info_text, info_style))
         return elements
     
+    def _crear_info_entrada(self, entrada_data):
+        """Crea la sección de información de la entrada."""
+        fecha = entrada_data.get('fecha') or datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+        
+        info_text = f"""
+        <b>FECHA Y HORA:</b> {fecha}<br/>
+        <b>TIPO DE ORIGEN:</b> {(entrada_data.get('tipo_origen') or 'No especificado').capitalize()}<br/>
+        <b>PROVEEDOR/DONANTE:</b> {entrada_data.get('origen_nombre') or 'No especificado'}<br/>
+        """
+        
+        if entrada_data.get('ubicacion'):
+            info_text += f"<b>UBICACIÓN:</b> {entrada_data['ubicacion']}<br/>"
+        
+        info_text += f"<b>REGISTRADO POR:</b> {entrada_data.get('usuario', 'Sistema')}"
+        
+        return [Paragraph(info_text, self.styles['InfoStyle'])]
+    
     def _crear_tabla_productos(self, productos_data, salida_data):
         """Crea la tabla de productos."""
         elements = []
         
         # Título de la tabla
-        title_style = ParagraphStyle(
-            'TableTitle',
-            parent=self.styles['Heading3'],
-            fontSize=12,
-            spaceAfter=8,
-            textColor=colors.black
-        )
+        title_style = self.styles['TableTitle']
         
         if salida_data.get('kit_nombre'):
             elements.append(Paragraph(f"PRODUCTOS DEL KIT: {salida_data['kit_nombre']}", title_style))
@@ -254,17 +363,7 @@ class PDFGenerator:
         """Crea la sección de observaciones."""
         elements = []
         
-        obs_style = ParagraphStyle(
-            'ObservacionesStyle',
-            parent=self.styles['Normal'],
-            fontSize=9,
-            leading=11,
-            backColor=colors.HexColor('#f8f9fa'),
-            borderPadding=8,
-            borderWidth=1,
-            borderColor=colors.grey,
-            borderRadius=3
-        )
+        obs_style = self.styles['ObservacionesStyle']
         
         obs_text = f"""
         <b>OBSERVACIONES / NOTAS ADICIONALES:</b><br/>
@@ -279,13 +378,7 @@ class PDFGenerator:
         elements = []
         
         # Título
-        title_style = ParagraphStyle(
-            'FirmasTitle',
-            parent=self.styles['Heading3'],
-            fontSize=11,
-            spaceAfter=15,
-            alignment=1
-        )
+        title_style = self.styles['FirmasTitle']
         
         elements.append(Paragraph("FIRMAS Y SELLOS", title_style))
         
@@ -325,37 +418,11 @@ class PDFGenerator:
     
     def _crear_pie_pagina(self):
         """Crea el pie de página."""
-        elements = []
-        
-        footer_style = ParagraphStyle(
-            'FooterStyle',
-            parent=self.styles['Normal'],
-            fontSize=8,
-            alignment=1,
-            textColor=colors.grey,
-            spaceBefore=10
-        )
-        
-        footer_text = """
-        <b>FUNDACIÓN INTERNACIONAL MARIA LUISA DE MORENO - FIMLM</b><br/>
-        Sistema de Gestión de Inventarios • Documento generado automáticamente
-        """
-        
-        elements.append(self._crear_linea_divisoria())
-        elements.append(Paragraph(footer_text, footer_style))
-        
-        return elements
+        return [copy.copy(f) for f in _pie_base()]
     
     def _crear_linea_divisoria(self):
         """Crea una línea divisoria."""
-        from reportlab.platypus.flowables import HRFlowable
-        return HRFlowable(
-            width="100%",
-            thickness=1,
-            color=colors.HexColor('#1a3d7c'),
-            spaceBefore=5,
-            spaceAfter=5
-        )
+        return _linea_divisoria()
 
 
 # Función de conveniencia para uso rápido
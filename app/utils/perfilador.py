@@ -0,0 +1,240 @@
+# app/utils/perfilador.py
+"""
+Perfilado por petición, a pedido de un administrador.
+
+Un hilo muestrea cada INTERVALO_S las pilas de todos los hilos del proceso
+(sys._current_frames) mientras dura la petición, así se ve tanto el código
+async del event loop como el de los endpoints síncronos del threadpool. Las
+pilas ociosas (hilos esperando trabajo) se descartan. El resultado se guarda
+en formato "folded" (una pila por línea con su cantidad de muestras), que
+leen flamegraph.pl, inferno y speedscope, junto a un .json con los datos de
+la petición. Es un perfil del proceso: si hay otras peticiones en curso
+también aparecen, cada una bajo el nombre de su hilo.
+
+Se activa con INVENTARIO_ADMIN_TOKEN y:
+  - una petición:   cabecera "X-Perfilar: <token>" o ?perfilar=<token>
+  - modo rotativo:  1 de cada N peticiones a las rutas elegidas
+                    (PUT /api/sistema/perfiles/rotativo, o INVENTARIO_PERFIL_RUTAS
+                    e INVENTARIO_PERFIL_CADA al arrancar; cada worker cuenta las suyas)
+
+Los perfiles se guardan en PERFILES_DIR (se conservan los últimos PERFILES_MAX)
+y se listan y descargan en /api/sistema/perfiles.
+"""
+import hmac
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode
+
+from fastapi import Header, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+
+from ..database import BASE_DIR
+from . import metricas
+
+TOKEN_ADMIN = os.getenv("INVENTARIO_ADMIN_TOKEN", "")
+PERFILES_DIR = os.getenv("INVENTARIO_PERFILES") or os.path.join(BASE_DIR, "perfiles")
+PERFILES_MAX = int(os.getenv("INVENTARIO_PERFILES_MAX", "50"))
+INTERVALO_S = float(os.getenv("INVENTARIO_PERFIL_INTERVALO_MS", "5")) / 1000
+MAX_SIMULTANEOS = 2  # cada perfil activo es un hilo más muestreando todo el proceso
+
+CABECERA = "x-perfilar"
+PARAMETRO = "perfilar"
+
+# Marcos donde un hilo está esperando trabajo: si la pila termina en uno, no se cuenta
+_OCIOSOS = {("threading.py", "wait"), ("selectors.py", "select"), ("queue.py", "get"),
+            ("threading.py", "_wait_for_tstate_lock")}
+
+_rotativo = {
+    "rutas": [r for r in os.getenv("INVENTARIO_PERFIL_RUTAS", "").split(",") if r],
+    "cada": int(os.getenv("INVENTARIO_PERFIL_CADA", "0")),
+}
+_contadores_rotativo = Counter()
+_activos = 0
+_etiquetas = {}
+
+def token_valido(valor: Optional[str]) -> bool:
+    return bool(TOKEN_ADMIN and valor) and hmac.compare_digest(valor, TOKEN_ADMIN)
+
+def requiere_admin(x_admin_token: Optional[str] = Header(None), token: Optional[str] = Query(None)):
+    """
+    Dependencia de los endpoints de administración y depuración (respaldos,
+    checkpoints, reparaciones, perfiles): token en la cabecera X-Admin-Token o en ?token=.
+    """
+    if not TOKEN_ADMIN:
+        raise HTTPException(status_code=403, detail="Administración desactivada: definir INVENTARIO_ADMIN_TOKEN")
+    if not token_valido(x_admin_token or token):
+        raise HTTPException(status_code=403, detail="Token de administrador inválido")
+
+def _etiqueta(codigo) -> str:
+    etiqueta = _etiquetas.get(codigo)
+    if etiqueta is None:
+        archivo = codigo.co_filename
+        if archivo.startswith(BASE_DIR):
+            archivo = os.path.relpath(archivo, BASE_DIR)
+        else:
+            archivo = "/".join(archivo.split(os.sep)[-2:])
+        etiqueta = f"{codigo.co_name} ({archivo}:{codigo.co_firstlineno})".replace(";", ",")
+        _etiquetas[codigo] = etiqueta
+    return etiqueta
+
+class Muestreador:
+    """Cuenta las pilas de todos los hilos (menos el propio) cada `intervalo` segundos."""
+
+    def __init__(self, intervalo: float = INTERVALO_S):
+        self.intervalo = intervalo
+        self.pilas = Counter()
+        self.muestras = 0
+        self._fin = threading.Event()
+        self._hilo = threading.Thread(target=self._correr, name="perfilador", daemon=True)
+
+    def _correr(self):
+        propio = threading.get_ident()
+        while not self._fin.wait(self.intervalo):
+            nombres = {h.ident: h.name for h in threading.enumerate()}
+            self.muestras += 1
+            for ident, marco in sys._current_frames().items():
+                if ident == propio:
+                    continue
+                codigo = marco.f_code
+                if (os.path.basename(codigo.co_filename), codigo.co_name) in _OCIOSOS:
+                    continue
+                pila = []
+                while marco is not None:
+                    pila.append(_etiqueta(marco.f_code))
+                    marco = marco.f_back
+                pila.append(nombres.get(ident, str(ident)).replace(";", ","))
+                self.pilas[";".join(reversed(pila))] += 1
+
+    def iniciar(self):
+        self._hilo.start()
+
+    def detener(self):
+        self._fin.set()
+        self._hilo.join()
+
+    def folded(self) -> str:
+        return "".join(f"{pila} {cantidad}\n" for pila, cantidad in self.pilas.most_common())
+
+def configurar_rotativo(rutas: list, cada: int) -> dict:
+    """Perfila 1 de cada `cada` peticiones cuyas rutas empiecen con alguno de los prefijos (cada=0 lo apaga)."""
+    _rotativo["rutas"] = [r for r in rutas if r]
+    _rotativo["cada"] = max(0, cada)
+    _contadores_rotativo.clear()
+    return estado_rotativo()
+
+def estado_rotativo() -> dict:
+    return {**_rotativo, "contadores": dict(_contadores_rotativo)}
+
+def _toca_rotativo(ruta: str) -> bool:
+    if _rotativo["cada"] <= 0:
+        return False
+    prefijo = next((p for p in _rotativo["rutas"] if ruta.startswith(p)), None)
+    if prefijo is None:
+        return False
+    _contadores_rotativo[prefijo] += 1
+    return _contadores_rotativo[prefijo] % _rotativo["cada"] == 0
+
+def _pedido_manual(scope) -> bool:
+    for nombre, valor in scope.get("headers", []):
+        if nombre == CABECERA.encode():
+            return token_valido(valor.decode("latin-1"))
+    consulta = dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+    return token_valido(consulta.get(PARAMETRO))
+
+def _ruta_archivo(perfil_id: str, extension: str) -> str:
+    return os.path.join(PERFILES_DIR, f"{perfil_id}.{extension}")
+
+def _guardar(perfil_id: str, muestreador: Muestreador, datos: dict):
+    os.makedirs(PERFILES_DIR, exist_ok=True)
+    with open(_ruta_archivo(perfil_id, "folded"), "w", encoding="utf-8") as f:
+        f.write(muestreador.folded())
+    with open(_ruta_archivo(perfil_id, "json"), "w", encoding="utf-8") as f:
+        json.dump({**datos, "id": perfil_id, "muestras": muestreador.muestras,
+                   "intervalo_ms": muestreador.intervalo * 1000}, f, ensure_ascii=False)
+    for viejo in listar()[PERFILES_MAX:]:
+        borrar(viejo["id"])
+
+def listar() -> list:
+    """Perfiles guardados, del más nuevo al más viejo."""
+    if not os.path.isdir(PERFILES_DIR):
+        return []
+    perfiles = []
+    for nombre in sorted(os.listdir(PERFILES_DIR), reverse=True):
+        if nombre.endswith(".json"):
+            try:
+                with open(os.path.join(PERFILES_DIR, nombre), encoding="utf-8") as f:
+                    perfiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+    return perfiles
+
+def archivo_perfil(perfil_id: str) -> Optional[str]:
+    """Ruta del .folded de un perfil, o None si no existe (o el id no es válido)."""
+    if not re.fullmatch(r"[\w-]+", perfil_id):
+        return None
+    ruta = _ruta_archivo(perfil_id, "folded")
+    return ruta if os.path.exists(ruta) else None
+
+def borrar(perfil_id: str):
+    for extension in ("folded", "json"):
+        try:
+            os.remove(_ruta_archivo(perfil_id, extension))
+        except OSError:
+            pass
+
+class PerfiladorMiddleware:
+    """Middleware ASGI: perfila la petición si lo pide un administrador o le toca en el modo rotativo."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        global _activos
+        if scope["type"] != "http" or not TOKEN_ADMIN:
+            await self.app(scope, receive, send)
+            return
+        ruta = scope.get("path", "")
+        modo = "manual" if _pedido_manual(scope) else "rotativo" if _toca_rotativo(ruta) else None
+        if modo is None or _activos >= MAX_SIMULTANEOS:
+            if modo:
+                metricas.incrementar("perfiles.omitidos")
+            await self.app(scope, receive, send)
+            return
+
+        fecha = datetime.now()
+        perfil_id = f"{fecha:%Y%m%d_%H%M%S_%f}_{scope['method']}_{re.sub(r'[^A-Za-z0-9]+', '_', ruta).strip('_')}"[:120]
+        estado = {}
+
+        async def enviar(mensaje):
+            if mensaje["type"] == "http.response.start":
+                estado["codigo"] = mensaje["status"]
+                mensaje["headers"] = list(mensaje.get("headers", [])) + [(b"x-perfil-id", perfil_id.encode())]
+            await send(mensaje)
+
+        _activos += 1
+        muestreador = Muestreador()
+        inicio = time.perf_counter()
+        muestreador.iniciar()
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            duracion_ms = (time.perf_counter() - inicio) * 1000
+            _activos -= 1
+            # Esperar al hilo, escribir el perfil y podar el directorio bloquean: fuera del event loop
+            await run_in_threadpool(muestreador.detener)
+            # El token no se guarda con la consulta
+            consulta = [(k, v) for k, v in parse_qsl(scope.get("query_string", b"").decode("latin-1")) if k != PARAMETRO]
+            await run_in_threadpool(_guardar, perfil_id, muestreador, {
+                "fecha": fecha.isoformat(timespec="seconds"), "metodo": scope["method"], "ruta": ruta,
+                "consulta": urlencode(consulta), "estado": estado.get("codigo"), "modo": modo,
+                "ms": round(duracion_ms, 1), "proceso": os.getpid(),
+            })
+            metricas.incrementar("perfiles.capturados")
+            metricas.registrar("perfiles.ms", duracion_ms)
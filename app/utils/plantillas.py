@@ -0,0 +1,52 @@
+# app/utils/plantillas.py
+import hashlib
+import os
+import tempfile
+
+from fastapi import Request
+from fastapi.responses import HTMLResponse, Response
+from fastapi.templating import Jinja2Templates
+from jinja2 import FileSystemBytecodeCache
+
+# Bytecode compilado de las plantillas, compartido entre workers y reinicios
+CACHE_DIR = os.getenv("INVENTARIO_JINJA_CACHE") or os.path.join(tempfile.gettempdir(), "inventario-jinja")
+
+def crear_templates(directorio: str) -> Jinja2Templates:
+    """Jinja2Templates con caché de bytecode en disco."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    return Jinja2Templates(directory=directorio, bytecode_cache=FileSystemBytecodeCache(CACHE_DIR))
+
+def precompilar(templates: Jinja2Templates) -> int:
+    """
+    Compila todas las plantillas al arrancar para que la primera
+    petición no pague el parseo. Devuelve cuántas se compilaron.
+    """
+    nombres = templates.env.list_templates(extensions=["html"])
+    for nombre in nombres:
+        templates.env.get_template(nombre)
+    return len(nombres)
+
+class PaginasEstaticas:
+    """
+    Páginas que no dependen de datos del servidor (los datos se cargan
+    por la API desde el navegador): se renderizan una vez por proceso
+    y se sirven con ETag.
+    """
+    def __init__(self, templates: Jinja2Templates):
+        self._templates = templates
+        self._cache = {}
+
+    def _renderizar(self, nombre: str, title: str):
+        clave = (nombre, title)
+        if clave not in self._cache:
+            html = self._templates.get_template(nombre).render(title=title).encode("utf-8")
+            etag = f'"{hashlib.sha1(html).hexdigest()[:20]}"'
+            self._cache[clave] = (html, etag)
+        return self._cache[clave]
+
+    def respuesta(self, request: Request, nombre: str, title: str) -> Response:
+        html, etag = self._renderizar(nombre, title)
+        cabeceras = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag in request.headers.get("if-none-match", ""):
+            return Response(status_code=304, headers=cabeceras)
+        return HTMLResponse(html, headers=cabeceras)
@@ -0,0 +1,37 @@
+# app/utils/procesos.py
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# Pool de procesos compartido para trabajo pesado de CPU (códigos, PDFs)
+_pool = None
+_lock = threading.Lock()
+
+# Con varios workers de uvicorn (WEB_CONCURRENCY) cada uno tiene su pool:
+# se reparten los núcleos para no lanzar workers × núcleos procesos
+WEB_CONCURRENCY = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+MAX_WORKERS = int(os.getenv("INVENTARIO_POOL_WORKERS", "0")) or max(1, (os.cpu_count() or 2) // WEB_CONCURRENCY)
+
+def obtener_pool() -> ProcessPoolExecutor:
+    """
+    Devuelve el pool de procesos del servidor, creándolo la primera vez.
+    Se usa 'spawn' para no heredar los hilos del servidor al hacer fork.
+    """
+    global _pool
+    if _pool is None:
+        with _lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(
+                    max_workers=MAX_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+    return _pool
+
+def cerrar_pool():
+    """Cierra el pool (al apagar la app)."""
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
@@ -0,0 +1,170 @@
+# app/utils/pronostico.py
+"""
+Pronóstico de consumo y días de cobertura por producto.
+
+Una tarea periódica (ver utils/tareas.py) calcula con pandas/NumPy, para
+todos los productos a la vez:
+  - consumo diario promedio en ventanas móviles de 28 y 7 días
+  - desviación estándar del consumo diario (variabilidad)
+  - días de cobertura del stock actual y fecha estimada de agotamiento
+  - punto de reorden y cantidad sugerida a reponer (nunca menos que stock_minimo)
+y guarda el resultado en la tabla pronosticos. Entre recálculos completos
+(uno por día, porque las ventanas se desplazan) solo se recalculan los
+productos con movimientos posteriores al último id procesado.
+
+Recalcular todo a mano:
+    python -m app.utils.pronostico
+"""
+import math
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, text
+
+from .. import models
+from . import tareas, versiones
+
+VENTANA_DIAS = 28
+VENTANA_CORTA_DIAS = 7
+PLAZO_REPOSICION_DIAS = int(os.getenv("INVENTARIO_PLAZO_REPOSICION", "7"))
+DIAS_REVISION = 14           # cada cuánto se revisa el inventario para pedir
+NIVEL_SERVICIO_Z = 1.65      # ~95% de probabilidad de no quedarse sin stock durante el plazo
+INTERVALO_S = int(os.getenv("INVENTARIO_PRONOSTICO_INTERVALO", "300"))
+
+NOMBRE_TAREA = "pronostico"
+
+_SQL_GUARDAR = text(
+    "INSERT INTO pronosticos (producto_id, consumo_diario, consumo_diario_7d, desviacion_diaria, "
+    "dias_cobertura, fecha_agotamiento, punto_reorden, cantidad_sugerida, actualizado) "
+    "VALUES (:producto_id, :consumo_diario, :consumo_diario_7d, :desviacion_diaria, "
+    ":dias_cobertura, :fecha_agotamiento, :punto_reorden, :cantidad_sugerida, :actualizado) "
+    "ON CONFLICT(producto_id) DO UPDATE SET "
+    "consumo_diario = excluded.consumo_diario, consumo_diario_7d = excluded.consumo_diario_7d, "
+    "desviacion_diaria = excluded.desviacion_diaria, dias_cobertura = excluded.dias_cobertura, "
+    "fecha_agotamiento = excluded.fecha_agotamiento, punto_reorden = excluded.punto_reorden, "
+    "cantidad_sugerida = excluded.cantidad_sugerida, actualizado = excluded.actualizado"
+)
+
+def calcular(salidas, stock, ahora: datetime):
+    """
+    Cálculo vectorizado.
+
+    Args:
+        salidas: DataFrame con producto_id, fecha, cantidad (salidas de la ventana)
+        stock: DataFrame indexado por producto_id con stock_actual y stock_minimo
+        ahora: momento del cálculo
+
+    Returns:
+        DataFrame indexado por producto_id con las columnas de la tabla pronosticos
+    """
+    import numpy as np
+    import pandas as pd
+
+    hoy = pd.Timestamp(ahora).normalize()
+    dias = pd.date_range(hoy - pd.Timedelta(days=VENTANA_DIAS - 1), hoy, freq="D")
+
+    # Matriz producto x día con las unidades que salieron (0 si no hubo salidas)
+    if len(salidas):
+        salidas = salidas.assign(dia=pd.to_datetime(salidas["fecha"]).dt.normalize())
+        matriz = salidas.pivot_table(index="producto_id", columns="dia", values="cantidad",
+                                     aggfunc="sum", fill_value=0)
+        matriz = matriz.reindex(index=stock.index, columns=dias, fill_value=0)
+        diario = matriz.to_numpy(dtype=float)
+    else:
+        diario = np.zeros((len(stock), len(dias)))
+
+    consumo = diario.mean(axis=1)
+    consumo_7d = diario[:, -VENTANA_CORTA_DIAS:].mean(axis=1)
+    desviacion = diario.std(axis=1, ddof=1)
+
+    stock_actual = stock["stock_actual"].fillna(0).to_numpy(dtype=float)
+    stock_minimo = stock["stock_minimo"].fillna(0).to_numpy(dtype=float)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cobertura = np.where(consumo > 0, stock_actual / consumo, np.nan)
+
+    # Punto de reorden: demanda durante el plazo + stock de seguridad, y nunca menos que el mínimo
+    seguridad = NIVEL_SERVICIO_Z * desviacion * math.sqrt(PLAZO_REPOSICION_DIAS)
+    punto_reorden = np.maximum(stock_minimo, np.ceil(consumo * PLAZO_REPOSICION_DIAS + seguridad))
+    # Al llegar al punto de reorden se pide hasta cubrir además el período de revisión
+    objetivo = punto_reorden + np.ceil(consumo * DIAS_REVISION)
+    sugerida = np.where(stock_actual <= punto_reorden, np.maximum(objetivo - stock_actual, 0), 0)
+
+    resultado = pd.DataFrame({
+        "consumo_diario": consumo.round(4),
+        "consumo_diario_7d": consumo_7d.round(4),
+        "desviacion_diaria": desviacion.round(4),
+        "dias_cobertura": np.round(cobertura, 1),
+        "punto_reorden": punto_reorden.astype(int),
+        "cantidad_sugerida": sugerida.astype(int),
+    }, index=stock.index)
+    # dtype=object para conservar datetime de Python (sqlite3 no acepta Timestamp)
+    resultado["fecha_agotamiento"] = pd.Series(
+        [None if math.isnan(d) else ahora + timedelta(days=float(d)) for d in cobertura],
+        index=stock.index, dtype=object
+    )
+    return resultado
+
+@tareas.registrar(NOMBRE_TAREA, INTERVALO_S)
+def actualizar_pronosticos(db, completo: bool = False) -> int:
+    """Recalcula los pronósticos pendientes. Devuelve cuántos productos se actualizaron."""
+    import pandas as pd
+
+    ahora = datetime.utcnow()
+    estado = db.get(models.EstadoTarea, NOMBRE_TAREA)
+    if estado is None:
+        estado = models.EstadoTarea(nombre=NOMBRE_TAREA, ultimo_movimiento_id=0)
+        db.add(estado)
+    max_id = db.query(func.max(models.Movimiento.id)).scalar() or 0
+
+    # Las ventanas se desplazan con el día: una vez por día se recalcula todo
+    completo = completo or estado.ultimo_completo is None or estado.ultimo_completo.date() < ahora.date()
+
+    productos = db.query(models.Producto.id, models.Producto.stock_actual, models.Producto.stock_minimo)
+    if not completo:
+        con_movimientos = db.query(models.Movimiento.producto_id).filter(
+            models.Movimiento.id > (estado.ultimo_movimiento_id or 0)
+        ).distinct()
+        sin_pronostico = db.query(models.Producto.id).outerjoin(
+            models.PronosticoProducto, models.PronosticoProducto.producto_id == models.Producto.id
+        ).filter(models.PronosticoProducto.producto_id.is_(None))
+        productos = productos.filter(
+            models.Producto.id.in_(con_movimientos) | models.Producto.id.in_(sin_pronostico)
+        )
+    stock = pd.DataFrame(productos.all(), columns=["producto_id", "stock_actual", "stock_minimo"]).set_index("producto_id")
+
+    if len(stock):
+        desde = ahora.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=VENTANA_DIAS - 1)
+        consulta = db.query(
+            models.Movimiento.producto_id, models.Movimiento.fecha_movimiento, models.Movimiento.cantidad
+        ).filter(
+            models.Movimiento.tipo == "salida",
+            models.Movimiento.fecha_movimiento >= desde
+        )
+        if not completo:
+            consulta = consulta.filter(models.Movimiento.producto_id.in_(stock.index.tolist()))
+        salidas = pd.DataFrame(consulta.all(), columns=["producto_id", "fecha", "cantidad"])
+
+        resultado = calcular(salidas, stock, ahora)
+        resultado = resultado.astype(object).where(resultado.notna(), None)
+        filas = resultado.reset_index().to_dict("records")
+        for fila in filas:
+            fila["actualizado"] = ahora
+        db.execute(_SQL_GUARDAR, filas)
+        versiones.incrementar(db.connection(), "pronosticos")
+
+    estado.ultimo_movimiento_id = max_id
+    if completo:
+        estado.ultimo_completo = ahora
+    db.commit()
+    return len(stock)
+
+if __name__ == "__main__":
+    from ..database import SessionLocal, init_db
+
+    init_db()
+    db = SessionLocal()
+    try:
+        print(f"📈 Pronósticos actualizados: {actualizar_pronosticos(db, completo=True)}")
+    finally:
+        db.close()
@@ -0,0 +1,111 @@
+# app/utils/resumenes.py
+"""
+Resumen diario de movimientos (resumen_diario).
+
+Cada flush que agrega o borra movimientos suma o resta sus unidades en la
+fila (día, producto, tipo) correspondiente, en la misma transacción. Las
+series por día, semana o mes (/api/inventario/series) se agregan sobre esta
+tabla, que tiene a lo sumo una fila por producto, tipo y día con actividad.
+
+Reconstruir desde movimientos (todo o un rango de días):
+    python -m app.utils.resumenes [desde] [hasta]
+"""
+from collections import defaultdict
+from datetime import date
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.orm import Session
+
+from .. import models
+from . import archivo, versiones
+
+_SQL_SUMAR = text(
+    "INSERT INTO resumen_diario (fecha, producto_id, tipo, cantidad, movimientos) "
+    "VALUES (:fecha, :producto_id, :tipo, :cantidad, :movimientos) "
+    "ON CONFLICT(fecha, producto_id, tipo) DO UPDATE SET "
+    "cantidad = cantidad + excluded.cantidad, movimientos = movimientos + excluded.movimientos"
+)
+
+_SQL_AGREGAR = (
+    "INSERT OR IGNORE INTO resumen_diario (fecha, producto_id, tipo, cantidad, movimientos) "
+    "SELECT date(fecha_movimiento), producto_id, tipo, SUM(cantidad), COUNT(*) "
+    "FROM {movimientos} WHERE producto_id IS NOT NULL AND fecha_movimiento IS NOT NULL{filtro} "
+    "GROUP BY date(fecha_movimiento), producto_id, tipo"
+)
+
+def _clave(valores):
+    producto_id, tipo, fecha = valores
+    if producto_id is None or fecha is None:
+        return None
+    return (fecha.date(), producto_id, tipo)
+
+@event.listens_for(Session, "after_flush")
+def _actualizar_resumen(session, flush_context):
+    deltas = defaultdict(lambda: [0, 0])
+    # Al borrar un producto su resumen se va por ON DELETE CASCADE
+    borrados = {obj.id for obj in session.deleted if isinstance(obj, models.Producto)}
+
+    def acumular(clave, cantidad, signo):
+        if clave is not None and clave[1] not in borrados:
+            deltas[clave][0] += signo * (cantidad or 0)
+            deltas[clave][1] += signo
+
+    for obj in session.new:
+        if isinstance(obj, models.Movimiento):
+            acumular(_clave((obj.producto_id, obj.tipo, obj.fecha_movimiento)), obj.cantidad, 1)
+    for obj in session.deleted:
+        if isinstance(obj, models.Movimiento):
+            acumular(_clave((obj.producto_id, obj.tipo, obj.fecha_movimiento)), obj.cantidad, -1)
+    for obj in session.dirty:
+        if not isinstance(obj, models.Movimiento):
+            continue
+        estado = inspect(obj)
+        campos = ("producto_id", "tipo", "fecha_movimiento", "cantidad")
+        if not any(estado.attrs[c].history.has_changes() for c in campos):
+            continue
+        # Valores anteriores (los que no cambiaron siguen en unchanged)
+        anteriores = []
+        for c in campos:
+            historia = estado.attrs[c].history
+            anteriores.append(historia.deleted[0] if historia.deleted else (historia.unchanged or [None])[0])
+        acumular(_clave(anteriores[:3]), anteriores[3], -1)
+        acumular(_clave((obj.producto_id, obj.tipo, obj.fecha_movimiento)), obj.cantidad, 1)
+
+    filas = [
+        {"fecha": f, "producto_id": p, "tipo": t, "cantidad": c, "movimientos": n}
+        for (f, p, t), (c, n) in deltas.items() if c or n
+    ]
+    if filas:
+        session.connection().execute(_SQL_SUMAR, filas)
+
+def reconstruir(conexion, desde: date = None, hasta: date = None) -> int:
+    """
+    Recalcula el resumen a partir de movimientos (todo, o los días entre
+    `desde` y `hasta` inclusive). Devuelve cuántas filas quedaron.
+    """
+    condiciones, parametros = [], {}
+    if desde:
+        condiciones.append("fecha >= :desde")
+        parametros["desde"] = desde.isoformat()
+    if hasta:
+        condiciones.append("fecha <= :hasta")
+        parametros["hasta"] = hasta.isoformat()
+    where = " AND ".join(condiciones)
+    conexion.execute(text("DELETE FROM resumen_diario" + (f" WHERE {where}" if where else "")), parametros)
+    filtro = "".join(f" AND date(fecha_movimiento) {op} :{p}" for op, p in ((">=", "desde"), ("<=", "hasta")) if p in parametros)
+    # Los días archivados se reconstruyen desde el archivo
+    fuente = archivo.fuente_sql(conexion, "producto_id, tipo, cantidad, fecha_movimiento", desde)
+    resultado = conexion.execute(text(_SQL_AGREGAR.format(movimientos=fuente, filtro=filtro)), parametros)
+    versiones.incrementar(conexion, "resumen_diario")
+    return resultado.rowcount
+
+if __name__ == "__main__":
+    import sys
+
+    from ..database import engine, init_db
+
+    init_db()
+    rango = [date.fromisoformat(a) for a in sys.argv[1:3]]
+    with engine.begin() as conexion:
+        filas = reconstruir(conexion, *rango)
+    print(f"📊 Resumen diario reconstruido: {filas} filas")
@@ -0,0 +1,50 @@
+# app/utils/serializacion.py
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:  # opcional: sin orjson se usa json de la librería estándar
+    orjson = None
+
+# Cabeceras de caché HTTP que se copian del Response inyectado por FastAPI
+CABECERAS_CACHE = ("etag", "last-modified", "cache-control")
+
+def _por_defecto(valor):
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return float(valor)
+    raise TypeError(f"Tipo no serializable: {type(valor).__name__}")
+
+def a_json(contenido) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(contenido, default=_por_defecto)
+    return json.dumps(contenido, default=_por_defecto, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+class RespuestaJSONRapida(Response):
+    """Respuesta JSON que serializa dicts/listas directamente, sin pasar por Pydantic."""
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return a_json(content)
+
+def respuesta_rapida(contenido, response: Response = None) -> RespuestaJSONRapida:
+    """
+    Crea la respuesta rápida conservando las cabeceras de caché
+    (ETag, Last-Modified) que se hayan puesto en `response`.
+    """
+    cabeceras = {}
+    if response is not None:
+        cabeceras = {k: v for k, v in response.headers.items() if k in CABECERAS_CACHE}
+    return RespuestaJSONRapida(contenido, headers=cabeceras)
+
+def filas_a_dicts(filas) -> list:
+    """Convierte filas (tuplas con nombre) de una consulta por columnas a dicts."""
+    if not filas:
+        return []
+    claves = filas[0]._fields
+    return [dict(zip(claves, fila)) for fila in filas]
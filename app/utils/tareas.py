@@ -0,0 +1,104 @@
+# app/utils/tareas.py
+"""
+Tareas periódicas en segundo plano (pronósticos, resúmenes, verificaciones).
+
+Cada worker corre el planificador, pero antes de ejecutar una tarea la
+"reclama" con un UPDATE condicional sobre estado_tareas: solo un proceso
+gana cada turno, así N workers no repiten el mismo trabajo.
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import DateTime, text
+
+from ..database import SessionLocal
+from . import metricas
+
+# nombre -> (funcion(db), intervalo en segundos)
+_tareas = {}
+_tarea_planificador = None
+# nombre -> time.monotonic() antes del cual no hace falta consultar estado_tareas
+_proximas = {}
+
+TICK_S = 5
+
+_SQL_EJECUTADO = text("SELECT ejecutado FROM estado_tareas WHERE nombre = :n").columns(ejecutado=DateTime)
+
+def registrar(nombre: str, intervalo_s: float):
+    """Decorador: registra `funcion(db)` para correr cada `intervalo_s` segundos."""
+    def decorador(funcion):
+        _tareas[nombre] = (funcion, intervalo_s)
+        return funcion
+    return decorador
+
+def reclamar(db, nombre: str, intervalo_s: float) -> bool:
+    """
+    Marca la tarea como iniciada si le toca correr. Devuelve False si otro
+    proceso ya la reclamó en este intervalo.
+    """
+    ahora = datetime.utcnow()
+    limite = ahora - timedelta(seconds=intervalo_s)
+    # Primero una lectura: el lock de escritura solo se pide cuando la tarea vence
+    fila = db.execute(_SQL_EJECUTADO, {"n": nombre}).first()
+    if fila is not None and fila.ejecutado is not None and fila.ejecutado > limite:
+        db.rollback()
+        _proximas[nombre] = time.monotonic() + (fila.ejecutado - limite).total_seconds()
+        return False
+    if fila is None:
+        db.execute(text("INSERT OR IGNORE INTO estado_tareas (nombre, ultimo_movimiento_id) VALUES (:n, 0)"), {"n": nombre})
+    resultado = db.execute(text(
+        "UPDATE estado_tareas SET ejecutado = :ahora "
+        "WHERE nombre = :n AND (ejecutado IS NULL OR ejecutado <= :limite)"
+    ), {"n": nombre, "ahora": ahora, "limite": limite})
+    db.commit()
+    # Ganado o perdido, el próximo turno no llega antes de un intervalo
+    _proximas[nombre] = time.monotonic() + intervalo_s
+    return resultado.rowcount == 1
+
+def ejecutar(nombre: str, forzar: bool = False):
+    """Corre una tarea registrada (si le toca, o siempre con `forzar`). Devuelve su resultado o None."""
+    funcion, intervalo_s = _tareas[nombre]
+    if not forzar and time.monotonic() < _proximas.get(nombre, 0):
+        return None
+    db = SessionLocal()
+    try:
+        if not forzar and not reclamar(db, nombre, intervalo_s):
+            return None
+        inicio = time.perf_counter()
+        resultado = funcion(db)
+        duracion_ms = (time.perf_counter() - inicio) * 1000
+        db.execute(text("UPDATE estado_tareas SET duracion_ms = :d WHERE nombre = :n"),
+                   {"d": duracion_ms, "n": nombre})
+        db.commit()
+        metricas.registrar(f"tareas.{nombre}.ms", duracion_ms)
+        return resultado
+    except Exception as e:
+        db.rollback()
+        metricas.incrementar(f"tareas.{nombre}.errores")
+        print(f"❌ Error en tarea {nombre}: {e}")
+        return None
+    finally:
+        db.close()
+
+async def _planificador():
+    while True:
+        for nombre in list(_tareas):
+            await run_in_threadpool(ejecutar, nombre)
+        await asyncio.sleep(TICK_S)
+
+def iniciar():
+    global _tarea_planificador
+    if _tareas and _tarea_planificador is None:
+        _tarea_planificador = asyncio.create_task(_planificador())
+
+async def detener():
+    global _tarea_planificador
+    if _tarea_planificador is not None:
+        _tarea_planificador.cancel()
+        try:
+            await _tarea_planificador
+        except asyncio.CancelledError:
+            pass
+        _tarea_planificador = None
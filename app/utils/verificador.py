@@ -0,0 +1,115 @@
+# app/utils/verificador.py
+"""
+Verificación del stock contra el libro de movimientos.
+
+productos.stock_actual se actualiza en Python en cada camino de escritura;
+este módulo lo compara con SUM(entradas) - SUM(salidas) de cada producto en
+una sola consulta agrupada (los traslados no cambian el total), resuelta
+solo con el índice idx_movimiento_saldo (más el de la tabla archivada, si
+hay movimientos archivados). Opcionalmente corrige los descuadres en bloque.
+
+Desde la terminal:
+    python -m app.utils.verificador            # solo informa
+    python -m app.utils.verificador --reparar  # informa y corrige
+
+También corre como tarea periódica; la tarea solo repara si
+INVENTARIO_REPARAR_STOCK=1.
+"""
+import os
+from datetime import datetime
+
+from sqlalchemy import text
+
+from . import alertas, archivo, metricas, tareas, versiones
+
+INTERVALO_S = int(os.getenv("INVENTARIO_VERIFICAR_INTERVALO", "3600"))
+REPARAR_AUTOMATICO = os.getenv("INVENTARIO_REPARAR_STOCK") == "1"
+
+NOMBRE_TAREA = "verificar_stock"
+
+_SQL_SALDOS = (
+    "SELECT producto_id, SUM(CASE tipo WHEN 'entrada' THEN cantidad WHEN 'salida' THEN -cantidad ELSE 0 END) AS saldo"
+    " FROM {tabla} WHERE producto_id IS NOT NULL GROUP BY producto_id"
+)
+
+# Cada tabla se agrupa por separado (cada una con su índice) y después se suman
+_SQL_SALDOS_CON_ARCHIVO = (
+    "SELECT producto_id, SUM(saldo) AS saldo FROM ("
+    + _SQL_SALDOS.format(tabla="main.movimientos") + " UNION ALL "
+    + _SQL_SALDOS.format(tabla="archivo.movimientos") + ") GROUP BY producto_id"
+)
+
+_SQL_DESCUADRES = (
+    "SELECT p.id AS producto_id, p.codigo, p.nombre, COALESCE(p.stock_actual, 0) AS stock_actual, "
+    "COALESCE(m.saldo, 0) AS saldo_movimientos, COALESCE(m.saldo, 0) - COALESCE(p.stock_actual, 0) AS diferencia "
+    "FROM productos p LEFT JOIN ({saldos}) m ON m.producto_id = p.id "
+    "WHERE COALESCE(p.stock_actual, 0) != COALESCE(m.saldo, 0) "
+    "ORDER BY p.id"
+)
+
+# Solo corrige si el stock no cambió desde la verificación (otra escritura pudo tocarlo)
+_SQL_CORREGIR = text(
+    "UPDATE productos SET stock_actual = :saldo_movimientos, fecha_actualizacion = :ahora "
+    "WHERE id = :producto_id AND COALESCE(stock_actual, 0) = :stock_actual"
+)
+
+_SQL_EVENTO = text(
+    "INSERT INTO eventos_stock (producto_id, tipo, stock, delta, stock_minimo, fecha) "
+    "SELECT id, 'cambio', stock_actual, :diferencia, COALESCE(stock_minimo, 0), :ahora "
+    "FROM productos WHERE id = :producto_id AND stock_actual = :saldo_movimientos"
+)
+
+def verificar(conexion) -> list:
+    """Productos cuyo stock_actual no coincide con sus movimientos (archivados incluidos)."""
+    saldos = _SQL_SALDOS_CON_ARCHIVO if archivo.alcanza(conexion) else _SQL_SALDOS.format(tabla="movimientos")
+    return [dict(fila._mapping) for fila in conexion.execute(text(_SQL_DESCUADRES.format(saldos=saldos)))]
+
+def reparar(conexion, descuadres: list) -> int:
+    """
+    Lleva stock_actual al saldo de movimientos (en la transacción de `conexion`).
+    Devuelve cuántos productos se corrigieron.
+    """
+    if not descuadres:
+        return 0
+    ahora = datetime.utcnow()
+    parametros = [{**d, "ahora": ahora} for d in descuadres]
+    corregidos = conexion.execute(_SQL_CORREGIR, parametros).rowcount
+    if corregidos:
+        # Los clientes de /api/eventos reciben el stock corregido
+        conexion.execute(_SQL_EVENTO, parametros)
+        alertas.recalcular_bajo_stock(conexion, [d["producto_id"] for d in descuadres])
+        versiones.incrementar(conexion, "productos")
+    return corregidos
+
+@tareas.registrar(NOMBRE_TAREA, INTERVALO_S)
+def verificar_stock(db, reparar_descuadres: bool = REPARAR_AUTOMATICO) -> dict:
+    conexion = db.connection()
+    descuadres = verificar(conexion)
+    corregidos = reparar(conexion, descuadres) if reparar_descuadres else 0
+    db.commit()
+    metricas.fijar("verificador.descuadres", len(descuadres) - corregidos)
+    if descuadres:
+        print(f"⚠️ Stock descuadrado en {len(descuadres)} productos (corregidos: {corregidos})")
+    return {"descuadres": descuadres, "corregidos": corregidos}
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    from ..database import SessionLocal, init_db
+
+    init_db()
+    db = SessionLocal()
+    try:
+        inicio = time.perf_counter()
+        resultado = verificar_stock(db, reparar_descuadres="--reparar" in sys.argv)
+        segundos = time.perf_counter() - inicio
+    finally:
+        db.close()
+    for d in resultado["descuadres"][:50]:
+        print(f"  {d['codigo']:<20} {d['nombre'][:40]:<40} stock {d['stock_actual']:>8}  "
+              f"movimientos {d['saldo_movimientos']:>8}  diferencia {d['diferencia']:>+8}")
+    if len(resultado["descuadres"]) > 50:
+        print(f"  ... y {len(resultado['descuadres']) - 50} más")
+    print(f"🔎 {len(resultado['descuadres'])} descuadres, {resultado['corregidos']} corregidos ({segundos:.2f} s)")
+    sys.exit(1 if len(resultado["descuadres"]) > resultado["corregidos"] else 0)
@@ -0,0 +1,44 @@
+# app/utils/versiones.py
+from datetime import datetime
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from .. import models
+
+# Tablas cuyo contador se incrementa automáticamente al escribir por el ORM
+TABLAS_VERSIONADAS = {"productos", "movimientos", "documentos", "ubicaciones", "stock_ubicaciones", "lotes"}
+
+_SQL_INCREMENTAR = text(
+    "INSERT INTO versiones_tabla (tabla, version, actualizado) VALUES (:tabla, 1, :ahora) "
+    "ON CONFLICT(tabla) DO UPDATE SET version = version + 1, actualizado = :ahora"
+)
+
+def incrementar(conexion, *tablas):
+    """
+    Incrementa la versión de las tablas dentro de la transacción actual.
+    Usar después de escrituras que no pasan por el ORM (UPDATE masivos).
+    """
+    ahora = datetime.utcnow()
+    for tabla in sorted(set(tablas)):
+        conexion.execute(_SQL_INCREMENTAR, {"tabla": tabla, "ahora": ahora})
+
+def obtener(db, *tablas) -> dict:
+    """Devuelve {tabla: (version, actualizado)} con una consulta por clave primaria."""
+    filas = db.query(models.VersionTabla).filter(models.VersionTabla.tabla.in_(tablas)).all()
+    versiones = {tabla: (0, None) for tabla in tablas}
+    for fila in filas:
+        versiones[fila.tabla] = (fila.version, fila.actualizado)
+    return versiones
+
+@event.listens_for(Session, "after_flush")
+def _contar_escrituras(session, flush_context):
+    tablas = set()
+    for obj in session.new | session.deleted:
+        tablas.add(getattr(obj, "__tablename__", None))
+    for obj in session.dirty:
+        if session.is_modified(obj, include_collections=False):
+            tablas.add(getattr(obj, "__tablename__", None))
+    tablas &= TABLAS_VERSIONADAS
+    if tablas:
+        incrementar(session.connection(), *tablas)
@@ -0,0 +1,68 @@
+# app/utils/zip_stream.py
+import time
+import zipfile
+
+BLOQUE = 256 * 1024
+
+class _SalidaZip:
+    """
+    Destino de escritura para ZipFile que no permite seek: zipfile usa
+    descriptores de datos y nosotros vaciamos lo escrito tras cada bloque.
+    """
+    def __init__(self):
+        self._partes = []
+        self._posicion = 0
+
+    def write(self, datos):
+        datos = bytes(datos)
+        self._partes.append(datos)
+        self._posicion += len(datos)
+        return len(datos)
+
+    def tell(self):
+        return self._posicion
+
+    def flush(self):
+        pass
+
+    def vaciar(self) -> bytes:
+        datos = b"".join(self._partes)
+        self._partes = []
+        return datos
+
+def generar_zip(entradas):
+    """
+    Genera un ZIP por partes sin tenerlo completo en memoria.
+
+    Args:
+        entradas: iterable de (nombre_en_zip, origen) donde origen es la ruta
+                  de un archivo en disco o bytes
+
+    Yields:
+        bloques de bytes del archivo ZIP
+    """
+    salida = _SalidaZip()
+    with zipfile.ZipFile(salida, mode="w", compression=zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
+        for nombre, origen in entradas:
+            info = zipfile.ZipInfo(nombre, date_time=time.localtime()[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with zf.open(info, mode="w", force_zip64=True) as destino:
+                if isinstance(origen, (bytes, bytearray)):
+                    destino.write(origen)
+                else:
+                    with open(origen, "rb") as f:
+                        while True:
+                            bloque = f.read(BLOQUE)
+                            if not bloque:
+                                break
+                            destino.write(bloque)
+                            datos = salida.vaciar()
+                            if datos:
+                                yield datos
+            datos = salida.vaciar()
+            if datos:
+                yield datos
+    # Directorio central
+    datos = salida.vaciar()
+    if datos:
+        yield datos
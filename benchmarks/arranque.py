@@ -0,0 +1,97 @@
+# benchmarks/arranque.py
+"""
+Benchmark de arranque de la aplicación.
+
+Mide, en procesos nuevos (arranque en frío):
+  1. el tiempo de importación por módulo (python -X importtime)
+  2. el tiempo desde lanzar uvicorn hasta responder la primera petición
+
+Uso:
+    python -m benchmarks.arranque [--top 20] [--repeticiones 3]
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from collections import defaultdict
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dependencias pesadas que no deberían cargarse al importar la app
+PESADAS = ("pandas", "numpy", "chardet", "reportlab", "qrcode", "barcode", "PIL", "openpyxl")
+
+def _parsear_importtime(salida: str) -> dict:
+    """{modulo: microsegundos acumulados} a partir de la salida de -X importtime."""
+    tiempos = {}
+    for linea in salida.splitlines():
+        if not linea.startswith("import time:") or "cumulative" in linea:
+            continue
+        _, acumulado, modulo = linea[len("import time:"):].split("|")
+        tiempos[modulo.strip()] = int(acumulado)
+    return tiempos
+
+def medir_importacion():
+    salida = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=RAIZ, capture_output=True, text=True, check=True
+    ).stderr
+    return _parsear_importtime(salida)
+
+def puerto_libre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def medir_primera_peticion(timeout: float = 60.0) -> float:
+    """Segundos desde lanzar uvicorn hasta la primera respuesta 200 de /api/test."""
+    puerto = puerto_libre()
+    inicio = time.perf_counter()
+    proceso = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(puerto), "--log-level", "warning"],
+        cwd=RAIZ, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - inicio < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{puerto}/api/test", timeout=1) as r:
+                    if r.status == 200:
+                        return time.perf_counter() - inicio
+            except OSError:
+                time.sleep(0.02)
+        raise TimeoutError("El servidor no respondió")
+    finally:
+        proceso.terminate()
+        proceso.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=20, help="módulos a mostrar")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    tiempos = medir_importacion()
+    total = tiempos.get("app.main", 0)
+    print(f"Importar app.main: {total / 1000:.0f} ms\n")
+
+    # Agrupado por paquete de primer nivel (el acumulado del módulo raíz ya incluye sus submódulos)
+    por_paquete = defaultdict(int)
+    for modulo, us in tiempos.items():
+        raiz = modulo.split(".")[0]
+        if modulo == raiz or (raiz == "app" and modulo.count(".") == 1):
+            por_paquete[modulo] = max(por_paquete[modulo], us)
+    print(f"{'módulo':<40}{'ms':>10}")
+    for modulo, us in sorted(por_paquete.items(), key=lambda x: -x[1])[:args.top]:
+        print(f"{modulo:<40}{us / 1000:>10.1f}")
+
+    cargadas = [m for m in PESADAS if m in tiempos]
+    print(f"\nDependencias pesadas cargadas al importar: {', '.join(cargadas) or 'ninguna'}")
+
+    muestras = [medir_primera_peticion() for _ in range(args.repeticiones)]
+    print(f"Tiempo hasta la primera petición: mín {min(muestras) * 1000:.0f} ms, "
+          f"máx {max(muestras) * 1000:.0f} ms ({args.repeticiones} arranques)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# benchmarks/bench_serializacion.py
+"""
+Micro-benchmark de serialización de listados.
+
+Compara, para distintos tamaños de respuesta, la ruta clásica de FastAPI
+(ORM -> validación con response_model -> jsonable_encoder -> json) con la
+ruta rápida (consulta por columnas -> dicts -> orjson/json).
+
+Uso:
+    python -m benchmarks.bench_serializacion [--tamanos 100 1000 10000] [--repeticiones 5]
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, models, schemas
+from app.database import Base, tablas_a_crear
+from app.utils.serializacion import a_json, orjson
+
+def crear_base(n: int):
+    """Base SQLite temporal con n productos y n movimientos."""
+    ruta = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_engine(f"sqlite:///{ruta}")
+    Base.metadata.create_all(engine, tables=tablas_a_crear(adjunto=False))
+    ahora = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(models.Producto.__table__.insert(), [
+            {"codigo": f"B{i:08d}", "nombre": f"Producto {i}", "descripcion": "Descripción de prueba",
+             "categoria": random.choice(["Alimentos", "Aseo", "Medicamentos"]), "stock_minimo": 5,
+             "stock_actual": random.randint(0, 100), "fecha_creacion": ahora}
+            for i in range(n)
+        ])
+        conn.execute(models.Movimiento.__table__.insert(), [
+            {"producto_id": random.randint(1, n), "tipo": random.choice(["entrada", "salida"]),
+             "cantidad": random.randint(1, 20), "motivo": "Prueba", "usuario": "admin",
+             "fecha_movimiento": ahora - timedelta(minutes=i)}
+            for i in range(n)
+        ])
+    return sessionmaker(bind=engine)()
+
+def ruta_clasica(objetos, esquema):
+    validados = TypeAdapter(List[esquema]).validate_python(objetos, from_attributes=True)
+    return json.dumps(jsonable_encoder(validados), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def medir(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"Backend JSON rápido: {'orjson' if orjson else 'json (stdlib)'}")
+    print(f"{'listado':<12}{'filas':>8}{'clásica ms':>14}{'rápida ms':>12}{'mejora':>9}{'bytes':>11}")
+    for n in args.tamanos:
+        db = crear_base(n)
+        casos = [
+            ("productos",
+             lambda: ruta_clasica(crud.get_productos(db, limit=n), schemas.Producto),
+             lambda: a_json(crud.get_productos_filas(db, limit=n))),
+            ("movimientos",
+             lambda: ruta_clasica(crud.get_movimientos(db, limit=n), schemas.Movimiento),
+             lambda: a_json(crud.get_movimientos_filas(db, limit=n))),
+        ]
+        for nombre, clasica, rapida in casos:
+            db.expunge_all()
+            t_clasica = medir(lambda: (db.expunge_all(), clasica()), args.repeticiones)
+            t_rapida = medir(rapida, args.repeticiones)
+            tamano = len(rapida())
+            print(f"{nombre:<12}{n:>8}{t_clasica:>14.1f}{t_rapida:>12.1f}{t_clasica / t_rapida:>8.1f}x{tamano:>11}")
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# benchmarks/carga.py
+"""
+Prueba de carga: throughput de la API según la cantidad de workers de uvicorn.
+
+Para cada valor de --workers lanza uvicorn con WEB_CONCURRENCY=N y genera
+carga de solo lectura (listados, dashboard, búsqueda por código) desde
+varios procesos cliente con conexiones keep-alive.
+
+Uso:
+    python -m benchmarks.carga [--workers 1 2 4] [--segundos 10] [--clientes 4] [--hilos 8]
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+from .arranque import RAIZ, puerto_libre
+
+def _rutas(puerto: int) -> list:
+    """Mezcla de GETs; usa códigos de productos reales si existen."""
+    with urllib.request.urlopen(f"http://127.0.0.1:{puerto}/api/productos/?limit=50") as r:
+        codigos = [p["codigo"] for p in json.load(r)]
+    rutas = ["/api/productos/?limit=50", "/api/movimientos/?limit=50", "/api/inventario/dashboard"]
+    rutas += [f"/api/productos/codigo/{c}" for c in codigos[:20]] or ["/api/productos/codigo/NOEXISTE"]
+    return rutas
+
+def _cliente(puerto: int, rutas: list, segundos: float, hilos: int, cola):
+    """Proceso cliente: `hilos` conexiones keep-alive pidiendo rutas en ronda."""
+    latencias = []
+    errores = [0]
+    lock = threading.Lock()
+    fin = time.perf_counter() + segundos
+
+    def trabajar(desfase):
+        conexion = http.client.HTTPConnection("127.0.0.1", puerto, timeout=30)
+        propias = []
+        i = desfase
+        while time.perf_counter() < fin:
+            inicio = time.perf_counter()
+            try:
+                conexion.request("GET", rutas[i % len(rutas)])
+                respuesta = conexion.getresponse()
+                respuesta.read()
+                if respuesta.status >= 400 and respuesta.status != 404:
+                    raise http.client.HTTPException(respuesta.status)
+                propias.append(time.perf_counter() - inicio)
+            except (OSError, http.client.HTTPException):
+                with lock:
+                    errores[0] += 1
+                conexion.close()
+                conexion = http.client.HTTPConnection("127.0.0.1", puerto, timeout=30)
+            i += 1
+        conexion.close()
+        with lock:
+            latencias.extend(propias)
+
+    threads = [threading.Thread(target=trabajar, args=(k,)) for k in range(hilos)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    cola.put((latencias, errores[0]))
+
+def _percentil(valores: list, p: float) -> float:
+    if not valores:
+        return 0.0
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p))]
+
+def medir(workers: int, segundos: float, clientes: int, hilos: int) -> dict:
+    puerto = puerto_libre()
+    entorno = {**os.environ, "WEB_CONCURRENCY": str(workers)}
+    servidor = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(puerto), "--log-level", "warning"],
+        cwd=RAIZ, env=entorno, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        limite = time.perf_counter() + 60
+        while True:
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{puerto}/api/test", timeout=1).close()
+                break
+            except OSError:
+                if time.perf_counter() > limite:
+                    raise TimeoutError("El servidor no respondió")
+                time.sleep(0.1)
+        time.sleep(1)  # que todos los workers terminen de arrancar
+        rutas = _rutas(puerto)
+
+        cola = multiprocessing.Queue()
+        procesos = [
+            multiprocessing.Process(target=_cliente, args=(puerto, rutas, segundos, hilos, cola))
+            for _ in range(clientes)
+        ]
+        for p in procesos:
+            p.start()
+        latencias, errores = [], 0
+        for _ in procesos:
+            propias, err = cola.get()
+            latencias.extend(propias)
+            errores += err
+        for p in procesos:
+            p.join()
+    finally:
+        servidor.terminate()
+        servidor.wait()
+
+    return {
+        "workers": workers,
+        "rps": len(latencias) / segundos,
+        "p50_ms": _percentil(latencias, 0.50) * 1000,
+        "p95_ms": _percentil(latencias, 0.95) * 1000,
+        "errores": errores,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--segundos", type=float, default=10)
+    parser.add_argument("--clientes", type=int, default=4, help="procesos cliente")
+    parser.add_argument("--hilos", type=int, default=8, help="conexiones por proceso cliente")
+    args = parser.parse_args()
+
+    print(f"{'workers':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'errores':>9}{'escala':>8}")
+    base = None
+    for n in args.workers:
+        r = medir(n, args.segundos, args.clientes, args.hilos)
+        base = base or r["rps"]
+        print(f"{n:>8}{r['rps']:>10.0f}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['errores']:>9}{r['rps'] / base:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
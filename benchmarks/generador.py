@@ -0,0 +1,225 @@
+# benchmarks/generador.py
+"""
+Generador de una base sintética para los benchmarks.
+
+Carga N productos y M movimientos con distribuciones parecidas a las reales:
+  - popularidad tipo Zipf: pocos productos concentran la mayoría de las salidas
+  - horario laboral (8 a 18 h) y menos actividad los fines de semana
+  - salidas chicas y frecuentes; entradas menos frecuentes y por caja (6, 12, 24)
+  - el stock nunca queda negativo: cada producto arranca con una entrada
+    inicial que cubre su peor momento
+Los datos (y resumen_diario) se arman con numpy y se insertan con el
+cursor del driver, sin los índices de movimientos (se crean al final).
+
+Uso:
+    python -m benchmarks.generador ruta.db [--productos 20000] [--movimientos 1000000] [--dias 365]
+"""
+import argparse
+import os
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.schema import CreateIndex
+
+from app import models
+from app.database import Base, tablas_a_crear
+from app.utils.codigos import normalizar_codigo
+
+CATEGORIAS = {
+    "Alimentos": ["Arroz", "Aceite", "Azúcar", "Fideos", "Harina", "Leche", "Lentejas", "Atún", "Café", "Galletas"],
+    "Aseo": ["Jabón", "Champú", "Detergente", "Cloro", "Papel higiénico", "Pasta dental", "Desodorante"],
+    "Medicamentos": ["Paracetamol", "Ibuprofeno", "Amoxicilina", "Suero oral", "Vitamina C", "Alcohol gel"],
+    "Oficina": ["Resma", "Lápiz", "Cuaderno", "Carpeta", "Toner", "Cinta adhesiva"],
+    "Limpieza": ["Escoba", "Trapero", "Guantes", "Bolsas basura", "Esponja"],
+}
+MARCAS = ["Don Pedro", "La Estrella", "Del Valle", "Premium", "Económico", "Sol", "Andina", "Norte"]
+PRESENTACIONES = ["1 kg", "500 g", "1 L", "250 ml", "x12", "x6", "unidad", "caja"]
+DESTINOS = [f"Sede {i}" for i in range(1, 31)] + [f"Comedor {i}" for i in range(1, 11)]
+PROVEEDORES = [f"Proveedor {i}" for i in range(1, 21)] + ["Donación anónima"]
+USUARIOS = ["admin", "bodega", "recepcion", "despacho"]
+
+ZIPF_S = 1.1              # exponente de popularidad
+PROPORCION_ENTRADAS = 0.15  # con cajas de 6 a 24 entra un poco menos de lo que sale
+
+def digito_ean13(base: str) -> str:
+    """Dígito verificador de un código EAN-13 (12 dígitos de entrada)."""
+    suma = sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(base))
+    return str((10 - suma % 10) % 10)
+
+def codigo_producto(i: int) -> str:
+    base = f"779{i:09d}"
+    return base + digito_ean13(base)
+
+def popularidad(n: int, rng):
+    """Pesos tipo Zipf, asignados a los productos en orden aleatorio."""
+    import numpy as np
+
+    pesos = 1.0 / np.arange(1, n + 1) ** ZIPF_S
+    rng.shuffle(pesos)
+    return pesos / pesos.sum()
+
+def _fechas(m: int, dias: int, ahora: datetime, rng):
+    """m instantes de los últimos `dias` días, en horario laboral, ordenados."""
+    import numpy as np
+
+    inicio = np.datetime64(ahora.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=dias - 1), "us")
+    dia_semana = (np.arange(dias) + (inicio.astype("datetime64[D]").view("int64") - 4) % 7) % 7  # 0 = lunes
+    peso_dia = np.where(dia_semana < 5, 1.0, np.where(dia_semana == 5, 0.4, 0.1))
+    dia = rng.choice(dias, size=m, p=peso_dia / peso_dia.sum())
+    segundos = np.clip(rng.normal(13 * 3600, 2.5 * 3600, size=m), 8 * 3600, 18 * 3600 - 1)
+    fechas = inicio + (dia.astype("int64") * 86_400_000_000 + (segundos * 1_000_000).astype("int64")).astype("timedelta64[us]")
+    fechas.sort()
+    # El último día puede quedar en el futuro: se recorta a "ahora"
+    return np.minimum(fechas, np.datetime64(ahora, "us"))
+
+def _texto_fecha(fechas):
+    import numpy as np
+
+    # Mismo formato que guarda SQLAlchemy en SQLite
+    return np.char.replace(np.datetime_as_string(fechas, unit="us"), "T", " ").tolist()
+
+def _resumen_diario(producto_id, es_entrada, cantidad, fechas, inicial, fecha_inicial):
+    """Filas de resumen_diario (día, producto, tipo) agrupadas con np.unique."""
+    import numpy as np
+
+    productos = len(inicial) - 1
+    dia = np.r_[
+        np.full(productos, np.datetime64(fecha_inicial, "D").astype("int64")),
+        fechas.astype("datetime64[D]").astype("int64"),
+    ]
+    ids = np.r_[np.arange(1, productos + 1), producto_id]
+    entrada = np.r_[np.ones(productos, dtype=bool), es_entrada]
+    cantidades = np.r_[inicial[1:], cantidad]
+    clave = (dia * (productos + 1) + ids) * 2 + entrada
+    unicas, grupo = np.unique(clave, return_inverse=True)
+    sumas = np.bincount(grupo, weights=cantidades).astype(np.int64)
+    cuentas = np.bincount(grupo)
+    dias = (unicas // 2 // (productos + 1)).astype("datetime64[D]").astype(str)
+    return zip(
+        dias.tolist(), (unicas // 2 % (productos + 1)).tolist(),
+        np.where(unicas % 2 == 1, "entrada", "salida").tolist(), sumas.tolist(), cuentas.tolist()
+    )
+
+def generar(ruta: str, productos: int = 20_000, movimientos: int = 1_000_000, dias: int = 365, semilla: int = 42) -> dict:
+    """Crea la base en `ruta` (que no debe existir). Devuelve cuántas filas cargó y cuánto tardó."""
+    import numpy as np
+
+    if os.path.exists(ruta):
+        raise FileExistsError(ruta)
+    inicio = time.perf_counter()
+    rng = np.random.default_rng(semilla)
+    ahora = datetime.utcnow()
+
+    engine = create_engine(f"sqlite:///{ruta}")
+    Base.metadata.create_all(engine, tables=tablas_a_crear(adjunto=False))
+    engine.dispose()  # cambiar el modo de diario requiere que no haya otras conexiones
+    tabla = models.Movimiento.__table__
+
+    # Movimientos: producto según popularidad, tipo, cantidad y fecha
+    pesos = popularidad(productos, rng)
+    producto_id = rng.choice(productos, size=movimientos, p=pesos) + 1
+    es_entrada = rng.random(movimientos) < PROPORCION_ENTRADAS
+    cantidad = np.where(
+        es_entrada,
+        rng.choice([6, 12, 24], size=movimientos),
+        rng.geometric(0.35, size=movimientos)
+    )
+    fechas = _fechas(movimientos, dias, ahora, rng)
+
+    # Entrada inicial = peor saldo acumulado de cada producto, más un colchón
+    orden = np.lexsort((np.arange(movimientos), producto_id))
+    delta = np.where(es_entrada, cantidad, -cantidad)[orden]
+    acumulado = np.cumsum(delta)
+    ids_ordenados = producto_id[orden]
+    inicios = np.flatnonzero(np.r_[True, ids_ordenados[1:] != ids_ordenados[:-1]])
+    previo = np.r_[0, acumulado][inicios]
+    saldo = acumulado - np.repeat(previo, np.diff(np.r_[inicios, movimientos]))
+    peor = np.zeros(productos + 1, dtype=np.int64)
+    peor[ids_ordenados[inicios]] = np.minimum.reduceat(saldo, inicios)
+    final = np.zeros(productos + 1, dtype=np.int64)
+    final[ids_ordenados[inicios]] = saldo[np.r_[inicios[1:], movimientos] - 1]
+    inicial = -np.minimum(peor, 0) + rng.integers(5, 50, size=productos + 1)
+    stock = inicial + final
+
+    # Stock mínimo: entre una semana y un mes de salidas promedio
+    salidas_dia = np.bincount(producto_id[~es_entrada], weights=cantidad[~es_entrada], minlength=productos + 1) / dias
+    stock_minimo = np.ceil(salidas_dia * rng.uniform(7, 30, size=productos + 1)).astype(np.int64)
+
+    # Carga sin diario ni fsync y con caché grande; la base queda en WAL al final
+    conexion = sqlite3.connect(ruta)
+    conexion.execute("PRAGMA journal_mode=OFF")
+    conexion.execute("PRAGMA synchronous=OFF")
+    conexion.execute("PRAGMA cache_size=-262144")
+    conexion.execute("PRAGMA temp_store=MEMORY")
+    indices = [i.name for i in tabla.indexes] + [r[0] for r in conexion.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'movimientos' AND sql IS NOT NULL"
+    )]
+    for nombre in set(indices):
+        conexion.execute(f"DROP INDEX IF EXISTS {nombre}")
+
+    creacion = str(ahora - timedelta(days=dias + 1))
+    nombres = []
+    categorias = list(CATEGORIAS)
+    for i in range(1, productos + 1):
+        categoria = categorias[i % len(categorias)]
+        articulo = CATEGORIAS[categoria][(i // len(categorias)) % len(CATEGORIAS[categoria])]
+        nombres.append((f"{articulo} {MARCAS[i % len(MARCAS)]} {PRESENTACIONES[i % len(PRESENTACIONES)]} {i}", categoria))
+    conexion.executemany(
+        "INSERT INTO productos (id, codigo, codigo_normalizado, nombre, descripcion, categoria, stock_minimo, "
+        "stock_actual, bajo_stock, fecha_creacion) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            (i, codigo_producto(i), normalizar_codigo(codigo_producto(i)), nombre, f"{nombre} (generado)", categoria,
+             int(stock_minimo[i]), int(stock[i]), int(stock[i] < stock_minimo[i]), creacion)
+            for i, (nombre, categoria) in enumerate(nombres, start=1)
+        )
+    )
+
+    fecha_inicial = str(ahora - timedelta(days=dias))
+    conexion.executemany(
+        "INSERT INTO movimientos (producto_id, tipo, cantidad, motivo, tipo_origen, origen_nombre, usuario, fecha_movimiento) "
+        "VALUES (?, 'entrada', ?, 'Inventario inicial', 'ajuste', 'Inventario inicial', 'admin', ?)",
+        ((i, int(inicial[i]), fecha_inicial) for i in range(1, productos + 1))
+    )
+    textos = _texto_fecha(fechas)
+    destino = rng.integers(0, len(DESTINOS), size=movimientos).tolist()
+    proveedor = rng.integers(0, len(PROVEEDORES), size=movimientos).tolist()
+    usuario = rng.integers(0, len(USUARIOS), size=movimientos).tolist()
+    conexion.executemany(
+        "INSERT INTO movimientos (producto_id, tipo, cantidad, motivo, tipo_origen, origen_nombre, cliente_destino, usuario, fecha_movimiento) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            (p, "entrada", c, "Compra", "compra", PROVEEDORES[pr], None, USUARIOS[u], f) if e else
+            (p, "salida", c, "Entrega", None, None, DESTINOS[d], USUARIOS[u], f)
+            for p, e, c, f, d, pr, u in zip(
+                producto_id.tolist(), es_entrada.tolist(), cantidad.tolist(), textos, destino, proveedor, usuario
+            )
+        )
+    )
+    conexion.executemany(
+        "INSERT INTO resumen_diario (fecha, producto_id, tipo, cantidad, movimientos) VALUES (?, ?, ?, ?, ?)",
+        _resumen_diario(producto_id, es_entrada, cantidad, fechas, inicial, ahora - timedelta(days=dias))
+    )
+    # Índices de movimientos, como en una base real
+    for indice in tabla.indexes:
+        conexion.execute(str(CreateIndex(indice).compile(dialect=engine.dialect)))
+    conexion.commit()
+    conexion.execute("PRAGMA journal_mode=WAL")
+    conexion.close()
+    return {"productos": productos, "movimientos": movimientos + productos,
+            "segundos": round(time.perf_counter() - inicio, 2)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("ruta")
+    parser.add_argument("--productos", type=int, default=20_000)
+    parser.add_argument("--movimientos", type=int, default=1_000_000)
+    parser.add_argument("--dias", type=int, default=365)
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+    r = generar(args.ruta, args.productos, args.movimientos, args.dias, args.semilla)
+    print(f"🧪 {r['productos']} productos y {r['movimientos']} movimientos en {r['segundos']} s -> {args.ruta}")
+
+if __name__ == "__main__":
+    main()
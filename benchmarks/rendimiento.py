@@ -0,0 +1,283 @@
+# benchmarks/rendimiento.py
+"""
+Benchmark de escenarios de uso, con la app en el mismo proceso.
+
+Genera una base sintética (benchmarks/generador.py), apunta la app a ella
+con INVENTARIO_DB y la llama con un cliente ASGI (sin red ni uvicorn).
+Cada escenario corre --segundos con --usuarios usuarios concurrentes:
+
+  escaneo           GET /api/productos/codigo/{codigo} (productos populares)
+  busqueda          búsqueda mientras se escribe: una petición por letra
+  dashboard         sondeo del dashboard con If-None-Match
+  salida            POST /api/movimientos/ de una unidad
+  salida_multiple   POST /api/movimientos/salida-multiple de 3 a 8 productos
+  exportar_excel    GET /api/movimientos/exportar/excel de la última semana
+  importar_excel    POST /api/productos/cargar-excel con 100 productos nuevos
+
+Informa p50/p95/p99 por petición y peticiones por segundo, y compara con
+benchmarks/baseline.json: termina con código 1 si algún escenario empeoró
+más que --tolerancia. La línea base depende de la máquina; regenerarla
+con --guardar-baseline.
+
+Uso:
+    python -m benchmarks.rendimiento [--productos 20000] [--movimientos 200000] [--segundos 5]
+                                     [--usuarios 4] [--escenarios escaneo salida ...]
+                                     [--base ruta.db] [--guardar-baseline] [--tolerancia 0.3]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import itertools
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from .arranque import RAIZ
+
+BASELINE = os.path.join(RAIZ, "benchmarks", "baseline.json")
+PRODUCTOS_A_REPONER = 2000
+
+def _percentil(valores: list, p: float) -> float:
+    if not valores:
+        return 0.0
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p))]
+
+class Medidor:
+    """Cliente que registra la latencia y los errores de cada petición."""
+
+    def __init__(self, cliente):
+        self.cliente = cliente
+        self.latencias = []
+        self.errores = 0
+
+    async def pedir(self, metodo: str, url: str, **kwargs):
+        inicio = time.perf_counter()
+        respuesta = await self.cliente.request(metodo, url, **kwargs)
+        self.latencias.append(time.perf_counter() - inicio)
+        if respuesta.status_code >= 400:
+            self.errores += 1
+        return respuesta
+
+class Datos:
+    """Lo que los escenarios necesitan saber de la base generada."""
+
+    def __init__(self, db, productos: int):
+        from app import models
+        from benchmarks.generador import popularidad
+
+        import numpy as np
+
+        filas = db.query(models.Producto.id, models.Producto.codigo, models.Producto.nombre).order_by(models.Producto.id).all()
+        self.ids = [f.id for f in filas]
+        self.codigos = [f.codigo for f in filas]
+        self.nombres = [f.nombre for f in filas]
+        # Misma popularidad que usó el generador (misma semilla)
+        pesos = popularidad(productos, np.random.default_rng(42))[:len(self.ids)]
+        self.acumulados = list(itertools.accumulate(pesos.tolist()))
+        self.populares = np.argsort(pesos)[::-1][:PRODUCTOS_A_REPONER].tolist()
+        self.importados = itertools.count(1)
+
+    def popular(self, rng: random.Random) -> int:
+        """Índice de un producto, con la misma distribución de popularidad de los movimientos."""
+        return rng.choices(range(len(self.acumulados)), cum_weights=self.acumulados)[0]
+
+async def escaneo(m: Medidor, datos: Datos, rng: random.Random, estado: dict):
+    await m.pedir("GET", f"/api/productos/codigo/{datos.codigos[datos.popular(rng)]}")
+
+async def busqueda(m: Medidor, datos: Datos, rng: random.Random, estado: dict):
+    nombre = datos.nombres[rng.randrange(len(datos.nombres))].lower()
+    for largo in range(2, min(len(nombre), 8) + 1):
+        await m.pedir("GET", "/api/productos/buscar", params={"q": nombre[:largo]})
+
+async def dashboard(m: Medidor, datos: Datos, rng: random.Random, estado: dict):
+    cabeceras = {"If-None-Match": estado["etag"]} if estado.get("etag") else {}
+    respuesta = await m.pedir("GET", "/api/inventario/dashboard", headers=cabeceras)
+    estado["etag"] = respuesta.headers.get("etag", estado.get("etag"))
+
+async def salida(m: Medidor, datos: Datos, rng: random.Random, estado: dict):
+    await m.pedir("POST", "/api/movimientos/", json={
+        "producto_id": datos.ids[datos.popular(rng)], "tipo": "salida", "cantidad": 1,
+        "cliente_destino": "Benchmark", "motivo": "Entrega",
+    })
+
+async def salida_multiple(m: Medidor, datos: Datos, rng: random.Random, estado: dict):
+    indices = {datos.popular(rng) for _ in range(rng.randint(3, 8))}
+    await m.pedir("POST", "/api/movimientos/salida-multiple", json={
+        "productos": [{"producto_id": datos.ids[i], "cantidad": 1} for i in indices],
+        "destino": "Benchmark", "razon": "Entrega",
+    })
+
+async def exportar_excel(m: Medidor, datos: Datos, rng: random.Random, estado: dict):
+    hoy = date.today()
+    await m.pedir("GET", "/api/movimientos/exportar/excel", params={
+        "fecha_inicio": str(hoy - timedelta(days=7)), "fecha_fin": str(hoy),
+    })
+
+async def importar_excel(m: Medidor, datos: Datos, rng: random.Random, estado: dict):
+    import pandas as pd
+
+    lote = next(datos.importados)
+    df = pd.DataFrame({
+        "codigo": [f"IMP{lote:05d}{i:03d}" for i in range(100)],
+        "nombre": [f"Importado {lote}-{i}" for i in range(100)],
+        "categoria": "Importados",
+        "stock_minimo": 5,
+    })
+    contenido = io.BytesIO()
+    df.to_excel(contenido, index=False)
+    await m.pedir("POST", "/api/productos/cargar-excel", files={
+        "archivo": ("productos.xlsx", contenido.getvalue(),
+                    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    })
+
+async def reponer(cliente, datos: Datos):
+    """Entrada fuera de la medición para los productos más populares: el generador
+    los deja con poco stock y las salidas del benchmark los agotarían."""
+    respuesta = await cliente.post("/api/movimientos/entrada-multiple", json={
+        "productos": [{"producto_id": datos.ids[i], "cantidad": 10_000} for i in datos.populares],
+        "tipo_origen": "ajuste", "origen_nombre": "Benchmark",
+    })
+    respuesta.raise_for_status()
+
+ESCENARIOS = {
+    "escaneo": escaneo,
+    "busqueda": busqueda,
+    "dashboard": dashboard,
+    "salida": salida,
+    "salida_multiple": salida_multiple,
+    "exportar_excel": exportar_excel,
+    "importar_excel": importar_excel,
+}
+
+# Lo que hay que hacer antes de medir cada escenario
+PREPARAR = {"salida": reponer, "salida_multiple": reponer}
+
+async def correr(app, nombre: str, datos: Datos, segundos: float, usuarios: int) -> dict:
+    import httpx
+
+    transporte = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://bench", timeout=120) as cliente:
+        if nombre in PREPARAR:
+            await PREPARAR[nombre](cliente, datos)
+        escenario = ESCENARIOS[nombre]
+        medidor = Medidor(cliente)
+        fin = time.perf_counter() + segundos
+
+        async def usuario(semilla: int):
+            rng = random.Random(semilla)
+            estado = {}
+            while time.perf_counter() < fin:
+                await escenario(medidor, datos, rng, estado)
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(usuario(k) for k in range(usuarios)))
+        duracion = time.perf_counter() - inicio
+    latencias = medidor.latencias
+    return {
+        "peticiones": len(latencias),
+        "rps": round(len(latencias) / duracion, 1),
+        "p50_ms": round(_percentil(latencias, 0.50) * 1000, 2),
+        "p95_ms": round(_percentil(latencias, 0.95) * 1000, 2),
+        "p99_ms": round(_percentil(latencias, 0.99) * 1000, 2),
+        "errores": medidor.errores,
+    }
+
+def comparar(nombre: str, actual: dict, base: dict, tolerancia: float) -> list:
+    """Motivos de regresión del escenario frente a la línea base (lista vacía si no empeoró)."""
+    if not base:
+        return []
+    motivos = []
+    if actual["p95_ms"] > base["p95_ms"] * (1 + tolerancia):
+        motivos.append(f"p95 {base['p95_ms']} -> {actual['p95_ms']} ms")
+    if actual["rps"] < base["rps"] * (1 - tolerancia):
+        motivos.append(f"req/s {base['rps']} -> {actual['rps']}")
+    if actual["errores"] > base.get("errores", 0):
+        motivos.append(f"errores {base.get('errores', 0)} -> {actual['errores']}")
+    return motivos
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--productos", type=int, default=20_000)
+    parser.add_argument("--movimientos", type=int, default=200_000)
+    parser.add_argument("--segundos", type=float, default=5)
+    parser.add_argument("--usuarios", type=int, default=4, help="usuarios concurrentes por escenario")
+    parser.add_argument("--escenarios", nargs="+", choices=list(ESCENARIOS), default=list(ESCENARIOS))
+    parser.add_argument("--base", help="reusar (o crear) esta base en vez de una temporal")
+    parser.add_argument("--guardar-baseline", action="store_true")
+    parser.add_argument("--tolerancia", type=float, default=0.3, help="empeoramiento admitido (0.3 = 30%%)")
+    args = parser.parse_args()
+
+    temporal = None
+    ruta = args.base
+    if ruta is None:
+        temporal = tempfile.mkdtemp(prefix="bench_inventario_")
+        ruta = os.path.join(temporal, "bench.db")
+    ruta = os.path.abspath(ruta)
+    # Antes de importar la app: la base se elige al crear el engine
+    os.environ["INVENTARIO_DB"] = ruta
+    os.environ["INVENTARIO_ARCHIVO_DIAS"] = "0"
+
+    from benchmarks.generador import generar
+
+    if not os.path.exists(ruta):
+        r = generar(ruta, args.productos, args.movimientos)
+        print(f"🧪 Base sintética: {r['productos']} productos, {r['movimientos']} movimientos ({r['segundos']} s)")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        from app.database import SessionLocal, init_db
+        from app.main import app
+
+        init_db()
+        db = SessionLocal()
+        try:
+            datos = Datos(db, args.productos)
+        finally:
+            db.close()
+
+    linea_base = {}
+    if os.path.exists(BASELINE):
+        with open(BASELINE, encoding="utf-8") as f:
+            linea_base = json.load(f)
+
+    print(f"{'escenario':<17}{'pet.':>7}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'err':>5}  vs. línea base")
+    resultados, regresiones = {}, {}
+    try:
+        for nombre in args.escenarios:
+            # La app imprime avisos en cada petición: no se mezclan con el informe
+            with contextlib.redirect_stdout(io.StringIO()):
+                r = asyncio.run(correr(app, nombre, datos, args.segundos, args.usuarios))
+            resultados[nombre] = r
+            base = linea_base.get("escenarios", {}).get(nombre)
+            motivos = comparar(nombre, r, base, args.tolerancia)
+            if motivos:
+                regresiones[nombre] = motivos
+            cambio = f"p95 {(r['p95_ms'] / base['p95_ms'] - 1) * 100:+.0f}%" if base and base["p95_ms"] else "-"
+            print(f"{nombre:<17}{r['peticiones']:>7}{r['rps']:>9.1f}{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}"
+                  f"{r['p99_ms']:>9.1f}{r['errores']:>5}  {cambio}{'  ⚠️ ' + '; '.join(motivos) if motivos else ''}")
+    finally:
+        if temporal:
+            shutil.rmtree(temporal, ignore_errors=True)
+
+    if args.guardar_baseline:
+        linea_base = {
+            "configuracion": {"productos": args.productos, "movimientos": args.movimientos,
+                              "segundos": args.segundos, "usuarios": args.usuarios},
+            "escenarios": {**linea_base.get("escenarios", {}), **resultados},
+        }
+        with open(BASELINE, "w", encoding="utf-8") as f:
+            json.dump(linea_base, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"💾 Línea base guardada en {BASELINE}")
+    elif regresiones:
+        print(f"❌ Regresiones en: {', '.join(regresiones)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
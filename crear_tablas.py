@@ -1,6 +1,6 @@
 # create_tables.py
-from app.database import engine
+from app.database import engine, tablas_a_crear
 from app import models  # importa tus modelos de SQLAlchemy
 
-models.Base.metadata.create_all(bind=engine)
+models.Base.metadata.create_all(bind=engine, tables=tablas_a_crear())
 print("✅ Tablas creadas correctamente")
@@ -0,0 +1,44 @@
+# tests/test_archivo.py
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+# La base y el archivo se eligen al importar app.database
+_DIR = tempfile.mkdtemp()
+os.environ["INVENTARIO_DB"] = os.path.join(_DIR, "inventario.db")
+os.environ["INVENTARIO_ARCHIVO_DIAS"] = "365"
+
+from sqlalchemy import text  # noqa: E402
+
+from app import models  # noqa: E402
+from app.database import SessionLocal, engine, init_db  # noqa: E402
+from app.utils import archivo, metricas  # noqa: E402
+
+def test_conflicto_en_el_archivo_no_frena_a_los_siguientes():
+    init_db()
+    viejo = datetime.utcnow() - timedelta(days=400)
+    with SessionLocal() as db:
+        producto = models.Producto(codigo="ARCH-1", nombre="Archivo")
+        db.add(producto)
+        db.commit()
+        tabla = models.Movimiento.__table__
+        ids = [db.execute(tabla.insert().values(producto_id=producto.id, tipo="entrada", cantidad=1,
+                                                fecha_movimiento=viejo + timedelta(minutes=i))).inserted_primary_key[0]
+               for i in range(5)]
+        # El más nuevo queda en la tabla caliente
+        ultimo = db.execute(tabla.insert().values(producto_id=producto.id, tipo="entrada", cantidad=1,
+                                                  fecha_movimiento=datetime.utcnow())).inserted_primary_key[0]
+        # El id del más viejo ya está en el archivo con otros datos
+        db.execute(models.MovimientoArchivado.__table__.insert().values(
+            id=ids[0], producto_id=producto.id, tipo="salida", cantidad=99, fecha_movimiento=viejo))
+        db.commit()
+
+    antes = metricas.resumen()["contadores"].get("archivo.conflictos", 0)
+    assert archivo.archivar(engine, 365, tamano_lote=2) == 4
+
+    with engine.connect() as conexion:
+        calientes = conexion.execute(text("SELECT id FROM main.movimientos ORDER BY id")).scalars().all()
+        archivados = dict(conexion.execute(text("SELECT id, cantidad FROM archivo.movimientos")).all())
+    assert calientes == [ids[0], ultimo]
+    assert archivados == {ids[0]: 99, **{i: 1 for i in ids[1:]}}
+    assert metricas.resumen()["contadores"]["archivo.conflictos"] == antes + 1